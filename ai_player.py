@@ -1,10 +1,196 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from math import inf
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from game_board import GameBoard, Move
+from game_board import GameBoard, Move, from_canonical_move, to_canonical_move, zobrist_k_key
+from move_ordering import MoveOrdering
+from retrograde import EndgameTable, endgame_table
+from solved_table import default_table, side_to_move
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+
+# Bound flag seen from the other player's side.
+_FLIPPED = {EXACT: EXACT, LOWER: UPPER, UPPER: LOWER}
+
+# The clock is read once every this many nodes (must be a power of two).
+_CLOCK_INTERVAL = 256
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move time budget runs out."""
+
+
+class SearchCancelled(Exception):
+    """Raised out of choose_move when its `cancel` event is set during the search."""
+
+
+@dataclass
+class SearchStats:
+    """What one choose_move did. Collected only when AIPlayer.collect_stats is on."""
+
+    nodes: int = 0
+    # Nodes scored without expanding them: finished games and depth-limit leaves.
+    terminal_nodes: int = 0
+    cutoffs: int = 0
+    # Deepest ply below the root that the search visited.
+    max_depth: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    # Nodes scored from the retrograde endgame database.
+    endgame_hits: int = 0
+    elapsed_s: float = 0.0
+    # Timed searches: the last depth searched to completion.
+    completed_depth: Optional[int] = None
+    # "search", "solved table", "endgame table" or "ponder" (reply found while the human
+    # was thinking).
+    source: str = "search"
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def merge(self, other: "SearchStats") -> None:
+        """Add the per-node counters of a search of part of the tree (e.g. a pool worker)."""
+        self.terminal_nodes += other.terminal_nodes
+        self.cutoffs += other.cutoffs
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.endgame_hits += other.endgame_hits
+
+    def summary(self) -> str:
+        """Multi-line text for display."""
+        header = f"{self.source}: {self.elapsed_s * 1000:.0f} ms"
+        if not self.nodes:
+            return header
+        lines = [
+            header,
+            f"nodes {self.nodes:,} ({self.nodes_per_second:,.0f}/s)",
+            f"terminal {self.terminal_nodes:,}  cutoffs {self.cutoffs:,}",
+            f"depth {self.max_depth}" + (f"  completed {self.completed_depth}" if self.completed_depth else ""),
+        ]
+        if self.tt_probes:
+            lines.append(f"cache hits {self.tt_hits:,}/{self.tt_probes:,} ({self.tt_hit_rate:.0%})")
+        if self.endgame_hits:
+            lines.append(f"endgame table hits {self.endgame_hits:,}")
+        return "\n".join(lines)
+
+
+# Process pools for parallel root search, one per worker count, kept for the life of the
+# program. The workers of a search share the best root score found so far through one slot
+# of an Array; each search running on the pool (a ponder search next to the GUI's, say)
+# takes a slot of its own from the queue of free ones and waits if there is none.
+_ALPHA_SLOTS = 8
+_POOLS: Dict[int, Tuple[ProcessPoolExecutor, Any, "queue.Queue[int]"]] = {}
+_pools_lock = threading.Lock()
+
+# Set in each pool worker by _init_worker.
+_shared_alphas: Any = None
+_worker_tt: Optional[TranspositionTable] = None
+
+
+def _pool(workers: int) -> Tuple[ProcessPoolExecutor, Any, "queue.Queue[int]"]:
+    with _pools_lock:
+        entry = _POOLS.get(workers)
+        if entry is None:
+            alphas = multiprocessing.Array("d", [-inf] * _ALPHA_SLOTS)
+            free: "queue.Queue[int]" = queue.Queue()
+            for slot in range(_ALPHA_SLOTS):
+                free.put(slot)
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(alphas,))
+            entry = _POOLS[workers] = (pool, alphas, free)
+    return entry
+
+
+def shutdown_pools() -> None:
+    """Stop the worker processes started by parallel searches."""
+    with _pools_lock:
+        for pool, _alphas, _free in _POOLS.values():
+            pool.shutdown(cancel_futures=True)
+        _POOLS.clear()
+
+
+def _init_worker(alphas: Any) -> None:
+    global _shared_alphas
+    _shared_alphas = alphas
+
+
+def _use_worker_tt(player: "AIPlayer", use_tt: bool) -> None:
+    global _worker_tt
+    if use_tt:
+        if _worker_tt is None:
+            _worker_tt = TranspositionTable()
+        player.tt = _worker_tt
+
+
+def _analyze_in_worker(
+    player: "AIPlayer", board: GameBoard, use_tt: bool, deadline_at: Optional[float] = None
+) -> Dict[Move, int]:
+    """Runs in a pool worker: AIPlayer.analyze with the worker's own transposition table.
+
+    `deadline_at` is wall-clock (time.time()) time, so tasks queued behind others share the
+    batch's limit instead of each getting a fresh one.
+    """
+    _use_worker_tt(player, use_tt)
+    if deadline_at is not None:
+        player._deadline = time.perf_counter() + (deadline_at - time.time())
+    return player.analyze(board)
+
+
+def _search_root_move(
+    player: "AIPlayer",
+    board: GameBoard,
+    move: Move,
+    limit: Optional[int],
+    use_tt: bool,
+    remaining_s: Optional[float],
+    slot: int,
+    exact: bool = False,
+) -> Tuple[int, int, Optional["SearchStats"]]:
+    """Runs in a pool worker: score one root move. Returns (score, nodes searched, stats).
+
+    The move is searched with alpha just below the best score any worker of this search
+    (alpha `slot`) has finished with, so a move that cannot beat it fails low quickly, while
+    a move that ties it still gets its exact score (ties go to the earlier move, as in the
+    serial search). With `exact` the move gets a full window, and so its exact score.
+    """
+    _use_worker_tt(player, use_tt)
+    player._limit = limit
+    player._endgame = player._endgame_for(board)
+    player._deadline = None if remaining_s is None else time.perf_counter() + remaining_s
+    if player.ordering is not None:
+        player.ordering.new_search()
+    tt_before = player._tt_counters()
+    if player.collect_stats:
+        player._stats = SearchStats()
+
+    alpha = -inf if exact else _shared_alphas[slot]
+    board.push(move, player.symbol)
+    score = player._minimax(board, depth=1, maximizing=False, alpha=alpha - 1, beta=inf)
+    with _shared_alphas.get_lock():
+        if score > _shared_alphas[slot]:
+            _shared_alphas[slot] = score
+    stats = player._stats
+    if stats is not None:
+        stats.tt_hits, stats.tt_probes = _counter_delta(tt_before, player._tt_counters())
+    return score, player._nodes, stats
+
+
+def _counter_delta(before: Tuple[int, int], after: Tuple[int, int]) -> Tuple[int, int]:
+    """(hits, probes) between two _tt_counters() readings."""
+    hits = after[0] - before[0]
+    return hits, hits + after[1] - before[1]
 
 
 @dataclass
@@ -13,25 +199,298 @@ class AIPlayer:
 
     symbol: str
     max_depth: Optional[int] = None  # None means full search (optimal)
+    # Search results cached across moves and games; None disables caching.
+    tt: Optional[TranspositionTable] = field(default_factory=TranspositionTable, repr=False, compare=False)
+    # Key the table on the symmetry-canonical hash so rotations/reflections share entries.
+    use_symmetry: bool = True
+    # Full-depth play on 3x3 reads the precomputed solved_table when it has been generated.
+    use_solved_table: bool = True
+    # Full-depth play reads a retrograde endgame database for the board shape when one has
+    # been generated (see retrograde.py): at the root and at every node it covers.
+    use_endgame_db: bool = True
+    # Anytime mode: deepen one ply at a time until this many milliseconds have passed and
+    # play the best move of the last completed depth. max_depth, if set, caps the deepening.
+    time_budget_ms: Optional[int] = None
+    # Order in which moves are tried below the root (None: board order). See move_ordering.
+    ordering: Optional[MoveOrdering] = field(default=None, repr=False, compare=False)
+    # Root moves are split across this many worker processes (1: search in this process).
+    # Workers keep their own transposition tables; the pool is shared and reused.
+    workers: int = 1
+    # Record a SearchStats for every choose_move in last_stats (off: last_stats stays None).
+    collect_stats: bool = False
+    last_stats: Optional[SearchStats] = field(default=None, init=False, repr=False, compare=False)
+
+    # Per-search state.
+    _limit: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _deadline: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _cancel: Optional[threading.Event] = field(default=None, init=False, repr=False, compare=False)
+    _nodes: int = field(default=0, init=False, repr=False, compare=False)
+    _stats: Optional[SearchStats] = field(default=None, init=False, repr=False, compare=False)
+    _endgame: Optional[EndgameTable] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def opponent(self) -> str:
         return "O" if self.symbol == "X" else "X"
 
-    def choose_move(self, board: GameBoard) -> Optional[Move]:
+    def choose_move(self, board: GameBoard, cancel: Optional[threading.Event] = None) -> Optional[Move]:
+        """Best move for `symbol` on `board` (left unchanged).
+
+        Setting `cancel` from another thread stops the search with SearchCancelled.
+        With collect_stats on, what the search did is left in last_stats.
+        """
+        start = time.perf_counter()
+        self.last_stats = None
+        if self.max_depth is None and self.use_solved_table and (board.size, board.cols, board.k) == (3, 3, 3):
+            move = self._solved_move(board)
+            if move is not None:
+                if self.collect_stats:
+                    self.last_stats = SearchStats(elapsed_s=time.perf_counter() - start, source="solved table")
+                return move
+        self._endgame = self._endgame_for(board)
+        if self._endgame is not None:
+            move = self._endgame.best_move(board)
+            if move is not None:
+                self._endgame = None
+                if self.collect_stats:
+                    self.last_stats = SearchStats(elapsed_s=time.perf_counter() - start, source="endgame table")
+                return move
+
+        self._nodes = 0
+        self._cancel = cancel
+        if self.ordering is not None:
+            self.ordering.new_search()
+        if self.collect_stats:
+            self._stats = SearchStats()
+            tt_before = self._tt_counters()
+        try:
+            if self.time_budget_ms is not None:
+                return self._choose_move_timed(board, self.time_budget_ms)
+
+            best_move, _scores = self._search_root(board, self.max_depth, list(board.available_moves()))
+            return best_move
+        finally:
+            self._cancel = None
+            self._endgame = None
+            stats = self._stats
+            if stats is not None:
+                self._stats = None
+                stats.nodes = self._nodes
+                stats.elapsed_s = time.perf_counter() - start
+                hits, probes = _counter_delta(tt_before, self._tt_counters())
+                stats.tt_hits += hits
+                stats.tt_probes += probes
+                self.last_stats = stats
+
+    def _tt_counters(self) -> Tuple[int, int]:
+        return (self.tt.hits, self.tt.misses) if self.tt is not None else (0, 0)
+
+    def analyze(self, board: GameBoard) -> Dict[Move, int]:
+        """Score of every legal move for `symbol`, searched to max_depth (time_budget_ms is ignored).
+
+        Scores use the search's scale: positive wins (larger is faster), 0 draws or unclear
+        at this depth, negative losses. A finished game has no moves and returns {}.
+        """
+        if board.game_state() != "IN_PROGRESS":
+            return {}
+        self._nodes = 0
+        if self.ordering is not None:
+            self.ordering.new_search()
+        _best, scores = self._search_root(board, self.max_depth, list(board.available_moves()), exact=True)
+        return scores
+
+    def analyze_many(
+        self, boards: Sequence[GameBoard], workers: Optional[int] = None, time_limit_s: Optional[float] = None
+    ) -> List[Dict[Move, int]]:
+        """analyze() for many positions, each from the point of view of the side to move.
+
+        Identical positions, and with use_symmetry also rotations/reflections, are searched
+        once and the scores mapped back onto each board. Searches share this player's
+        transposition table, or with `workers` > 1 (default: self.workers) are spread over
+        the process pool, where each worker keeps its own table. Raises SearchTimeout if
+        the whole batch takes longer than `time_limit_s`.
+        """
+        workers = self.workers if workers is None else workers
+        deadline = None if time_limit_s is None else time.perf_counter() + time_limit_s
+        deadline_at = None if time_limit_s is None else time.time() + time_limit_s
+        # Unique positions: key -> (representative board, its symmetry), plus each board's key.
+        unique: Dict[int, Tuple[GameBoard, int]] = {}
+        keys: List[Tuple[int, int]] = []
+        for board in boards:
+            if self.use_symmetry:
+                key, sym = board.canonical()
+            else:
+                key, sym = board.position_key, 0
+            unique.setdefault(key, (board, sym))
+            keys.append((key, sym))
+
+        players = {s: replace(self, symbol=s, tt=self.tt, workers=1) for s in ("X", "O")}
+        for player in players.values():
+            player._deadline = deadline
+        tasks = [(players[side_to_move(board.grid)], board) for board, _sym in unique.values()]
+        if workers > 1 and len(tasks) > 1:
+            pool, _alphas, _free = _pool(workers)
+            use_tt = self.tt is not None
+            futures = [
+                pool.submit(_analyze_in_worker, replace(player, tt=None), board.copy(), use_tt, deadline_at)
+                for player, board in tasks
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except SearchTimeout:
+                for future in futures:
+                    future.cancel()
+                raise
+        else:
+            results = [player.analyze(board) for player, board in tasks]
+        by_key = dict(zip(unique, results))
+
+        out: List[Dict[Move, int]] = []
+        for board, (key, sym) in zip(boards, keys):
+            rep_board, rep_sym = unique[key]
+            scores = by_key[key]
+            if rep_board is board or sym == rep_sym:
+                out.append(dict(scores))
+                continue
+            rows, cols = board.rows, board.cols
+            out.append(
+                {
+                    from_canonical_move(to_canonical_move(move, rep_sym, rows, cols), sym, rows, cols): score
+                    for move, score in scores.items()
+                }
+            )
+        return out
+
+    def _choose_move_timed(self, board: GameBoard, budget_ms: int) -> Optional[Move]:
+        """Iterative deepening: search depth 1, 2, ... until the budget runs out.
+
+        Each iteration tries moves in the order of the previous iteration's scores, best first.
+        """
+        moves = list(board.available_moves())
+        if not moves:
+            return None
+        best_move: Optional[Move] = moves[0]
+        self._deadline = time.perf_counter() + budget_ms / 1000
+        try:
+            limit = 1
+            while True:
+                move, scores = self._search_root(board, limit, moves)
+                best_move = move
+                if self._stats is not None:
+                    self._stats.completed_depth = limit
+                moves.sort(key=lambda m: -scores[m])
+                if scores[move] > 0:
+                    break  # Forced win found; deeper iterations only find slower ones.
+                if limit >= len(moves) or (self.max_depth is not None and limit >= self.max_depth):
+                    break  # Searched to the end of the game (or the difficulty cap).
+                limit += 1
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+        return best_move
+
+    def _search_root(
+        self, board: GameBoard, limit: Optional[int], moves: List[Move], exact: bool = False
+    ) -> Tuple[Optional[Move], Dict[Move, int]]:
+        """Score every move in `moves` with a depth-`limit` search. Returns (best, scores).
+
+        Only the best move's score is exact unless `exact` is set (see _search_root_parallel).
+        """
+        if self.workers > 1 and len(moves) > 1:
+            return self._search_root_parallel(board, limit, moves, exact)
+
         best_score = -inf
         best_move: Optional[Move] = None
+        scores: Dict[Move, int] = {}
+        self._limit = limit
 
         # Minimax searches all legal moves and chooses the one with best evaluation.
-        for move in board.available_moves():
-            b2 = board.copy()
-            b2.place(move[0], move[1], self.symbol)
-            score = self._minimax(b2, depth=1, maximizing=False, alpha=-inf, beta=inf)
-            if score > best_score:
-                best_score = score
-                best_move = move
+        # The search mutates `board` in place with push()/pop() and leaves it unchanged.
+        start_ply = board.ply
+        try:
+            for move in moves:
+                board.push(move, self.symbol)
+                score = self._minimax(board, depth=1, maximizing=False, alpha=-inf, beta=inf)
+                board.pop()
+                scores[move] = score
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+        finally:
+            # Only reached with extra moves on the board if the search raised.
+            while board.ply > start_ply:
+                board.pop()
 
-        return best_move
+        return best_move, scores
+
+    def _search_root_parallel(
+        self, board: GameBoard, limit: Optional[int], moves: List[Move], exact: bool = False
+    ) -> Tuple[Optional[Move], Dict[Move, int]]:
+        """_search_root with one pool task per root move.
+
+        Moves that fail low come back with an upper bound instead of their exact score; they
+        can never be the best move, so the choice matches the serial search. With `exact`
+        (analyze) every move is searched with a full window instead.
+        """
+        pool, alphas, free = _pool(self.workers)
+        template = replace(self, tt=None, workers=1)
+        remaining_s = None if self._deadline is None else max(0.0, self._deadline - time.perf_counter())
+        use_tt = self.tt is not None
+
+        slot = free.get()
+        alphas[slot] = -inf
+        futures: List[Future] = []
+        try:
+            for move in moves:
+                futures.append(
+                    pool.submit(
+                        _search_root_move, template, board.copy(), move, limit, use_tt, remaining_s, slot, exact
+                    )
+                )
+            best_score = -inf
+            best_move: Optional[Move] = None
+            scores: Dict[Move, int] = {}
+            for move, future in zip(moves, futures):
+                score, nodes, stats = future.result()
+                if self._cancel is not None and self._cancel.is_set():
+                    raise SearchCancelled()
+                self._nodes += nodes
+                if stats is not None and self._stats is not None:
+                    self._stats.merge(stats)
+                scores[move] = score
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+        finally:
+            # After a timeout, make sure no task from this search outlives it.
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            free.put(slot)
+        return best_move, scores
+
+    def _endgame_for(self, board: GameBoard) -> Optional[EndgameTable]:
+        """The endgame database to probe while searching `board`, if any.
+
+        Stored values assume the side to move follows from the stone counts, so the database
+        is only used when that side is this player.
+        """
+        if self.max_depth is not None or not self.use_endgame_db:
+            return None
+        table = endgame_table(board.size, board.cols, board.k)
+        if table is None or side_to_move(board.grid) != self.symbol:
+            return None
+        return table
+
+    def _solved_move(self, board: GameBoard) -> Optional[Move]:
+        """Perfect move from the solved table, or None to fall back to the live search."""
+        table = default_table()
+        if table is None:
+            return None
+        grid = board.grid
+        if side_to_move(grid) != self.symbol:
+            return None
+        return table.best_move(grid)
 
     def _terminal_score(self, board: GameBoard, depth: int) -> Optional[int]:
         state = board.game_state()
@@ -40,13 +499,39 @@ class AIPlayer:
 
         if state == "X_WINS" or state == "O_WINS":
             winner = "X" if state == "X_WINS" else "O"
-            # Prefer faster wins and slower losses.
+            # Prefer faster wins and slower losses. Cells + 1 (10 on 3x3) keeps every win
+            # score positive however deep the game goes.
+            win = board.size * board.cols + 1
             if winner == self.symbol:
-                return 10 - depth
-            return depth - 10
+                return win - depth
+            return depth - win
 
         return None
 
+    @staticmethod
+    def _to_tt(score: int, depth: int, maximizing: bool, flag: int) -> Tuple[int, int]:
+        """Convert a search score to the table's form: side-to-move view, distance from here."""
+        if not maximizing:
+            score = -score
+            flag = _FLIPPED[flag]
+        if score > 0:
+            score += depth
+        elif score < 0:
+            score -= depth
+        return score, flag
+
+    @staticmethod
+    def _from_tt(score: int, depth: int, maximizing: bool, flag: int) -> Tuple[int, int]:
+        """Inverse of _to_tt for a node at `depth`."""
+        if score > 0:
+            score -= depth
+        elif score < 0:
+            score += depth
+        if not maximizing:
+            score = -score
+            flag = _FLIPPED[flag]
+        return score, flag
+
     def _minimax(
         self,
         board: GameBoard,
@@ -55,34 +540,100 @@ class AIPlayer:
         alpha: float,
         beta: float,
     ) -> int:
+        self._nodes += 1
+        if not self._nodes & (_CLOCK_INTERVAL - 1):
+            if self._cancel is not None and self._cancel.is_set():
+                raise SearchCancelled()
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise SearchTimeout()
+
+        stats = self._stats
+        if stats is not None and depth > stats.max_depth:
+            stats.max_depth = depth
+
         terminal = self._terminal_score(board, depth)
         if terminal is not None:
+            if stats is not None:
+                stats.terminal_nodes += 1
             return terminal
 
-        if self.max_depth is not None and depth >= self.max_depth:
+        endgame = self._endgame
+        if endgame is not None:
+            entry = endgame.lookup(board.position_index)
+            if entry is not None:
+                if stats is not None:
+                    stats.endgame_hits += 1
+                return self._from_tt(entry[0], depth, maximizing, EXACT)[0]
+
+        limit = self._limit
+        if limit is not None and depth >= limit:
             # Depth-limited evaluation: 0 is a neutral heuristic for Tic-Tac-Toe.
             # This intentionally makes Easy/Medium imperfect.
+            if stats is not None:
+                stats.terminal_nodes += 1
             return 0
 
+        tt = self.tt
+        if tt is not None:
+            key = (board.canonical_hash if self.use_symmetry else board.zobrist) ^ zobrist_k_key(board.k)
+            draft = None if limit is None else limit - depth
+            entry = tt.probe(key, draft)
+            if entry is not None:
+                score, flag = self._from_tt(entry[0], depth, maximizing, entry[1])
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
+                    return score
+            alpha_orig, beta_orig = alpha, beta
+
+        ordering = self.ordering
+        symbol = self.symbol if maximizing else self.opponent
+        if ordering is not None:
+            moves = ordering.order(board, list(board.available_moves()), symbol, depth)
+        else:
+            moves = board.available_moves()
+
         if maximizing:
             best = -inf
-            for move in board.available_moves():
-                b2 = board.copy()
-                b2.place(move[0], move[1], self.symbol)
-                val = self._minimax(b2, depth + 1, False, alpha, beta)
+            for move in moves:
+                board.push(move, symbol)
+                val = self._minimax(board, depth + 1, False, alpha, beta)
+                board.pop()
                 best = max(best, val)
                 alpha = max(alpha, best)
                 if beta <= alpha:
                     break
-            return int(best)
-
-        best = inf
-        for move in board.available_moves():
-            b2 = board.copy()
-            b2.place(move[0], move[1], self.opponent)
-            val = self._minimax(b2, depth + 1, True, alpha, beta)
-            best = min(best, val)
-            beta = min(beta, best)
-            if beta <= alpha:
-                break
+        else:
+            best = inf
+            for move in moves:
+                board.push(move, symbol)
+                val = self._minimax(board, depth + 1, True, alpha, beta)
+                board.pop()
+                best = min(best, val)
+                beta = min(beta, best)
+                if beta <= alpha:
+                    break
+
+        if beta <= alpha:
+            if stats is not None:
+                stats.cutoffs += 1
+            if ordering is not None:
+                remaining = len(moves) if limit is None else limit - depth
+                ordering.record_cutoff(move, depth, remaining)
+
+        if tt is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            stored, stored_flag = self._to_tt(int(best), depth, maximizing, flag)
+            tt.store(key, stored, draft, stored_flag)
         return int(best)
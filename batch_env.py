@@ -0,0 +1,163 @@
+"""Batched m,n,k game environment on NumPy arrays, for self-play and training data.
+
+Holds N boards in one ``(N, rows, cols)`` int8 array and advances all of them with a single
+vectorized step(). The rules match GameBoard.game_state(): a move that completes k in a row
+wins (even on the last empty cell), otherwise a full board is a draw. Requires numpy.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from game_board import DIRECTIONS, GameBoard
+
+
+# Cell values in `boards` (same codes as the Zobrist tables).
+EMPTY, X, O = 0, 1, 2
+SYMBOLS = (" ", "X", "O")
+
+# Values in `state`. X_WINS/O_WINS equal the winner's cell value.
+IN_PROGRESS, X_WINS, O_WINS, DRAW = 0, 1, 2, 3
+STATE_NAMES = ("IN_PROGRESS", "X_WINS", "O_WINS", "DRAW")
+
+
+@lru_cache(maxsize=None)
+def _cell_lines(rows: int, cols: int, k: int) -> np.ndarray:
+    """``(cells, L, k)`` flat cell indices of every k-line through each cell.
+
+    Cells on fewer than L lines repeat one of their lines, which leaves the win test unchanged.
+    """
+    per_cell: List[List[List[int]]] = [[] for _ in range(rows * cols)]
+    for dr, dc in DIRECTIONS:
+        for r in range(rows):
+            for c in range(cols):
+                end_r = r + (k - 1) * dr
+                end_c = c + (k - 1) * dc
+                if not (0 <= end_r < rows and 0 <= end_c < cols):
+                    continue
+                line = [(r + i * dr) * cols + (c + i * dc) for i in range(k)]
+                for idx in line:
+                    per_cell[idx].append(line)
+    width = max(len(lines) for lines in per_cell)
+    table = np.empty((rows * cols, width, k), dtype=np.intp)
+    for idx, lines in enumerate(per_cell):
+        table[idx] = lines + [lines[0]] * (width - len(lines))
+    table.setflags(write=False)
+    return table
+
+
+class BatchEnv:
+    """N independent games stepped together.
+
+    Moves are flat cell indices (``row * cols + col``). With auto_reset, a board whose game
+    ends is cleared straight after the step that ended it, so every board is always playable.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        rows: int = 3,
+        cols: Optional[int] = None,
+        k: Optional[int] = None,
+        auto_reset: bool = True,
+    ) -> None:
+        cols = rows if cols is None else cols
+        k = min(rows, cols) if k is None else k
+        if not (1 <= k <= max(rows, cols)):
+            raise ValueError("k must be between 1 and the longest side")
+        self.n = n
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.auto_reset = auto_reset
+
+        self.boards = np.zeros((n, rows, cols), dtype=np.int8)
+        # Flat view of the same memory: (n, cells).
+        self._flat = self.boards.reshape(n, self.cells)
+        self.to_move = np.full(n, X, dtype=np.int8)
+        self.ply = np.zeros(n, dtype=np.int16)
+        self.state = np.full(n, IN_PROGRESS, dtype=np.int8)
+        # Games finished so far, by result (index = state value).
+        self.results = np.zeros(4, dtype=np.int64)
+
+        self._lines = _cell_lines(rows, cols, k)
+        self._all = np.arange(n)
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> None:
+        """Clear every board, or only those where `mask` is True."""
+        if mask is None:
+            self.boards[:] = EMPTY
+            self.to_move[:] = X
+            self.ply[:] = 0
+            self.state[:] = IN_PROGRESS
+            return
+        self.boards[mask] = EMPTY
+        self.to_move[mask] = X
+        self.ply[mask] = 0
+        self.state[mask] = IN_PROGRESS
+
+    def legal_mask(self) -> np.ndarray:
+        """``(n, cells)`` bool: empty cells of games still in progress."""
+        return (self._flat == EMPTY) & (self.state == IN_PROGRESS)[:, None]
+
+    def sample_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """A uniformly random legal move for each board (0 for finished boards)."""
+        scores = rng.random((self.n, self.cells))
+        scores[~self.legal_mask()] = -1.0
+        return scores.argmax(axis=1)
+
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        """Play one move on every board for its side to move. Returns the states after it.
+
+        Boards that are already finished (only possible without auto_reset) ignore their
+        move. Raises ValueError if a move on an unfinished board is off the board or taken.
+        """
+        moves = np.asarray(moves, dtype=np.intp)
+        if moves.shape != (self.n,):
+            raise ValueError(f"expected {self.n} moves, got shape {moves.shape}")
+        if self.auto_reset:
+            idx = self._all
+        else:
+            idx = np.flatnonzero(self.state == IN_PROGRESS)
+            moves = moves[idx]
+        if ((moves < 0) | (moves >= self.cells)).any():
+            raise ValueError("move outside the board")
+        flat = self._flat
+        if (flat[idx, moves] != EMPTY).any():
+            raise ValueError("move on an occupied cell")
+
+        player = self.to_move[idx]
+        flat[idx, moves] = player
+        ply = self.ply[idx] + 1
+        self.ply[idx] = ply
+
+        # Only lines through the new stone can have been completed.
+        line_cells = self._lines[moves]
+        values = flat[idx[:, None, None], line_cells]
+        won = (values == player[:, None, None]).all(axis=2).any(axis=1)
+        state = np.where(won, player, np.where(ply == self.cells, DRAW, IN_PROGRESS)).astype(np.int8)
+        self.state[idx] = state
+        self.to_move[idx] = 3 - player
+
+        self.results += np.bincount(state, minlength=4)
+        self.results[IN_PROGRESS] = 0
+        result = self.state.copy()
+        if self.auto_reset:
+            done = result != IN_PROGRESS
+            if done.any():
+                self.reset(done)
+        return result
+
+    def game_state(self, i: int) -> str:
+        """GameBoard-style state name of board `i`."""
+        return STATE_NAMES[self.state[i]]
+
+    def to_game_board(self, i: int) -> GameBoard:
+        """Board `i` as a GameBoard (for display or cross-checking)."""
+        board = GameBoard(self.rows, self.cols, self.k)
+        board.grid = [[SYMBOLS[v] for v in row] for row in self.boards[i].tolist()]
+        return board
@@ -0,0 +1,738 @@
+"""Micro-benchmarks for the hot paths of the game engine.
+
+Run with:
+
+    python benchmarks.py
+
+For a regression check, run the suite. It writes machine-readable results, compares them
+with the stored baselines and exits with status 1 if any result got worse than the
+tolerance allows:
+
+    python benchmarks.py --suite --json results.json
+    python benchmarks.py --suite --update-baseline   # after an intended change
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+from dataclasses import asdict, dataclass, replace
+from math import inf
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ai_player import AIPlayer
+from bitboard import BitBoard
+from game_board import GameBoard, Move
+from mcts_player import MCTSPlayer
+from move_ordering import HeuristicOrdering, MoveOrdering
+from online_net import _decode_binary, _encode, _encode_binary, _Receiver
+from transposition import TranspositionTable
+
+try:
+    import numpy as np
+
+    from batch_env import BatchEnv
+except ImportError:  # numpy is optional
+    np = None  # type: ignore
+    BatchEnv = None  # type: ignore
+
+
+# Mid-game position with no winner yet: X to move.
+MIDGAME: List[Move] = [(1, 1), (0, 0), (2, 2), (0, 2)]
+
+
+def _setup(board_cls: Callable[[], object], moves: List[Move]):
+    b = board_cls()
+    symbol = "X"
+    for r, c in moves:
+        b.place(r, c, symbol)
+        symbol = "O" if symbol == "X" else "X"
+    return b
+
+
+def _time_per_call(fn: Callable[[], object], number: int) -> float:
+    """Best-of-5 time per call in microseconds."""
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def _time_per_call_auto(fn: Callable[[], object], min_s: float = 0.05) -> float:
+    """_time_per_call with enough calls per repeat to take `min_s`, so that fast operations
+    are timed over a window long enough to average out scheduler noise."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_s:
+        number *= 2
+    return _time_per_call(fn, number)
+
+
+def bench_board(number: int = 20000) -> Dict[str, Tuple[float, float]]:
+    """Time board operations for GameBoard vs BitBoard. Returns {op: (list_us, bit_us)}."""
+    results: Dict[str, Tuple[float, float]] = {}
+    boards = {name: _setup(cls, MIDGAME) for name, cls in (("list", GameBoard), ("bit", BitBoard))}
+
+    ops: Dict[str, Callable[[object], Callable[[], object]]] = {
+        "winner": lambda b: b.winner,
+        "game_state": lambda b: b.game_state,
+        "available_moves": lambda b: lambda: list(b.available_moves()),
+        "copy": lambda b: b.copy,
+    }
+    for op, make in ops.items():
+        results[op] = (
+            _time_per_call(make(boards["list"]), number),
+            _time_per_call(make(boards["bit"]), number),
+        )
+    return results
+
+
+BOARD_SHAPES: List[Tuple[int, int, int]] = [(3, 3, 3), (4, 4, 4), (7, 7, 5), (15, 15, 5), (19, 19, 5)]
+
+
+def bench_win_detection(number: int = 20000) -> Dict[Tuple[int, int, int], Tuple[float, float]]:
+    """push + game_state + pop on a half-filled board for each shape (us/call, list vs bit board).
+
+    The win check only walks the lines through the last move, so the cost should stay flat
+    as the board grows.
+    """
+    results: Dict[Tuple[int, int, int], Tuple[float, float]] = {}
+    for shape in BOARD_SHAPES:
+        timings = []
+        for cls in (GameBoard, BitBoard):
+            b = cls(*shape)
+            rng = random.Random(1)
+            cells = [(r, c) for r in range(shape[0]) for c in range(shape[1])]
+            rng.shuffle(cells)
+            symbol = "X"
+            for move in cells[: len(cells) // 2]:
+                b.push(move, symbol)
+                if b.game_state() != "IN_PROGRESS":
+                    b.pop()
+                    continue
+                symbol = "O" if symbol == "X" else "X"
+            move = next(iter(b.available_moves()))
+
+            def step(b=b, move=move, symbol=symbol) -> None:
+                b.push(move, symbol)
+                b.game_state()
+                b.pop()
+
+            timings.append(_time_per_call(step, number))
+        results[shape] = (timings[0], timings[1])
+    return results
+
+
+class _CopyingAI(AIPlayer):
+    """Reference search that allocates a board copy per child node (the pre push/pop design)."""
+
+    def choose_move(self, board):
+        best_score = -inf
+        best_move = None
+        for move in board.available_moves():
+            b2 = board.copy()
+            b2.place(move[0], move[1], self.symbol)
+            score = self._minimax(b2, 1, False, -inf, inf)
+            if score > best_score:
+                best_score = score
+                best_move = move
+        return best_move
+
+    def _minimax(self, board, depth, maximizing, alpha, beta):
+        terminal = self._terminal_score(board, depth)
+        if terminal is not None:
+            return terminal
+        best = -inf if maximizing else inf
+        symbol = self.symbol if maximizing else self.opponent
+        for move in board.available_moves():
+            b2 = board.copy()
+            b2.place(move[0], move[1], symbol)
+            val = self._minimax(b2, depth + 1, not maximizing, alpha, beta)
+            if maximizing:
+                best = max(best, val)
+                alpha = max(alpha, best)
+            else:
+                best = min(best, val)
+                beta = min(beta, best)
+            if beta <= alpha:
+                break
+        return int(best)
+
+
+def _count_nodes(ai: AIPlayer) -> List[int]:
+    """Wrap ai._minimax on the instance so every visited node is counted."""
+    counter = [0]
+    inner = ai._minimax
+
+    def counted(*args, **kwargs):
+        counter[0] += 1
+        return inner(*args, **kwargs)
+
+    ai._minimax = counted  # type: ignore[method-assign]
+    return counter
+
+
+def bench_search_allocations(board_cls: Callable[[], object] = GameBoard) -> Dict[str, Dict[str, float]]:
+    """Full search from the empty board: copy-per-node vs in-place push()/pop().
+
+    Reports nodes, time per node, board copies per node (each copy is a new board object,
+    its __dict__, the cell storage and the move stack) and peak traced heap memory (KiB).
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for name, cls in (("copy", _CopyingAI), ("push/pop", AIPlayer)):
+        ai = cls(symbol="X", tt=None, use_solved_table=False)
+        nodes = _count_nodes(ai)
+        board = board_cls()
+
+        copies = [0]
+        original_copy = board_cls.copy
+
+        def counting_copy(self):
+            copies[0] += 1
+            return original_copy(self)
+
+        board_cls.copy = counting_copy
+        try:
+            ai.choose_move(board)
+        finally:
+            board_cls.copy = original_copy
+        node_count = nodes[0]
+
+        start = time.perf_counter()
+        ai.choose_move(board)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        ai.choose_move(board)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            "nodes": node_count,
+            "copies_per_node": copies[0] / node_count,
+            "us_per_node": elapsed / node_count * 1e6,
+            "peak_kib": peak / 1024,
+        }
+    return results
+
+
+def bench_transposition(board_cls: Callable[[], object] = BitBoard) -> Dict[str, Dict[str, float]]:
+    """Two consecutive full searches from the empty board: no table, table on raw position
+    keys, and table on symmetry-canonical keys."""
+    results: Dict[str, Dict[str, float]] = {}
+    variants = (
+        ("no table", None, False),
+        ("raw keys", TranspositionTable(), False),
+        ("canonical", TranspositionTable(), True),
+    )
+    for name, tt, use_symmetry in variants:
+        ai = AIPlayer(symbol="X", tt=tt, use_symmetry=use_symmetry, use_solved_table=False)
+        nodes = _count_nodes(ai)
+        row: Dict[str, float] = {}
+        for run in ("cold", "warm"):
+            nodes[0] = 0
+            start = time.perf_counter()
+            ai.choose_move(board_cls())
+            row[f"{run}_ms"] = (time.perf_counter() - start) * 1000
+            row[f"{run}_nodes"] = nodes[0]
+        row["hit_rate"] = tt.hit_rate if tt is not None else 0.0
+        row["entries"] = len(tt) if tt is not None else 0
+        results[name] = row
+    return results
+
+
+# (label, (rows, cols, k), moves played so far, max_depth) searched by bench_move_ordering.
+ORDERING_POSITIONS: List[Tuple[str, Tuple[int, int, int], List[Move], Optional[int]]] = [
+    ("3x3 empty", (3, 3, 3), [], None),
+    ("3x3 corner", (3, 3, 3), [(0, 0)], None),
+    ("3x3 midgame", (3, 3, 3), MIDGAME, None),
+    ("4x4 empty d4", (4, 4, 4), [], 4),
+    ("4x4 opening d5", (4, 4, 4), [(1, 1), (2, 2)], 5),
+    ("5x5 k4 d3", (5, 5, 4), [(2, 2)], 3),
+]
+
+ORDERINGS: List[Tuple[str, Callable[[], Optional[MoveOrdering]]]] = [
+    ("board order", lambda: None),
+    ("static", lambda: HeuristicOrdering(tactical=False, killers=False, history=False)),
+    ("+tactical", lambda: HeuristicOrdering(killers=False, history=False)),
+    ("+killer/hist", lambda: HeuristicOrdering()),
+]
+
+
+def bench_move_ordering() -> Dict[str, Dict[str, Tuple[int, float]]]:
+    """Nodes and ms of one choose_move per position and ordering (no transposition table)."""
+    results: Dict[str, Dict[str, Tuple[int, float]]] = {}
+    for label, shape, moves, depth in ORDERING_POSITIONS:
+        row: Dict[str, Tuple[int, float]] = {}
+        for name, make in ORDERINGS:
+            board = _setup(lambda: BitBoard(*shape), moves)
+            symbol = "X" if len(moves) % 2 == 0 else "O"
+            ai = AIPlayer(symbol=symbol, max_depth=depth, tt=None, use_solved_table=False, ordering=make())
+            start = time.perf_counter()
+            ai.choose_move(board)
+            row[name] = (ai._nodes, (time.perf_counter() - start) * 1000)
+        results[label] = row
+    return results
+
+
+def bench_mcts(budget_ms: int = 500) -> Dict[Tuple[int, int, int], Dict[str, float]]:
+    """MCTS playouts per second from the empty board, per shape and playout policy (BitBoard).
+
+    Multiply by the per-move budget to see how many playouts a difficulty level gets.
+    """
+    results: Dict[Tuple[int, int, int], Dict[str, float]] = {}
+    for shape in BOARD_SHAPES:
+        row: Dict[str, float] = {}
+        for policy in ("random", "tactical"):
+            player = MCTSPlayer("X", playouts=None, time_budget_ms=budget_ms, playout_policy=policy, seed=1)
+            player.choose_move(BitBoard(*shape))
+            row[policy] = player.playouts_per_second
+        results[shape] = row
+    return results
+
+
+def bench_batch_env(n: int = 8192, seconds: float = 1.0) -> Dict[Tuple[int, int, int], Tuple[float, float]]:
+    """Random self-play in BatchEnv: (steps/s for step() alone, steps/s including move sampling)."""
+    results: Dict[Tuple[int, int, int], Tuple[float, float]] = {}
+    rng = np.random.default_rng(1)
+    for shape in BOARD_SHAPES:
+        env = BatchEnv(n, *shape)
+        step_s = 0.0
+        steps = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            moves = env.sample_moves(rng)
+            t = time.perf_counter()
+            env.step(moves)
+            step_s += time.perf_counter() - t
+            steps += n
+        results[shape] = (steps / step_s, steps / (time.perf_counter() - start))
+    return results
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks_baseline.json")
+
+# Positions for the choose_move part of the suite: name -> (shape, moves played, max_depth).
+SUITE_POSITIONS: Dict[str, Tuple[Tuple[int, int, int], List[Move], Optional[int]]] = {
+    "3x3_empty": ((3, 3, 3), [], None),
+    "3x3_corner": ((3, 3, 3), [(0, 0)], None),
+    "3x3_midgame": ((3, 3, 3), MIDGAME, None),
+    "4x4_opening_d4": ((4, 4, 4), [(1, 1), (2, 2)], 4),
+    "7x7_k5_d2": ((7, 7, 5), [(3, 3)], 2),
+}
+
+# A typical online 'sync' message.
+SYNC_PAYLOAD = {
+    "type": "sync",
+    "grid": [["X", " ", "O"], [" ", "X", " "], [" ", " ", "O"]],
+    "turn": "X",
+    "rows": 3,
+    "cols": 3,
+    "k": 3,
+    "hash": 0x5DEECE66D5DEECE6,
+}
+
+
+@dataclass
+class SuiteResult:
+    value: float
+    unit: str
+    lower_is_better: bool = True
+    # Timings are compared relative to the calibration loop; counts (nodes) as they are.
+    timed: bool = True
+    # Allowed slowdown for this result when it is noisier than --tolerance (e.g. socket I/O).
+    tolerance: Optional[float] = None
+
+
+class SuiteSkipped(Exception):
+    """A suite cannot run here (no display, ...); anything else it raises is a failure."""
+
+
+def calibrate(rounds: int = 3) -> float:
+    """us for a fixed pure-Python workload, used to factor out machine speed and CPU scaling.
+
+    The median of several rounds, so one scheduler hiccup does not skew every result.
+    """
+    return statistics.median(_time_per_call_auto(lambda: sum(i * i for i in range(1000))) for _ in range(rounds))
+
+
+def suite_board() -> Dict[str, SuiteResult]:
+    """GameBoard/BitBoard winner, game_state and available_moves on a mid-game position."""
+    results: Dict[str, SuiteResult] = {}
+    for label, cls in (("GameBoard", GameBoard), ("BitBoard", BitBoard)):
+        b = _setup(cls, MIDGAME)
+        for op, fn in (
+            ("winner", b.winner),
+            ("game_state", b.game_state),
+            ("available_moves", lambda b=b: list(b.available_moves())),
+        ):
+            results[f"board.{label}.{op}"] = SuiteResult(_time_per_call_auto(fn), "us")
+    return results
+
+
+def suite_ai() -> Dict[str, SuiteResult]:
+    """choose_move from fixed positions: time and node count (no solved table, fresh cache)."""
+    results: Dict[str, SuiteResult] = {}
+    for name, (shape, moves, depth) in SUITE_POSITIONS.items():
+        times = []
+        for _ in range(5):
+            board = _setup(lambda: GameBoard(*shape), moves)
+            symbol = "X" if len(moves) % 2 == 0 else "O"
+            ai = AIPlayer(symbol=symbol, max_depth=depth, use_solved_table=False)
+            start = time.perf_counter()
+            ai.choose_move(board)
+            times.append((time.perf_counter() - start) * 1000)
+        results[f"ai.{name}.ms"] = SuiteResult(min(times), "ms")
+        results[f"ai.{name}.nodes"] = SuiteResult(ai._nodes, "nodes", timed=False)
+    return results
+
+
+def _net_throughput(binary: bool, messages: int) -> float:
+    """Sync messages per second through online_net's receiver over a socket pair."""
+    sender, sock = socket.socketpair()
+    received = [0]
+    done = threading.Event()
+    stop = threading.Event()
+
+    def on_message(_msg: dict) -> None:
+        received[0] += 1
+        if received[0] == messages:
+            done.set()
+
+    receiver = _Receiver()
+    receiver.binary = binary
+
+    def read() -> None:
+        # What the event loop does for a BufferedProtocol: recv_into the buffer, then parse.
+        sock.settimeout(0.5)
+        while not stop.is_set():
+            try:
+                n = sock.recv_into(receiver.get_buffer())
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not n:
+                break
+            receiver.feed(n, on_message)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    start = time.perf_counter()
+    for _ in range(messages):
+        sender.sendall(_encode(SYNC_PAYLOAD, binary))
+    done.wait(30)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sender.close()
+    reader.join()
+    sock.close()
+    return received[0] / elapsed
+
+
+def suite_net(messages: int = 20000) -> Dict[str, SuiteResult]:
+    """online_net framing (JSON lines and binary): encode/decode cost and socket-pair throughput."""
+    results: Dict[str, SuiteResult] = {}
+    line = json.dumps(SYNC_PAYLOAD, separators=(",", ":"))
+    results["net.json_encode"] = SuiteResult(_time_per_call_auto(lambda: _encode(SYNC_PAYLOAD, False)), "us")
+    results["net.json_decode"] = SuiteResult(_time_per_call_auto(lambda: json.loads(line)), "us")
+    payload = bytearray(_encode_binary(SYNC_PAYLOAD))
+    results["net.binary_encode"] = SuiteResult(_time_per_call_auto(lambda: _encode(SYNC_PAYLOAD, True)), "us")
+    results["net.binary_decode"] = SuiteResult(
+        _time_per_call_auto(lambda: _decode_binary(payload, 0, len(payload))), "us"
+    )
+    # Socket throughput depends on the kernel and scheduler more than on CPU speed: not scaled
+    # by the calibration loop, and allowed to drop to half before it counts.
+    for key, binary in (("net.json_lines_per_s", False), ("net.binary_frames_per_s", True)):
+        results[key] = SuiteResult(
+            _net_throughput(binary, messages), "msg/s", lower_is_better=False, timed=False, tolerance=1.0
+        )
+    return results
+
+
+def suite_relay(rounds: int = 200) -> Dict[str, SuiteResult]:
+    """Median round trip through the render_server relay (in-process, fastapi TestClient)."""
+    from fastapi.testclient import TestClient
+
+    import render_server
+
+    # One portal for the whole client, so both sockets share the relay's event loop.
+    with TestClient(render_server.app) as client:
+        return _relay_checks(client, rounds)
+
+
+def _relay_checks(client, rounds: int) -> Dict[str, SuiteResult]:
+    samples = []
+    with client.websocket_connect("/ws?room=bench") as a, client.websocket_connect("/ws?room=bench") as b:
+        for ws in (a, b):
+            ws.receive_json()  # hello
+            ws.receive_json()  # ready
+        move = json.dumps({"type": "move", "row": 0, "col": 0})
+        for _ in range(rounds):
+            start = time.perf_counter()
+            a.send_text(move)
+            b.receive_text()
+            b.send_text(move)
+            a.receive_text()
+            samples.append((time.perf_counter() - start) * 1000)
+    results = {"relay.rtt_ms": SuiteResult(statistics.median(samples), "ms")}
+
+    # /analyze: a correct answer, then the requests it must turn away.
+    grid = [["X", "X", " "], ["O", "O", " "], [" ", " ", " "]]
+    samples = []
+    for _ in range(20):
+        start = time.perf_counter()
+        response = client.post("/analyze", json=[grid])
+        samples.append((time.perf_counter() - start) * 1000)
+    best = response.json()[0][0] if response.status_code == 200 else None
+    if best is None or (best["row"], best["col"]) != (0, 2) or best["score"] <= 0:
+        raise RuntimeError(f"/analyze gave {response.status_code} {response.text[:200]}")
+    rejected = {
+        "illegal counts": client.post("/analyze", json=[[["O", "O", " "], [" "] * 3, [" "] * 3]]),
+        "already won": client.post("/analyze", json=[[["X", "X", "X"], ["O", "O", " "], [" "] * 3]]),
+        "too much work": client.post("/analyze?depth=4&k=5", json=[_grid_19x19(i) for i in range(20)]),
+    }
+    for reason, response in rejected.items():
+        if response.status_code != 400:
+            raise RuntimeError(f"/analyze accepted a request with {reason}: {response.status_code}")
+    results["relay.analyze_ms"] = SuiteResult(statistics.median(samples), "ms")
+    return results
+
+
+def _grid_19x19(cell: int) -> List[List[str]]:
+    grid = [[" "] * 19 for _ in range(19)]
+    grid[cell // 19][cell % 19] = "X"
+    return grid
+
+
+def suite_gui(number: int = 50) -> Dict[str, SuiteResult]:
+    """_sync_ui_from_state redraw cost on a hidden Tk root, per board shape."""
+    import tkinter as tk
+
+    from gui_tk import TicTacToeGUI
+
+    results: Dict[str, SuiteResult] = {}
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:  # no display
+        raise SuiteSkipped(f"TclError: {exc}") from exc
+    root.withdraw()
+    gui = TicTacToeGUI(root)
+    try:
+        for label, shape in (("3x3", (3, 3, 3)), ("15x15", (15, 15, 5))):
+            gui._apply_board_shape(*shape)
+            symbol = "X"
+            for move in [(0, 0), (1, 1), (2, 0), (0, 2)]:
+                gui.controller.board.place(move[0], move[1], symbol)
+                symbol = "O" if symbol == "X" else "X"
+            gui._sync_ui_from_state()
+            results[f"gui.sync_ui.{label}"] = SuiteResult(_time_per_call(gui._sync_ui_from_state, number) / 1000, "ms")
+    finally:
+        gui._on_close()
+    return results
+
+
+SUITES: Dict[str, Callable[[], Dict[str, SuiteResult]]] = {
+    "board": suite_board,
+    "ai": suite_ai,
+    "net": suite_net,
+    "relay": suite_relay,
+    "gui": suite_gui,
+}
+
+
+def run_suite(runs: int = 1) -> Tuple[Dict[str, SuiteResult], Dict[str, str], float]:
+    """Run every suite `runs` times and keep the median of each result.
+
+    The calibration loop runs between suites. Each timed sample is first divided by the
+    mean calibration just before and after its suite, so a machine that slows down for part
+    of the run does not skew that part alone; the medians are then scaled back by the median
+    calibration, which is what gets compared with the baseline's.
+
+    Returns (results, {suite: reason} for suites that could not run, median calibration us).
+    """
+    samples: Dict[str, List[SuiteResult]] = {}
+    skipped: Dict[str, str] = {}
+    calibrations = [calibrate()]
+    for _ in range(runs):
+        for name, fn in SUITES.items():
+            if name in skipped:
+                continue
+            try:
+                suite_results = fn()
+            except ImportError as exc:
+                skipped[name] = f"missing dependency: {exc.name}"
+                continue
+            except SuiteSkipped as exc:
+                skipped[name] = str(exc)
+                continue
+            calibrations.append(calibrate())
+            local = (calibrations[-2] + calibrations[-1]) / 2
+            for key, result in suite_results.items():
+                if result.timed:
+                    result = replace(result, value=result.value / local)
+                samples.setdefault(key, []).append(result)
+    calibration = statistics.median(calibrations)
+    results = {}
+    for key, values in samples.items():
+        value = statistics.median(r.value for r in values)
+        results[key] = replace(values[0], value=value * calibration if values[0].timed else value)
+    return results, skipped, calibration
+
+
+def find_regressions(
+    results: Dict[str, SuiteResult],
+    calibration: float,
+    baseline: Dict[str, dict],
+    baseline_calibration: float,
+    tolerance: float,
+) -> List[str]:
+    """Descriptions of results that are worse than their baseline by more than `tolerance`,
+    or that have no baseline at all (so that nothing that ran goes unchecked).
+
+    Timed results are first scaled by how much faster or slower the calibration loop ran.
+    """
+    regressions = []
+    speed = calibration / baseline_calibration
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            regressions.append(f"{name}: not in the baseline (record it with --update-baseline)")
+            continue
+        if not base["value"]:
+            continue
+        ratio = result.value / base["value"]
+        if result.timed:
+            ratio = ratio / speed if result.lower_is_better else ratio * speed
+        allowed = max(tolerance, result.tolerance or 0.0)
+        worse = ratio > 1 + allowed if result.lower_is_better else ratio < 1 / (1 + allowed)
+        if worse:
+            regressions.append(
+                f"{name}: {result.value:.4g} {result.unit} vs baseline {base['value']:.4g} ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main_suite(args: argparse.Namespace) -> int:
+    results, skipped, calibration = run_suite(args.runs)
+    print(f"{'calibration':<34}{calibration:>14.4g} us")
+    for name, result in results.items():
+        print(f"{name:<34}{result.value:>14.4g} {result.unit}")
+    for name, reason in skipped.items():
+        print(f"{name:<34}{'skipped':>14} ({reason})")
+
+    document = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "calibration_us": calibration,
+        "results": {name: asdict(result) for name, result in results.items()},
+        "skipped": skipped,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        stored = json.load(f)
+    regressions = find_regressions(
+        results, calibration, stored["results"], stored.get("calibration_us", calibration), args.tolerance
+    )
+    if regressions:
+        print()
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print()
+    print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks for the game engine, AI, network and GUI.")
+    parser.add_argument("--suite", action="store_true", help="run the regression suite instead of the report")
+    parser.add_argument("--json", help="write suite results to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--runs", type=int, default=3, help="suite runs; medians are kept (default: %(default)s)")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3, help="allowed slowdown before failing (default: %(default)s)"
+    )
+    args = parser.parse_args()
+    if args.suite:
+        sys.exit(main_suite(args))
+    report()
+
+
+def report() -> None:
+    print("Board operations (us/call, lower is better)")
+    print(f"{'op':<18}{'GameBoard':>12}{'BitBoard':>12}{'speedup':>10}")
+    for op, (list_us, bit_us) in bench_board().items():
+        print(f"{op:<18}{list_us:>12.3f}{bit_us:>12.3f}{list_us / bit_us:>9.1f}x")
+
+    print()
+    print("Move + win check + undo by board shape (us/call)")
+    print(f"{'rows x cols, k':<18}{'GameBoard':>12}{'BitBoard':>12}")
+    for (rows, cols, k), (list_us, bit_us) in bench_win_detection().items():
+        print(f"{f'{rows}x{cols}, k={k}':<18}{list_us:>12.3f}{bit_us:>12.3f}")
+
+    for label, cls in (("GameBoard", GameBoard), ("BitBoard", BitBoard)):
+        print()
+        print(f"Full search from the empty board ({label})")
+        print(f"{'variant':<12}{'nodes':>10}{'copies/node':>13}{'us/node':>10}{'peak KiB':>10}")
+        for name, row in bench_search_allocations(cls).items():
+            print(
+                f"{name:<12}{row['nodes']:>10.0f}{row['copies_per_node']:>13.2f}"
+                f"{row['us_per_node']:>10.2f}{row['peak_kib']:>10.1f}"
+            )
+
+    print()
+    print("Transposition table, two full searches from the empty board (BitBoard)")
+    print(f"{'variant':<12}{'cold ms':>10}{'nodes':>10}{'warm ms':>10}{'nodes':>10}{'hit rate':>10}{'entries':>10}")
+    for name, row in bench_transposition().items():
+        print(
+            f"{name:<12}{row['cold_ms']:>10.1f}{row['cold_nodes']:>10.0f}"
+            f"{row['warm_ms']:>10.1f}{row['warm_nodes']:>10.0f}{row['hit_rate']:>10.2f}{row['entries']:>10.0f}"
+        )
+
+    print()
+    print("Move ordering: nodes (ms) per choose_move, no transposition table")
+    print(f"{'position':<16}" + "".join(f"{name:>20}" for name, _ in ORDERINGS))
+    for label, row in bench_move_ordering().items():
+        cells = "".join(f"{f'{nodes} ({ms:.0f})':>20}" for nodes, ms in row.values())
+        print(f"{label:<16}{cells}")
+
+    print()
+    print("MCTS playouts per second from the empty board (BitBoard)")
+    print(f"{'rows x cols, k':<18}{'random':>12}{'tactical':>12}")
+    for (rows, cols, k), row in bench_mcts().items():
+        print(f"{f'{rows}x{cols}, k={k}':<18}{row['random']:>12.0f}{row['tactical']:>12.0f}")
+
+    print()
+    if BatchEnv is None:
+        print("BatchEnv: skipped (numpy is not installed)")
+    else:
+        print("BatchEnv random self-play, 8192 boards (steps/s)")
+        print(f"{'rows x cols, k':<18}{'step':>14}{'with sampling':>16}")
+        for (rows, cols, k), (step_rate, total_rate) in bench_batch_env().items():
+            print(f"{f'{rows}x{cols}, k={k}':<18}{step_rate:>14,.0f}{total_rate:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
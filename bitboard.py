@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from game_board import DIRECTIONS, Move, _base3_weights, _symmetry_zobrist, _zobrist_hashes, symmetries
+
+
+@lru_cache(maxsize=None)
+def _cell_line_masks(rows: int, cols: int, k: int) -> Tuple[Tuple[int, ...], ...]:
+    """For every cell, the masks of all k-long lines through it (row, column, both diagonals)."""
+    per_cell: List[List[int]] = [[] for _ in range(rows * cols)]
+    for dr, dc in DIRECTIONS:
+        for r in range(rows):
+            for c in range(cols):
+                end_r = r + (k - 1) * dr
+                end_c = c + (k - 1) * dc
+                if not (0 <= end_r < rows and 0 <= end_c < cols):
+                    continue
+                cells = [(r + i * dr) * cols + (c + i * dc) for i in range(k)]
+                mask = 0
+                for idx in cells:
+                    mask |= 1 << idx
+                for idx in cells:
+                    per_cell[idx].append(mask)
+    return tuple(tuple(masks) for masks in per_cell)
+
+
+@lru_cache(maxsize=None)
+def _symmetry_bits(rows: int, cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """``_symmetry_bits(rows, cols)[s][i]`` is the bit that cell ``i`` maps to under symmetry ``s``."""
+    return tuple(tuple(1 << j for j in perm) for perm in symmetries(rows, cols))
+
+
+def _permute(bits: int, table: Tuple[int, ...]) -> int:
+    out = 0
+    while bits:
+        low = bits & -bits
+        out |= table[low.bit_length() - 1]
+        bits ^= low
+    return out
+
+
+@dataclass
+class BitBoard:
+    """Drop-in replacement for GameBoard that stores each player's cells as an int mask.
+
+    Bit ``r * cols + c`` is set in ``x_bits``/``o_bits`` when X/O occupies (r, c).
+    Each move checks only the precomputed k-line masks through the placed cell.
+    """
+
+    size: int = 3
+    cols: Optional[int] = None
+    k: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.cols is None:
+            self.cols = self.size
+        if self.k is None:
+            self.k = min(self.size, self.cols)
+        if not (1 <= self.k <= max(self.size, self.cols)):
+            raise ValueError("k must be between 1 and the longest side")
+        self._cell_lines = _cell_line_masks(self.size, self.cols, self.k)
+        self._full = (1 << (self.size * self.cols)) - 1
+        self.reset()
+
+    @property
+    def rows(self) -> int:
+        return self.size
+
+    def reset(self) -> None:
+        self.x_bits = 0
+        self.o_bits = 0
+        # Cell indices of placed symbols, most recent last.
+        self._stack: List[int] = []
+        # Base-3 code of the position (see position_index), updated per move.
+        self._index = 0
+        # Zobrist hash of the board under each symmetry (index 0 is the board itself).
+        self._hashes: List[int] = [0] * len(symmetries(self.size, self.cols))
+        self._winner: Optional[str] = None
+        self._win_mask = 0
+        # Stack depth right after the winning move (undoing it clears the winner).
+        self._win_ply = 0
+
+    def copy(self) -> "BitBoard":
+        b = BitBoard(self.size, self.cols, self.k)
+        b.x_bits = self.x_bits
+        b.o_bits = self.o_bits
+        b._stack = self._stack[:]
+        b._index = self._index
+        b._hashes = self._hashes[:]
+        b._winner = self._winner
+        b._win_mask = self._win_mask
+        b._win_ply = self._win_ply
+        return b
+
+    @property
+    def grid(self) -> List[List[str]]:
+        """List-of-lists view for code written against GameBoard (read-only snapshot)."""
+        cols = self.cols
+        rows = []
+        for r in range(self.size):
+            row = []
+            for c in range(cols):
+                bit = 1 << (r * cols + c)
+                row.append("X" if self.x_bits & bit else "O" if self.o_bits & bit else " ")
+            rows.append(row)
+        return rows
+
+    @grid.setter
+    def grid(self, grid: List[List[str]]) -> None:
+        x_bits = 0
+        o_bits = 0
+        for r in range(self.size):
+            for c in range(self.cols):
+                cell = grid[r][c]
+                if cell == "X":
+                    x_bits |= 1 << (r * self.cols + c)
+                elif cell == "O":
+                    o_bits |= 1 << (r * self.cols + c)
+        self.x_bits = x_bits
+        self.o_bits = o_bits
+        self._stack = []
+        cells = self.size * self.cols
+        codes = [1 if x_bits >> i & 1 else 2 if o_bits >> i & 1 else 0 for i in range(cells)]
+        self._index = sum(code * w for code, w in zip(codes, _base3_weights(self.size, self.cols)))
+        self._hashes = _zobrist_hashes(self.size, self.cols, codes)
+        self._winner = None
+        self._win_mask = 0
+        self._win_ply = 0
+        for idx in range(cells):
+            for mask in self._cell_lines[idx]:
+                if x_bits & mask == mask or o_bits & mask == mask:
+                    self._winner = "X" if x_bits & mask == mask else "O"
+                    self._win_mask = mask
+                    return
+
+    def place(self, row: int, col: int, symbol: str) -> bool:
+        """Place symbol at (row, col). Returns False if invalid/occupied."""
+        if not (0 <= row < self.size and 0 <= col < self.cols):
+            return False
+        idx = row * self.cols + col
+        bit = 1 << idx
+        if (self.x_bits | self.o_bits) & bit:
+            return False
+        if symbol == "X":
+            self.x_bits |= bit
+            own = self.x_bits
+        else:
+            self.o_bits |= bit
+            own = self.o_bits
+        self._stack.append(idx)
+        self._index += (1 if symbol == "X" else 2) * _base3_weights(self.size, self.cols)[idx]
+        hashes = self._hashes
+        for s, key in enumerate(_symmetry_zobrist(self.size, self.cols)[idx][0 if symbol == "X" else 1]):
+            hashes[s] ^= key
+        if self._winner is None:
+            for mask in self._cell_lines[idx]:
+                if own & mask == mask:
+                    self._winner = "X" if symbol == "X" else "O"
+                    self._win_mask = mask
+                    self._win_ply = len(self._stack)
+                    break
+        return True
+
+    def push(self, move: Move, symbol: str) -> bool:
+        """Reversible place(): the move can be taken back with pop()."""
+        return self.place(move[0], move[1], symbol)
+
+    def pop(self) -> Move:
+        """Undo the most recent push()/place() and return its (row, col)."""
+        if self._winner is not None and len(self._stack) == self._win_ply:
+            self._winner = None
+            self._win_mask = 0
+        idx = self._stack.pop()
+        bit = 1 << idx
+        code = 1 if self.x_bits & bit else 2
+        self._index -= code * _base3_weights(self.size, self.cols)[idx]
+        hashes = self._hashes
+        for s, key in enumerate(_symmetry_zobrist(self.size, self.cols)[idx][code - 1]):
+            hashes[s] ^= key
+        self.x_bits &= ~bit
+        self.o_bits &= ~bit
+        return divmod(idx, self.cols)
+
+    @property
+    def ply(self) -> int:
+        """Number of moves that can currently be undone with pop()."""
+        return len(self._stack)
+
+    @property
+    def last_move(self) -> Optional[Move]:
+        if not self._stack:
+            return None
+        return divmod(self._stack[-1], self.cols)
+
+    @property
+    def zobrist(self) -> int:
+        """64-bit Zobrist hash of the position and side to move, updated in O(1) per move."""
+        return self._hashes[0]
+
+    @property
+    def canonical_hash(self) -> int:
+        """Zobrist hash of the canonical form; equal for all symmetric positions."""
+        return min(self._hashes)
+
+    def _shape_tag(self) -> int:
+        return (self.size << 16) | (self.cols << 8) | self.k
+
+    @property
+    def position_index(self) -> int:
+        """Base-3 code of the cells (see GameBoard.position_index), in O(1)."""
+        return self._index
+
+    @property
+    def position_key(self) -> int:
+        """Integer identifying this position (both masks, tagged with the board shape)."""
+        return (((self.x_bits << (self.size * self.cols)) | self.o_bits) << 24) | self._shape_tag()
+
+    def canonical(self) -> Tuple[int, int]:
+        """Returns (key, sym) for the canonical form of this position (see GameBoard.canonical)."""
+        cells = self.size * self.cols
+        best_key = -1
+        best_sym = 0
+        for sym, table in enumerate(_symmetry_bits(self.size, self.cols)):
+            key = (_permute(self.x_bits, table) << cells) | _permute(self.o_bits, table)
+            if best_key < 0 or key < best_key:
+                best_key = key
+                best_sym = sym
+        return (best_key << 24) | self._shape_tag(), best_sym
+
+    @property
+    def canonical_key(self) -> int:
+        """position_key of the canonical form; equal for all symmetric positions."""
+        return self.canonical()[0]
+
+    def available_moves(self) -> Iterable[Move]:
+        empty = ~(self.x_bits | self.o_bits) & self._full
+        cols = self.cols
+        while empty:
+            low = empty & -empty
+            idx = low.bit_length() - 1
+            yield divmod(idx, cols)
+            empty ^= low
+
+    def is_full(self) -> bool:
+        return (self.x_bits | self.o_bits) == self._full
+
+    def winner(self) -> Optional[str]:
+        """Returns 'X' or 'O' if there is a winner, else None."""
+        return self._winner
+
+    def winning_line(self) -> Optional[List[Move]]:
+        """Returns the (row, col) cells forming the winning line, or None."""
+        if self._winner is None:
+            return None
+        mask = self._win_mask
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(divmod(low.bit_length() - 1, self.cols))
+            mask ^= low
+        return cells
+
+    def game_state(self) -> str:
+        """One of: 'IN_PROGRESS', 'DRAW', 'X_WINS', 'O_WINS'."""
+        w = self._winner
+        if w == "X":
+            return "X_WINS"
+        if w == "O":
+            return "O_WINS"
+        if (self.x_bits | self.o_bits) == self._full:
+            return "DRAW"
+        return "IN_PROGRESS"
+
+    def __str__(self) -> str:
+        """Text display (useful for debugging or optional CLI usage)."""
+        rows = [" | ".join(row) for row in self.grid]
+        sep = "\n" + "-" * (self.cols * 4 - 3) + "\n"
+        return sep.join(rows)
@@ -1,101 +1,365 @@
 from __future__ import annotations
 
+import random
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable, List, Optional, Tuple
 
 
 Move = Tuple[int, int]  # (row, col)
 
+_CELL_CODE = {" ": 0, "X": 1, "O": 2}
+
+# Line directions checked through a cell: row, column, main diagonal, anti diagonal.
+DIRECTIONS: Tuple[Move, ...] = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+@lru_cache(maxsize=None)
+def symmetries(rows: int, cols: Optional[int] = None) -> Tuple[Tuple[int, ...], ...]:
+    """Symmetries of the board as cell-index permutations.
+
+    A square board has the 8 symmetries of the D4 group, a rectangular one only 4 (identity,
+    half turn and the two mirrors). ``symmetries(rows, cols)[s][i]`` is where cell ``i``
+    (``row * cols + col``) lands under symmetry ``s``. Index 0 is the identity.
+    """
+    cols = rows if cols is None else cols
+    n = rows - 1
+    m = cols - 1
+    transforms = [
+        lambda r, c: (r, c),  # identity
+        lambda r, c: (n - r, m - c),  # rotate 180
+        lambda r, c: (r, m - c),  # mirror left/right
+        lambda r, c: (n - r, c),  # mirror top/bottom
+    ]
+    if rows == cols:
+        transforms += [
+            lambda r, c: (c, n - r),  # rotate 90
+            lambda r, c: (n - c, r),  # rotate 270
+            lambda r, c: (c, r),  # main diagonal
+            lambda r, c: (n - c, n - r),  # anti diagonal
+        ]
+    tables = []
+    for t in transforms:
+        perm = []
+        for i in range(rows * cols):
+            r, c = t(*divmod(i, cols))
+            perm.append(r * cols + c)
+        tables.append(tuple(perm))
+    return tuple(tables)
+
+
+@lru_cache(maxsize=None)
+def inverse_symmetries(rows: int, cols: Optional[int] = None) -> Tuple[Tuple[int, ...], ...]:
+    """``inverse_symmetries(rows, cols)[s][j]`` is the cell that symmetry ``s`` moves onto ``j``."""
+    inverses = []
+    for perm in symmetries(rows, cols):
+        inv = [0] * len(perm)
+        for i, j in enumerate(perm):
+            inv[j] = i
+        inverses.append(tuple(inv))
+    return tuple(inverses)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(rows: int, cols: Optional[int] = None) -> Tuple[Tuple[int, int], ...]:
+    """Random 64-bit keys per cell: ``zobrist_keys(rows, cols)[i] == (key_for_X, key_for_O)``.
+
+    Seeded per board shape so every process (and both peers of an online game) agrees.
+    """
+    cols = rows if cols is None else cols
+    rng = random.Random(f"tic-tac-toe-zobrist-{rows}x{cols}")
+    return tuple((rng.getrandbits(64), rng.getrandbits(64)) for _ in range(rows * cols))
+
+
+# XORed in on every move so the hash also encodes the side to move.
+ZOBRIST_SIDE = random.Random("tic-tac-toe-zobrist-side").getrandbits(64)
+
+
+@lru_cache(maxsize=None)
+def zobrist_k_key(k: int) -> int:
+    """Key for the number in a row, XORed into search cache keys.
+
+    Position hashes depend only on the board size, but the same cells score differently
+    for another k, so anything caching scores by hash has to tell the variants apart.
+    """
+    return random.Random(f"tic-tac-toe-zobrist-k{k}").getrandbits(64)
+
+
+@lru_cache(maxsize=None)
+def _symmetry_zobrist(rows: int, cols: int) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+    """Per cell and symbol, the key (plus side-to-move toggle) to XOR into each symmetric hash."""
+    keys = zobrist_keys(rows, cols)
+    perms = symmetries(rows, cols)
+    table = []
+    for i in range(rows * cols):
+        table.append(
+            (
+                tuple(keys[perm[i]][0] ^ ZOBRIST_SIDE for perm in perms),
+                tuple(keys[perm[i]][1] ^ ZOBRIST_SIDE for perm in perms),
+            )
+        )
+    return tuple(table)
+
+
+def _zobrist_hashes(rows: int, cols: int, codes: List[int]) -> List[int]:
+    """Full recomputation of the symmetric hashes from cell codes (0 empty, 1 X, 2 O)."""
+    table = _symmetry_zobrist(rows, cols)
+    hashes = [0] * len(symmetries(rows, cols))
+    for i, code in enumerate(codes):
+        if code:
+            for s, key in enumerate(table[i][code - 1]):
+                hashes[s] ^= key
+    return hashes
+
+
+@lru_cache(maxsize=None)
+def _base3_weights(rows: int, cols: int) -> Tuple[int, ...]:
+    """``3 ** (cells - 1 - i)`` for each cell: cell 0 is the most significant base-3 digit."""
+    cells = rows * cols
+    return tuple(3 ** (cells - 1 - i) for i in range(cells))
+
+
+def to_canonical_move(move: Move, sym: int, rows: int, cols: Optional[int] = None) -> Move:
+    """Map a move on the real board to the canonical orientation given by ``sym``."""
+    cols = rows if cols is None else cols
+    return divmod(symmetries(rows, cols)[sym][move[0] * cols + move[1]], cols)
+
+
+def from_canonical_move(move: Move, sym: int, rows: int, cols: Optional[int] = None) -> Move:
+    """Map a move on the canonical orientation back to the real board."""
+    cols = rows if cols is None else cols
+    return divmod(inverse_symmetries(rows, cols)[sym][move[0] * cols + move[1]], cols)
+
 
 @dataclass
 class GameBoard:
-    """Represents a 3x3 Tic-Tac-Toe board and encapsulates all board rules."""
+    """Represents an m x n Tic-Tac-Toe board (k in a row wins) and encapsulates all board rules.
+
+    ``size`` is the number of rows; ``cols`` defaults to ``size`` and ``k`` to the shorter side,
+    so ``GameBoard()`` is the classic 3x3 game. Wins are detected incrementally: each move only
+    checks the 4 lines through the placed cell, so winner()/game_state() are O(1).
+    """
 
     size: int = 3
+    cols: Optional[int] = None
+    k: Optional[int] = None
 
     def __post_init__(self) -> None:
+        if self.cols is None:
+            self.cols = self.size
+        if self.k is None:
+            self.k = min(self.size, self.cols)
+        if not (1 <= self.k <= max(self.size, self.cols)):
+            raise ValueError("k must be between 1 and the longest side")
         self.reset()
 
+    @property
+    def rows(self) -> int:
+        return self.size
+
     def reset(self) -> None:
-        self.grid: List[List[str]] = [[" " for _ in range(self.size)] for _ in range(self.size)]
+        self._grid: List[List[str]] = [[" " for _ in range(self.cols)] for _ in range(self.size)]
+        # Cell indices (row * cols + col) of placed symbols, most recent last.
+        self._stack: List[int] = []
+        self._filled = 0
+        # Base-3 code of the position (see position_index), updated per move.
+        self._index = 0
+        # Zobrist hash of the board under each symmetry (index 0 is the board itself).
+        self._hashes: List[int] = [0] * len(symmetries(self.size, self.cols))
+        self._winner: Optional[str] = None
+        self._win_line: Optional[List[Move]] = None
+        # Stack depth right after the winning move (undoing it clears the winner).
+        self._win_ply = 0
 
     def copy(self) -> "GameBoard":
-        b = GameBoard(self.size)
-        b.grid = [row[:] for row in self.grid]
+        b = GameBoard(self.size, self.cols, self.k)
+        b._grid = [row[:] for row in self._grid]
+        b._stack = self._stack[:]
+        b._filled = self._filled
+        b._index = self._index
+        b._hashes = self._hashes[:]
+        b._winner = self._winner
+        b._win_line = self._win_line
+        b._win_ply = self._win_ply
         return b
 
+    @property
+    def grid(self) -> List[List[str]]:
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: List[List[str]]) -> None:
+        """Replace the whole position (e.g. from a network sync). Clears the undo stack."""
+        self._grid = [list(row) for row in grid]
+        self._stack = []
+        codes = [_CELL_CODE.get(cell, 0) for row in self._grid for cell in row]
+        self._filled = sum(1 for code in codes if code)
+        self._index = sum(code * w for code, w in zip(codes, _base3_weights(self.size, self.cols)))
+        self._hashes = _zobrist_hashes(self.size, self.cols, codes)
+        self._winner = None
+        self._win_line = None
+        self._win_ply = 0
+        for r in range(self.size):
+            for c in range(self.cols):
+                symbol = self._grid[r][c]
+                if symbol != " ":
+                    line = self._line_through(r, c, symbol)
+                    if line is not None:
+                        self._winner = symbol
+                        self._win_line = line
+                        return
+
     def place(self, row: int, col: int, symbol: str) -> bool:
         """Place symbol at (row, col). Returns False if invalid/occupied."""
-        if not (0 <= row < self.size and 0 <= col < self.size):
+        if not (0 <= row < self.size and 0 <= col < self.cols):
             return False
-        if self.grid[row][col] != " ":
+        if self._grid[row][col] != " ":
             return False
-        self.grid[row][col] = symbol
+        self._grid[row][col] = symbol
+        idx = row * self.cols + col
+        self._stack.append(idx)
+        self._filled += 1
+        self._index += (1 if symbol == "X" else 2) * _base3_weights(self.size, self.cols)[idx]
+        hashes = self._hashes
+        for s, key in enumerate(_symmetry_zobrist(self.size, self.cols)[idx][0 if symbol == "X" else 1]):
+            hashes[s] ^= key
+        if self._winner is None:
+            line = self._line_through(row, col, symbol)
+            if line is not None:
+                self._winner = symbol
+                self._win_line = line
+                self._win_ply = len(self._stack)
         return True
 
-    def available_moves(self) -> Iterable[Move]:
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.grid[r][c] == " ":
-                    yield (r, c)
+    def push(self, move: Move, symbol: str) -> bool:
+        """Reversible place(): the move can be taken back with pop()."""
+        return self.place(move[0], move[1], symbol)
 
-    def is_full(self) -> bool:
-        return all(self.grid[r][c] != " " for r in range(self.size) for c in range(self.size))
+    def pop(self) -> Move:
+        """Undo the most recent push()/place() and return its (row, col)."""
+        if self._winner is not None and len(self._stack) == self._win_ply:
+            self._winner = None
+            self._win_line = None
+        idx = self._stack.pop()
+        row, col = divmod(idx, self.cols)
+        hashes = self._hashes
+        symbol = self._grid[row][col]
+        for s, key in enumerate(_symmetry_zobrist(self.size, self.cols)[idx][0 if symbol == "X" else 1]):
+            hashes[s] ^= key
+        self._grid[row][col] = " "
+        self._filled -= 1
+        self._index -= (1 if symbol == "X" else 2) * _base3_weights(self.size, self.cols)[idx]
+        return row, col
 
-    def winner(self) -> Optional[str]:
-        """Returns 'X' or 'O' if there is a winner, else None."""
-        lines: List[List[str]] = []
+    @property
+    def ply(self) -> int:
+        """Number of moves that can currently be undone with pop()."""
+        return len(self._stack)
 
-        # Rows
-        lines.extend(self.grid)
+    @property
+    def last_move(self) -> Optional[Move]:
+        if not self._stack:
+            return None
+        return divmod(self._stack[-1], self.cols)
 
-        # Columns
-        for c in range(self.size):
-            lines.append([self.grid[r][c] for r in range(self.size)])
+    @property
+    def zobrist(self) -> int:
+        """64-bit Zobrist hash of the position and side to move, updated in O(1) per move."""
+        return self._hashes[0]
 
-        # Diagonals
-        lines.append([self.grid[i][i] for i in range(self.size)])
-        lines.append([self.grid[i][self.size - 1 - i] for i in range(self.size)])
+    @property
+    def canonical_hash(self) -> int:
+        """Zobrist hash of the canonical form; equal for all symmetric positions."""
+        return min(self._hashes)
 
-        for line in lines:
-            if line[0] != " " and all(cell == line[0] for cell in line):
-                return line[0]
-        return None
+    def _shape_tag(self) -> int:
+        return (self.size << 16) | (self.cols << 8) | self.k
 
-    def winning_line(self) -> Optional[List[Move]]:
-        """Returns the 3 (row, col) cells forming the winning line, or None."""
-        # Rows
+    @property
+    def position_index(self) -> int:
+        """Base-3 code of the cells (empty 0, X 1, O 2; cell 0 most significant), in O(1)."""
+        return self._index
+
+    @property
+    def position_key(self) -> int:
+        """Integer identifying this position (base-3 cell code, tagged with the board shape)."""
+        return (self._index << 24) | self._shape_tag()
+
+    def canonical(self) -> Tuple[int, int]:
+        """Returns (key, sym) for the canonical form of this position.
+
+        ``key`` is the smallest position_key over the symmetric images of the board, so all
+        rotations/reflections of a position share it. ``sym`` is the symmetry that maps this
+        board onto the canonical image (see to_canonical_move/from_canonical_move).
+        """
+        codes = [_CELL_CODE[cell] for row in self._grid for cell in row]
+        best_key = -1
+        best_sym = 0
+        for sym, inv in enumerate(inverse_symmetries(self.size, self.cols)):
+            key = 0
+            for i in inv:
+                key = key * 3 + codes[i]
+            if best_key < 0 or key < best_key:
+                best_key = key
+                best_sym = sym
+        return (best_key << 24) | self._shape_tag(), best_sym
+
+    @property
+    def canonical_key(self) -> int:
+        """position_key of the canonical form; equal for all symmetric positions."""
+        return self.canonical()[0]
+
+    def available_moves(self) -> Iterable[Move]:
         for r in range(self.size):
-            row = self.grid[r]
-            if row[0] != " " and all(cell == row[0] for cell in row):
-                return [(r, 0), (r, 1), (r, 2)]
-
-        # Columns
-        for c in range(self.size):
-            col = [self.grid[r][c] for r in range(self.size)]
-            if col[0] != " " and all(cell == col[0] for cell in col):
-                return [(0, c), (1, c), (2, c)]
-
-        # Main diagonal
-        diag1 = [self.grid[i][i] for i in range(self.size)]
-        if diag1[0] != " " and all(cell == diag1[0] for cell in diag1):
-            return [(0, 0), (1, 1), (2, 2)]
-
-        # Anti diagonal
-        diag2 = [self.grid[i][self.size - 1 - i] for i in range(self.size)]
-        if diag2[0] != " " and all(cell == diag2[0] for cell in diag2):
-            return [(0, 2), (1, 1), (2, 0)]
+            for c in range(self.cols):
+                if self._grid[r][c] == " ":
+                    yield (r, c)
+
+    def is_full(self) -> bool:
+        return self._filled == self.size * self.cols
 
+    def _line_through(self, row: int, col: int, symbol: str) -> Optional[List[Move]]:
+        """Cells of a k-in-a-row run of `symbol` through (row, col), or None.
+
+        Walks at most k-1 cells each way along the 4 directions, independent of board size.
+        """
+        grid = self._grid
+        rows = self.size
+        cols = self.cols
+        k = self.k
+        for dr, dc in DIRECTIONS:
+            r, c = row - dr, col - dc
+            back = 0
+            while back < k - 1 and 0 <= r < rows and 0 <= c < cols and grid[r][c] == symbol:
+                back += 1
+                r -= dr
+                c -= dc
+            r, c = row + dr, col + dc
+            fwd = 0
+            while fwd < k - 1 and 0 <= r < rows and 0 <= c < cols and grid[r][c] == symbol:
+                fwd += 1
+                r += dr
+                c += dc
+            if back + fwd + 1 >= k:
+                return [(row + i * dr, col + i * dc) for i in range(-back, fwd + 1)]
         return None
 
+    def winner(self) -> Optional[str]:
+        """Returns 'X' or 'O' if there is a winner, else None."""
+        return self._winner
+
+    def winning_line(self) -> Optional[List[Move]]:
+        """Returns the (row, col) cells forming the winning line, or None."""
+        return list(self._win_line) if self._win_line is not None else None
+
     def game_state(self) -> str:
         """One of: 'IN_PROGRESS', 'DRAW', 'X_WINS', 'O_WINS'."""
-        w = self.winner()
+        w = self._winner
         if w == "X":
             return "X_WINS"
         if w == "O":
             return "O_WINS"
-        if self.is_full():
+        if self._filled == self.size * self.cols:
             return "DRAW"
         return "IN_PROGRESS"
 
@@ -103,6 +367,6 @@ class GameBoard:
         """Text display (useful for debugging or optional CLI usage)."""
         rows = []
         for r in range(self.size):
-            rows.append(" | ".join(self.grid[r]))
-        sep = "\n" + "-" * (self.size * 4 - 3) + "\n"
+            rows.append(" | ".join(self._grid[r]))
+        sep = "\n" + "-" * (self.cols * 4 - 3) + "\n"
         return sep.join(rows)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, List, Optional, Tuple
 
-from ai_player import AIPlayer
-from game_board import GameBoard, Move
+from ai_player import AIPlayer, SearchStats
+from game_board import _CELL_CODE, GameBoard, Move
+from move_log import MoveLog
 from players import Player
+from pondering import Ponderer
 
 
 @dataclass
@@ -32,29 +35,103 @@ class GameController:
         human_symbol: str = "X",
         ai_symbol: str = "O",
         ai_max_depth: Optional[int] = None,
+        rows: int = 3,
+        cols: int = 3,
+        k: int = 3,
     ) -> None:
-        self.board = GameBoard()
+        self.board = GameBoard(rows, cols, k)
         self.player_x = Player(symbol=x_symbol)
         self.player_o = Player(symbol=o_symbol)
-        self.ai = AIPlayer(symbol=ai_symbol, max_depth=ai_max_depth)
+        # The AI and its ponderer are built on first use: a human-vs-human game (say, one of
+        # a lobby server's thousands of matches) never pays for their tables and threads.
+        self._ai: Optional[AIPlayer] = None
+        self._ai_max_depth = ai_max_depth
         self.human_symbol = human_symbol
         self.ai_symbol = ai_symbol
         self.mode: str = "HUMAN_HUMAN"  # or 'HUMAN_AI'
         self.score_hh = ScoreHumanHuman()
         self.score_ha = ScoreHumanAI()
         self.current_turn: str = "X"  # 'X' starts by default
+        # Moves of the current round, for undo/redo, replay and serialization.
+        self.log = MoveLog()
+        # Score counter bumped by finalize_if_over for the current position (score object,
+        # field name), so undoing a finished game can take the result back off.
+        self._scored: Optional[Tuple[Any, str]] = None
+        # Search replies to every human move while the human is thinking (HUMAN_AI only).
+        self.pondering: bool = False
+        self._ponderer: Optional[Ponderer] = None
+        # Stats of the search behind the AI's latest move (when ai.collect_stats is on).
+        # Kept here because pondering overwrites ai.last_stats as soon as the AI has moved.
+        self.last_ai_stats: Optional[SearchStats] = None
+
+    @property
+    def ai(self) -> AIPlayer:
+        if self._ai is None:
+            self._ai = AIPlayer(symbol=self.ai_symbol, max_depth=self._ai_max_depth)
+        return self._ai
 
     def set_mode(self, mode: str) -> None:
         if mode not in ("HUMAN_HUMAN", "HUMAN_AI"):
             raise ValueError("Invalid mode")
         self.mode = mode
+        self.stop_pondering()
 
     def set_ai_depth(self, max_depth: Optional[int]) -> None:
+        self.stop_pondering()
         self.ai.max_depth = max_depth
 
+    def set_ai_time_budget(self, budget_ms: Optional[int]) -> None:
+        """Per-move thinking time for the AI (None: search to max_depth however long it takes)."""
+        self.stop_pondering()
+        self.ai.time_budget_ms = budget_ms
+
+    def set_ai_stats(self, enabled: bool) -> None:
+        """Collect SearchStats for each AI move (read them from last_ai_stats)."""
+        self.stop_pondering()
+        self.ai.collect_stats = enabled
+        if not enabled:
+            self.last_ai_stats = None
+
+    def set_ai_pondering(self, enabled: bool) -> None:
+        """Let the AI think during the human's turn (see start_pondering)."""
+        self.pondering = enabled
+        if not enabled:
+            self.stop_pondering()
+
+    def set_ai_workers(self, workers: int) -> None:
+        """Number of processes the AI spreads its root moves across (1: single process)."""
+        self.stop_pondering()
+        self.ai.workers = max(1, workers)
+
+    def set_board_shape(self, rows: int, cols: int, k: int) -> None:
+        """Switch to an m x n board with k in a row to win. Starts a fresh round."""
+        self.stop_pondering()
+        # Scores cached for the old rules would be wrong under the new k.
+        if self._ai is not None and self._ai.tt is not None:
+            self._ai.tt.clear()
+        self.board = GameBoard(rows, cols, k)
+        self.current_turn = "X"
+        self.log.clear()
+        self._scored = None
+
     def reset_round(self, starting_turn: str = "X") -> None:
+        self.stop_pondering()
         self.board.reset()
         self.current_turn = starting_turn
+        self.log.clear(starting_turn)
+        self._scored = None
+
+    def load_position(self, grid: List[List[str]], turn: str) -> None:
+        """Replace the position wholesale (e.g. from a network sync).
+
+        The move log restarts from this position, which export_game() includes.
+        """
+        self.stop_pondering()
+        self.board.grid = grid
+        self.current_turn = turn
+        codes = bytes(_CELL_CODE.get(cell, 0) for row in self.board.grid for cell in row)
+        self.log.clear(turn, codes if any(codes) else None)
+        self._scored = None
 
     def state(self) -> str:
         return self.board.game_state()
@@ -75,45 +152,143 @@ class GameController:
         player = self.player_x if self.current_turn == self.player_x.symbol else self.player_o
         if not player.validate_move(self.board, move):
             return False
-        ok = self.board.place(move[0], move[1], player.symbol)
-        if ok:
-            self._advance_turn()
-        return ok
+        return self._play(move, player.symbol)
 
     def apply_ai_move(self) -> Optional[Move]:
         if not self.is_ai_turn():
             return None
-        move = self.ai.choose_move(self.board)
-        if move is None:
+        move = self.compute_ai_move()
+        if move is None or not self.apply_ai_result(move):
             return None
-        self.board.place(move[0], move[1], self.ai_symbol)
-        self._advance_turn()
         return move
 
+    def compute_ai_move(
+        self, board: Optional[GameBoard] = None, cancel: Optional[threading.Event] = None
+    ) -> Optional[Move]:
+        """Searches for the AI's move without playing it.
+
+        To search off the UI thread, pass a copy of the board; `cancel` stops the search
+        with SearchCancelled (see AIPlayer.choose_move). A reply found while pondering is
+        returned without searching again.
+        """
+        board = self.board if board is None else board
+        if self._ponderer is not None:
+            found, move, stats = self._ponderer.take(board)
+            if found:
+                self.last_ai_stats = None if stats is None else replace(stats, source="ponder")
+                return move
+        move = self.ai.choose_move(board, cancel=cancel)
+        self.last_ai_stats = self.ai.last_stats
+        return move
+
+    def apply_ai_result(self, move: Move) -> bool:
+        """Plays a move found by compute_ai_move, if it is still the AI's turn and legal."""
+        if not self.is_ai_turn():
+            return False
+        if not self._play(move, self.ai_symbol):
+            return False
+        self.start_pondering()
+        return True
+
+    def undo(self) -> Optional[Move]:
+        """Take back the last move and return it (None if there is none).
+
+        If finalize_if_over already counted the game's result, it is taken off the score.
+        """
+        if not self.log.can_undo:
+            return None
+        self.stop_pondering()
+        if self._scored is not None:
+            score, name = self._scored
+            setattr(score, name, getattr(score, name) - 1)
+            self._scored = None
+        self.log.undo()
+        move = self.board.pop()
+        self.current_turn = self.log.symbol_at(self.log.ply)
+        return move
+
+    def redo(self) -> Optional[Move]:
+        """Play the most recently undone move again and return it (None if there is none)."""
+        if not self.log.can_redo:
+            return None
+        self.stop_pondering()
+        ply = self.log.ply
+        move = divmod(self.log.redo(), self.board.cols)
+        self.board.place(move[0], move[1], self.log.symbol_at(ply))
+        self.current_turn = self.log.symbol_at(ply + 1)
+        return move
+
+    def replay(self, ply: int) -> None:
+        """Undo or redo moves until `ply` moves of the logged game are on the board."""
+        if not 0 <= ply <= len(self.log):
+            raise ValueError(f"ply must be between 0 and {len(self.log)}")
+        while self.log.ply > ply:
+            self.undo()
+        while self.log.ply < ply:
+            self.redo()
+
+    def export_game(self) -> bytes:
+        """The moves played this round, the board shape and any loaded start position (see
+        move_log). A few bytes long for a game played from an empty board."""
+        return self.log.to_bytes(self.board.rows, self.board.cols, self.board.k)
+
+    def load_game(self, data: bytes) -> None:
+        """Start a round from export_game() output, with all of its moves played.
+
+        Raises ValueError if the record is malformed or contains an illegal move.
+        """
+        rows, cols, k, log = MoveLog.from_bytes(data)
+        if not (rows and cols and 1 <= k <= max(rows, cols)):
+            raise ValueError("invalid board shape in game record")
+        board = GameBoard(rows, cols, k)
+        if log.start is not None:
+            board.grid = [[" XO"[c] for c in log.start[r * cols : (r + 1) * cols]] for r in range(rows)]
+        for ply, cell in enumerate(log.played()):
+            row, col = divmod(cell, cols)
+            if board.game_state() != "IN_PROGRESS" or not board.place(row, col, log.symbol_at(ply)):
+                raise ValueError(f"illegal move {ply + 1} in game record")
+        self.stop_pondering()
+        self.board = board
+        self.log = log
+        self.current_turn = log.symbol_at(log.ply)
+        self._scored = None
+
+    def start_pondering(self) -> None:
+        """If enabled, search the AI's reply to every human move in the background."""
+        if self.pondering and self.mode == "HUMAN_AI" and self.is_human_turn() and self.state() == "IN_PROGRESS":
+            if self._ponderer is None:
+                self._ponderer = Ponderer(self.ai)
+            self._ponderer.start(self.board, self.human_symbol)
+
+    def stop_pondering(self) -> None:
+        if self._ponderer is not None:
+            self._ponderer.stop()
+
     def finalize_if_over(self) -> bool:
         """Updates score if round is over. Returns True if game is over."""
         st = self.state()
         if st == "IN_PROGRESS":
             return False
+        if self._scored is not None:
+            return True  # Already counted for this position.
 
+        score: Any = self.score_hh if self.mode == "HUMAN_HUMAN" else self.score_ha
         if st == "DRAW":
-            if self.mode == "HUMAN_HUMAN":
-                self.score_hh.draws += 1
-            else:
-                self.score_ha.draws += 1
-            return True
-
-        winner = "X" if st == "X_WINS" else "O"
-        if self.mode == "HUMAN_HUMAN":
-            if winner == "X":
-                self.score_hh.x += 1
-            else:
-                self.score_hh.o += 1
+            name = "draws"
+        elif self.mode == "HUMAN_HUMAN":
+            name = "x" if st == "X_WINS" else "o"
         else:
-            if winner == self.human_symbol:
-                self.score_ha.human += 1
-            else:
-                self.score_ha.ai += 1
+            winner = "X" if st == "X_WINS" else "O"
+            name = "human" if winner == self.human_symbol else "ai"
+        setattr(score, name, getattr(score, name) + 1)
+        self._scored = (score, name)
+        return True
+
+    def _play(self, move: Move, symbol: str) -> bool:
+        if not self.board.place(move[0], move[1], symbol):
+            return False
+        self.log.record(move[0] * self.board.cols + move[1])
+        self._advance_turn()
         return True
 
     def _advance_turn(self) -> None:
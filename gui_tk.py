@@ -1,20 +1,46 @@
 from __future__ import annotations
 
 import colorsys
+import queue
+import threading
+import time
 import tkinter as tk
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 try:
     import winsound  # type: ignore
 except Exception:  # pragma: no cover
     winsound = None  # type: ignore
 
+from ai_player import SearchCancelled
+from game_board import GameBoard
 from game_controller import GameController
-from online_net import OnlineClient, OnlineConfig, OnlineHost
+from online_net import ConnectionStats, OnlineClient, OnlineConfig, OnlineHost
 
 
 Move = Tuple[int, int]
 
+# Board presets offered in the UI: label -> (rows, cols, k in a row to win).
+BOARD_SHAPES: Dict[str, Tuple[int, int, int]] = {
+    "3x3": (3, 3, 3),
+    "4x4 (4 in a row)": (4, 4, 4),
+    "5x5 (4 in a row)": (5, 5, 4),
+    "7x7 (5 in a row)": (7, 7, 5),
+    "15x15 (5 in a row)": (15, 15, 5),
+}
+
+# Largest board edge (px) before cells start shrinking.
+_BOARD_PX = 390
+
+# AI thinking time per move on boards larger than 3x3.
+_AI_BUDGET_MS = 700
+
+# How often (ms) the Tk loop checks for a finished background AI search.
+_AI_POLL_MS = 30
+
+# How often (ms) the connection statistics in the status bar are refreshed.
+_NET_STATS_MS = 1000
+
 
 class TicTacToeGUI:
     """Tkinter GUI wrapper around GameController."""
@@ -25,6 +51,7 @@ class TicTacToeGUI:
         self.root.resizable(False, False)
 
         self.controller = GameController(x_symbol="X", o_symbol="O")
+        self.controller.set_ai_pondering(True)
         self._win_line_id: Optional[int] = None
         self._cell_origin: Dict[Move, Tuple[float, float]] = {}
         self._cell_rect_id: Dict[Move, int] = {}
@@ -36,6 +63,10 @@ class TicTacToeGUI:
         self._pad = 10
         self._corner_radius = 22
         self.mode_var = tk.StringVar(value="HUMAN_HUMAN")
+        self.shape_var = tk.StringVar(value="3x3")
+        self.stats_var = tk.BooleanVar(value=False)
+        self._stats_text_id: Optional[int] = None
+        self._stats_bg_id: Optional[int] = None
 
         self._rgb_anim_t = 0.0
         self._rgb_anim_after_id: Optional[str] = None
@@ -45,10 +76,19 @@ class TicTacToeGUI:
         self._online_host: Optional[OnlineHost] = None
         self._online_client: Optional[OnlineClient] = None
         self._local_symbol: str = "X"
+        self._net_stats_after_id: Optional[str] = None
+
+        # The AI searches on a worker thread and posts (search id, move) here.
+        self._ai_results: "queue.Queue[Tuple[int, Optional[Move]]]" = queue.Queue()
+        self._ai_search_id = 0
+        self._ai_thread: Optional[threading.Thread] = None
+        self._ai_cancel: Optional[threading.Event] = None
+        self._ai_poll_after_id: Optional[str] = None
 
         self._build_ui()
         self._sync_ui_from_state()
         self._start_rgb_border_animation()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build_ui(self) -> None:
         self.top = tk.Frame(self.root, padx=10, pady=10)
@@ -81,6 +121,15 @@ class TicTacToeGUI:
         self.restart_btn = tk.Button(self.top, text="Restart Round", command=self._on_restart_pressed)
         self.restart_btn.pack(side="right")
 
+        self.shape_menu = tk.OptionMenu(self.top, self.shape_var, *BOARD_SHAPES, command=self._on_change_shape)
+        self.shape_menu.pack(side="right", padx=(0, 6))
+
+        # Debug overlay with the AI's search statistics (also toggled with F3).
+        tk.Checkbutton(self.top, text="Stats", variable=self.stats_var, command=self._on_toggle_stats).pack(
+            side="right", padx=(0, 6)
+        )
+        self.root.bind("<F3>", self._on_stats_key)
+
         self.online_frame = tk.Frame(self.root, padx=10, pady=4)
         self.online_frame.pack(fill="x")
 
@@ -112,12 +161,44 @@ class TicTacToeGUI:
         self.board_frame = tk.Frame(self.root, padx=10, pady=10)
         self.board_frame.pack()
 
-        # Single canvas that contains the 3x3 board and also draws the win strike-through.
+        # Single canvas that contains the board and also draws the win strike-through.
         self.board_canvas = tk.Canvas(self.board_frame, highlightthickness=0, bg=self.board_frame.cget("bg"))
         self.board_canvas.pack()
+        self._build_board_cells()
+
+        self.board_canvas.bind("<Button-1>", self._on_canvas_click)
 
-        for r in range(3):
-            for c in range(3):
+        self.footer_label = tk.Label(
+            self.root,
+            text="Developed by Himanshu Kumar",
+            anchor="center",
+            font=("Segoe UI", 10),
+            fg="#444",
+            pady=6,
+        )
+        self.footer_label.pack(fill="x")
+
+        self._set_online_controls_visible(False)
+
+    def _build_board_cells(self) -> None:
+        """(Re)create the cell shapes for the controller's current board dimensions."""
+        self.board_canvas.delete("all")
+        self._win_line_id = None
+        self._stats_text_id = None
+        self._stats_bg_id = None
+        self._cell_origin.clear()
+        self._cell_rect_id.clear()
+        self._cell_text_layers.clear()
+
+        rows, cols = self.controller.board.rows, self.controller.board.cols
+        cells = max(rows, cols)
+        # Classic 3x3 keeps its original look; bigger boards shrink cells to fit.
+        self._pad = 10 if cells <= 3 else max(2, 30 // cells)
+        self._cell_size = min(120, (_BOARD_PX - self._pad) // cells - self._pad)
+        self._corner_radius = max(4, self._cell_size * 22 // 120)
+
+        for r in range(rows):
+            for c in range(cols):
                 x = self._pad + c * (self._cell_size + self._pad)
                 y = self._pad + r * (self._cell_size + self._pad)
                 self._cell_origin[(r, c)] = (x, y)
@@ -130,29 +211,15 @@ class TicTacToeGUI:
                     radius=self._corner_radius,
                     fill="white",
                     outline="#ff0000",
-                    width=3,
+                    width=3 if cells <= 5 else 2,
                 )
                 self._cell_rect_id[(r, c)] = rect_id
                 self._cell_text_layers[(r, c)] = []
 
-        total_w = self._pad + 3 * (self._cell_size + self._pad)
-        total_h = self._pad + 3 * (self._cell_size + self._pad)
+        total_w = self._pad + cols * (self._cell_size + self._pad)
+        total_h = self._pad + rows * (self._cell_size + self._pad)
         self.board_canvas.config(width=total_w, height=total_h)
 
-        self.board_canvas.bind("<Button-1>", self._on_canvas_click)
-
-        self.footer_label = tk.Label(
-            self.root,
-            text="Developed by Himanshu Kumar",
-            anchor="center",
-            font=("Segoe UI", 10),
-            fg="#444",
-            pady=6,
-        )
-        self.footer_label.pack(fill="x")
-
-        self._set_online_controls_visible(False)
-
     def _create_round_rect(
         self,
         x1: float,
@@ -206,14 +273,12 @@ class TicTacToeGUI:
     def _rgb_border_tick(self) -> None:
         # Animate outline color for each cell using a hue-shifted rainbow.
         self._rgb_anim_t = (self._rgb_anim_t + 0.01) % 1.0
-        idx = 0
-        for r in range(3):
-            for c in range(3):
-                hue = (self._rgb_anim_t + idx * 0.08) % 1.0
-                rr, gg, bb = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
-                color = f"#{int(rr * 255):02x}{int(gg * 255):02x}{int(bb * 255):02x}"
-                self.board_canvas.itemconfigure(self._cell_rect_id[(r, c)], outline=color)
-                idx += 1
+        step = 0.72 / max(1, len(self._cell_rect_id))
+        for idx, rect_id in enumerate(self._cell_rect_id.values()):
+            hue = (self._rgb_anim_t + idx * step) % 1.0
+            rr, gg, bb = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
+            color = f"#{int(rr * 255):02x}{int(gg * 255):02x}{int(bb * 255):02x}"
+            self.board_canvas.itemconfigure(rect_id, outline=color)
 
         # Keep win line above everything.
         if self._win_line_id is not None:
@@ -244,13 +309,19 @@ class TicTacToeGUI:
                 row = msg.get("row")
                 col = msg.get("col")
                 if isinstance(row, int) and isinstance(col, int):
-                    self.root.after(0, lambda: self._online_apply_remote_move((row, col)))
+                    self.root.after(0, self._online_timed_apply, self._online_apply_remote_move, (row, col))
             elif msg.get("type") == "restart":
                 self.root.after(0, self._online_restart_both)
+            elif msg.get("type") == "resync":
+                self.root.after(0, self._online_send_sync)
 
         host = OnlineHost(OnlineConfig(host="0.0.0.0", port=port), on_message, on_connect, on_disconnect)
         self._online_host = host
-        host.start()
+        try:
+            host.start()
+        except Exception:
+            self._online_disconnect()
+            return
         self._sync_ui_from_state()
 
     def _online_join(self) -> None:
@@ -272,9 +343,17 @@ class TicTacToeGUI:
         def on_message(msg: dict) -> None:
             t = msg.get("type")
             if t == "sync":
-                self.root.after(0, lambda: self._online_apply_sync(msg))
+                self.root.after(0, self._online_timed_apply, self._online_apply_sync, msg)
+            elif t == "move":
+                self.root.after(0, self._online_timed_apply, self._online_apply_delta, msg)
             elif t == "restart":
                 self.root.after(0, self._restart_round)
+            elif t == "hello" and msg.get("lobby"):
+                # A lobby server: quick-join a match on the board picked here.
+                board = self.controller.board
+                client.join_match(None, board.rows, board.cols, board.k)
+            elif t == "joined" and msg.get("symbol") in ("X", "O"):
+                self.root.after(0, lambda: self._online_set_symbol(msg["symbol"]))
 
         client = OnlineClient(ip, port, on_message=on_message, on_disconnect=on_disconnect)
         self._online_client = client
@@ -286,6 +365,12 @@ class TicTacToeGUI:
 
         self._sync_ui_from_state()
 
+    def _online_set_symbol(self, symbol: str) -> None:
+        if self._online_role != "client":
+            return
+        self._local_symbol = symbol
+        self._sync_ui_from_state()
+
     def _online_disconnect(self) -> None:
         if self._online_client is not None:
             try:
@@ -302,6 +387,28 @@ class TicTacToeGUI:
         self._online_role = None
         self._local_symbol = "X"
 
+    def _on_close(self) -> None:
+        self._cancel_ai_search()
+        self.controller.stop_pondering()
+        self._online_disconnect()
+        if self._rgb_anim_after_id is not None:
+            self.root.after_cancel(self._rgb_anim_after_id)
+            self._rgb_anim_after_id = None
+        if self._net_stats_after_id is not None:
+            self.root.after_cancel(self._net_stats_after_id)
+            self._net_stats_after_id = None
+        self.root.destroy()
+
+    def _online_timed_apply(self, apply: Callable[[object], None], arg: object) -> None:
+        """Run a received move/sync on the Tk thread and add its time to the connection stats."""
+        start = time.perf_counter()
+        try:
+            apply(arg)
+        finally:
+            link = self._online_host or self._online_client
+            if link is not None:
+                link.record_apply(time.perf_counter() - start)
+
     def _online_apply_remote_move(self, move: Move) -> None:
         # Host only: apply joiner's move when it's O's turn.
         if self._online_role != "host":
@@ -314,18 +421,38 @@ class TicTacToeGUI:
         if not ok:
             return
         self._assign_cell_palette(move, "O")
-        self._sync_ui_from_state()
+        self._online_send_move(move, "O")
+        self._sync_ui_from_state([move])
         self._handle_end_if_needed()
-        self._online_send_sync()
+
+    def _online_send_move(self, move: Move, symbol: str) -> None:
+        if self._online_role != "host" or self._online_host is None:
+            return
+        if not self._online_host.connected:
+            return
+        if not self._online_host.deltas:
+            # A version 1 joiner only follows full snapshots.
+            self._online_send_sync()
+            return
+        try:
+            self._online_host.send_move(move, symbol, self.controller.board.zobrist)
+        except Exception:
+            pass
 
     def _online_send_sync(self) -> None:
         if self._online_role != "host" or self._online_host is None:
             return
         if not self._online_host.connected:
             return
+        board = self.controller.board
         payload = {
-            "grid": self.controller.board.grid,
+            "grid": board.grid,
             "turn": self.controller.current_turn,
+            "rows": board.rows,
+            "cols": board.cols,
+            "k": board.k,
+            # Zobrist hash of the position: lets receivers skip syncs that change nothing.
+            "hash": self.controller.board.zobrist,
         }
         try:
             self._online_host.send_sync(payload)
@@ -339,23 +466,49 @@ class TicTacToeGUI:
         turn = msg.get("turn")
         if not (isinstance(grid, list) and isinstance(turn, str)):
             return
+        board = self.controller.board
+        shape = (msg.get("rows", 3), msg.get("cols", 3), msg.get("k", 3))
+        if shape != (board.rows, board.cols, board.k):
+            # Host picked another board: adopt its shape before loading the grid.
+            if not all(isinstance(v, int) and v > 0 for v in shape):
+                return
+            self._apply_board_shape(*shape)
+            board = self.controller.board
+        elif msg.get("hash") == board.zobrist and turn == self.controller.current_turn:
+            return
 
         # Replace local board state from host.
         try:
-            self.controller.board.grid = [list(row) for row in grid]
-            self.controller.current_turn = turn
+            self.controller.load_position([list(row) for row in grid], turn)
         except Exception:
             return
 
         # Ensure any new symbols have palettes.
-        for r in range(3):
-            for c in range(3):
-                sym = self.controller.board.grid[r][c]
+        for r in range(board.rows):
+            for c in range(board.cols):
+                sym = board.grid[r][c]
                 if sym in ("X", "O"):
                     self._assign_cell_palette((r, c), sym)
 
         self._sync_ui_from_state()
 
+    def _online_apply_delta(self, msg: dict) -> None:
+        if self._online_role != "client" or self._online_client is None:
+            return
+        row, col, symbol = msg.get("row"), msg.get("col"), msg.get("symbol")
+        if not (isinstance(row, int) and isinstance(col, int)) or symbol != self.controller.current_turn:
+            self._online_client.request_resync()
+            return
+        if not self.controller.apply_move((row, col)):
+            # Our board disagrees with the host's: fall back to a full snapshot.
+            self._online_client.request_resync()
+            return
+        self._assign_cell_palette((row, col), symbol)
+        self._sync_ui_from_state([(row, col)])
+        expected = msg.get("hash")
+        if expected is not None and expected != self.controller.board.zobrist:
+            self._online_client.request_resync()
+
     def _on_restart_pressed(self) -> None:
         if self._online_mode:
             if self._online_role == "host":
@@ -370,12 +523,14 @@ class TicTacToeGUI:
         self._restart_round()
 
     def _on_change_mode(self) -> None:
+        self._cancel_ai_search()
         selected = self.mode_var.get()
         if selected == "ONLINE":
             self._online_mode = True
             self.controller.set_mode("HUMAN_HUMAN")
             self._local_symbol = "X"
             self._set_online_controls_visible(True)
+            self._schedule_net_stats()
         else:
             self._online_mode = False
             self._online_disconnect()
@@ -383,6 +538,87 @@ class TicTacToeGUI:
             self.controller.set_mode(selected)
         self._restart_round()
 
+    def _on_change_shape(self, _label: Optional[str] = None) -> None:
+        if self._online_mode and self._online_role == "client":
+            # The host decides the board; keep the menu showing what we actually play.
+            self.shape_var.set(self._shape_label())
+            return
+        rows, cols, k = BOARD_SHAPES[self.shape_var.get()]
+        self._apply_board_shape(rows, cols, k)
+        self._restart_round()
+        if self._online_mode:
+            self._online_send_sync()
+
+    def _shape_label(self) -> str:
+        b = self.controller.board
+        for label, shape in BOARD_SHAPES.items():
+            if shape == (b.rows, b.cols, b.k):
+                return label
+        return f"{b.rows}x{b.cols} ({b.k} in a row)"
+
+    def _apply_board_shape(self, rows: int, cols: int, k: int) -> None:
+        self.controller.set_board_shape(rows, cols, k)
+        # Full-depth minimax only finishes on the classic board; bigger ones think to a deadline.
+        self.controller.set_ai_time_budget(None if (rows, cols, k) == (3, 3, 3) else _AI_BUDGET_MS)
+        self.shape_var.set(self._shape_label())
+        self._cell_palette.clear()
+        self._x_palette_idx = 0
+        self._o_palette_idx = 0
+        self._build_board_cells()
+
+    def _on_stats_key(self, _event: tk.Event) -> None:
+        self.stats_var.set(not self.stats_var.get())
+        self._on_toggle_stats()
+
+    def _on_toggle_stats(self) -> None:
+        self.controller.set_ai_stats(self.stats_var.get())
+        self._update_stats_overlay()
+        self._schedule_net_stats()
+
+    def _online_net_stats(self) -> Optional[ConnectionStats]:
+        """The online connection's traffic and ping times, when Stats is on and connected."""
+        if not (self._online_mode and self.stats_var.get()):
+            return None
+        link = self._online_host or self._online_client
+        return link.stats() if link is not None else None
+
+    def _schedule_net_stats(self) -> None:
+        if self._net_stats_after_id is None and self._online_mode and self.stats_var.get():
+            self._net_stats_after_id = self.root.after(_NET_STATS_MS, self._net_stats_tick)
+
+    def _net_stats_tick(self) -> None:
+        self._net_stats_after_id = None
+        if not (self._online_mode and self.stats_var.get()):
+            return
+        # Labels only; no cell is redrawn.
+        self._sync_ui_from_state([])
+        self._schedule_net_stats()
+
+    def _update_stats_overlay(self) -> None:
+        """Draw (or remove) the last AI search's statistics in the board's top-left corner."""
+        canvas = self.board_canvas
+        stats = self.controller.last_ai_stats
+        if not self.stats_var.get() or stats is None:
+            for item_id in (self._stats_text_id, self._stats_bg_id):
+                if item_id is not None:
+                    canvas.delete(item_id)
+            self._stats_text_id = None
+            self._stats_bg_id = None
+            return
+
+        if self._stats_text_id is None:
+            self._stats_bg_id = canvas.create_rectangle(0, 0, 0, 0, fill="#101820", outline="")
+            self._stats_text_id = canvas.create_text(
+                6, 6, anchor="nw", fill="#9ef0a0", font=("Consolas", 9), justify="left"
+            )
+        canvas.itemconfigure(self._stats_text_id, text=stats.summary())
+        bbox = canvas.bbox(self._stats_text_id)
+        if bbox:
+            x1, y1, x2, y2 = bbox
+            canvas.coords(self._stats_bg_id, x1 - 4, y1 - 3, x2 + 4, y2 + 3)
+        canvas.tag_raise(self._stats_bg_id)
+        canvas.tag_raise(self._stats_text_id)
+
     def _set_online_controls_visible(self, visible: bool) -> None:
         if visible:
             self.online_frame.pack(fill="x")
@@ -390,6 +626,7 @@ class TicTacToeGUI:
             self.online_frame.pack_forget()
 
     def _restart_round(self) -> None:
+        self._cancel_ai_search()
         self._clear_win_line()
         self._cell_palette.clear()
         self._x_palette_idx = 0
@@ -425,14 +662,14 @@ class TicTacToeGUI:
             return
 
         self._assign_cell_palette((row, col), symbol)
+        if self._online_mode:
+            self._online_send_move((row, col), symbol)
 
-        self._sync_ui_from_state()
+        self._sync_ui_from_state([(row, col)])
         if self._handle_end_if_needed():
             return
 
-        if self._online_mode:
-            self._online_send_sync()
-        else:
+        if not self._online_mode:
             self._maybe_ai_step()
 
     def _maybe_ai_step(self) -> None:
@@ -445,16 +682,77 @@ class TicTacToeGUI:
     def _ai_step(self) -> None:
         if self.controller.state() != "IN_PROGRESS":
             return
-        if not self.controller.is_ai_turn():
+        if not self.controller.is_ai_turn() or self._ai_cancel is not None:
+            return
+        if self._ai_thread is not None and self._ai_thread.is_alive():
+            # A cancelled search is still unwinding; it shares the AI, so wait for it.
+            self.root.after(_AI_POLL_MS, self._ai_step)
+            return
+
+        self._ai_search_id += 1
+        self._ai_cancel = threading.Event()
+        self._ai_thread = threading.Thread(
+            target=self._ai_worker,
+            args=(self._ai_search_id, self.controller.board.copy(), self._ai_cancel),
+            name="ai-search",
+            daemon=True,
+        )
+        self._ai_thread.start()
+        self._ai_poll_after_id = self.root.after(_AI_POLL_MS, self._poll_ai_result)
+        self._sync_ui_from_state()
+
+    def _ai_worker(self, search_id: int, board: GameBoard, cancel: threading.Event) -> None:
+        """Runs on the worker thread: search on a private board copy and post the result."""
+        try:
+            move = self.controller.compute_ai_move(board, cancel)
+        except SearchCancelled:
             return
+        except Exception:
+            move = None
+        self._ai_results.put((search_id, move))
+
+    def _poll_ai_result(self) -> None:
+        self._ai_poll_after_id = None
+        # Read liveness first: a thread that has exited has already queued its result.
+        alive = self._ai_thread is not None and self._ai_thread.is_alive()
+        while True:
+            try:
+                search_id, move = self._ai_results.get_nowait()
+            except queue.Empty:
+                if alive:
+                    self._ai_poll_after_id = self.root.after(_AI_POLL_MS, self._poll_ai_result)
+                else:
+                    self._ai_cancel = None
+                    self._sync_ui_from_state()
+                return
+            if search_id == self._ai_search_id:
+                break
 
-        move = self.controller.apply_ai_move()
-        if move is not None:
+        self._ai_cancel = None
+        changed: List[Move] = []
+        if move is not None and self.controller.apply_ai_result(move):
             self._assign_cell_palette(move, self.controller.ai_symbol)
+            changed.append(move)
 
-        self._sync_ui_from_state()
+        self._sync_ui_from_state(changed)
         self._handle_end_if_needed()
 
+    def _cancel_ai_search(self) -> None:
+        """Stop any running AI search and drop its result."""
+        if self._ai_cancel is not None:
+            self._ai_cancel.set()
+            self._ai_cancel = None
+        if self._ai_poll_after_id is not None:
+            self.root.after_cancel(self._ai_poll_after_id)
+            self._ai_poll_after_id = None
+        # Results still in flight carry an older id and are ignored.
+        self._ai_search_id += 1
+        while True:
+            try:
+                self._ai_results.get_nowait()
+            except queue.Empty:
+                break
+
     def _on_canvas_click(self, event: tk.Event) -> None:
         if self.controller.state() != "IN_PROGRESS":
             return
@@ -468,7 +766,7 @@ class TicTacToeGUI:
 
         col = int((event.x - self._pad) // (self._cell_size + self._pad))
         row = int((event.y - self._pad) // (self._cell_size + self._pad))
-        if not (0 <= row < 3 and 0 <= col < 3):
+        if not (0 <= row < self.controller.board.rows and 0 <= col < self.controller.board.cols):
             return
 
         x0, y0 = self._cell_origin[(row, col)]
@@ -593,14 +891,14 @@ class TicTacToeGUI:
         colors = [c1, c2, c3]
 
         # Simulated vertical gradient: multiple text layers with slight y offsets.
-        offsets = [-3, 0, 3]
+        offsets = [-3, 0, 3] if self._cell_size >= 60 else [-1, 0, 1]
         for dy, color in zip(offsets, colors, strict=False):
             item_id = self.board_canvas.create_text(
                 cx,
                 cy + dy,
                 text=symbol,
                 fill=color,
-                font=("Segoe UI", 40, "bold"),
+                font=("Segoe UI", max(8, self._cell_size // 3), "bold"),
             )
             self._cell_text_layers[cell].append(item_id)
 
@@ -611,9 +909,8 @@ class TicTacToeGUI:
             return
 
         # Draw from center of first cell to center of last cell.
-        (r1, c1), (_, _), (r3, c3) = cells
-        ox1, oy1 = self._cell_origin[(r1, c1)]
-        ox2, oy2 = self._cell_origin[(r3, c3)]
+        ox1, oy1 = self._cell_origin[cells[0]]
+        ox2, oy2 = self._cell_origin[cells[-1]]
         x1 = ox1 + self._cell_size / 2
         y1 = oy1 + self._cell_size / 2
         x2 = ox2 + self._cell_size / 2
@@ -625,21 +922,23 @@ class TicTacToeGUI:
             x2,
             y2,
             fill="#c00000",
-            width=8,
+            width=max(3, self._cell_size // 15),
             capstyle=tk.ROUND,
         )
         self.board_canvas.tag_raise(self._win_line_id)
 
-    def _sync_ui_from_state(self) -> None:
+    def _sync_ui_from_state(self, changed: Optional[Iterable[Move]] = None) -> None:
+        """Redraw the board and labels. With `changed`, only those cells are redrawn."""
         b = self.controller.board
-        for r in range(3):
-            for c in range(3):
-                self._draw_cell_symbol((r, c), b.grid[r][c])
+        grid = b.grid
+        cells = [(r, c) for r in range(b.rows) for c in range(b.cols)] if changed is None else list(changed)
+        for r, c in cells:
+            self._draw_cell_symbol((r, c), grid[r][c])
 
-                if b.grid[r][c] == " ":
-                    self.board_canvas.itemconfigure(self._cell_rect_id[(r, c)], fill="white")
-                else:
-                    self.board_canvas.itemconfigure(self._cell_rect_id[(r, c)], fill="#f3f3f3")
+            if grid[r][c] == " ":
+                self.board_canvas.itemconfigure(self._cell_rect_id[(r, c)], fill="white")
+            else:
+                self.board_canvas.itemconfigure(self._cell_rect_id[(r, c)], fill="#f3f3f3")
 
         if self._online_mode:
             self.score_label.config(text="Online game")
@@ -656,18 +955,28 @@ class TicTacToeGUI:
             if self._online_mode:
                 who = "You" if turn == self._local_symbol else "Friend"
                 conn = "Connected" if (self._online_role is not None) else "Not connected"
-                self.status_label.config(text=f"Online ({conn})  Turn: {turn} ({who})")
+                status = f"Online ({conn})  Turn: {turn} ({who})"
             elif self.controller.mode == "HUMAN_AI":
-                who = "You" if self.controller.is_human_turn() else "AI"
-                self.status_label.config(text=f"Turn: {turn} ({who})")
+                if self.controller.is_human_turn():
+                    who = "You"
+                elif self._ai_cancel is not None:
+                    who = "AI thinking..."
+                else:
+                    who = "AI"
+                status = f"Turn: {turn} ({who})"
             else:
-                self.status_label.config(text=f"Turn: {turn}")
+                status = f"Turn: {turn}"
         else:
-            self.status_label.config(text=f"Round finished: {st}")
+            status = f"Round finished: {st}"
+        net = self._online_net_stats()
+        if net is not None:
+            status += "\n" + net.summary()
+        self.status_label.config(text=status)
 
         # Keep symbols above borders and win line above everything.
-        for cell in self._cell_text_layers:
-            for item_id in self._cell_text_layers[cell]:
+        for cell in cells:
+            for item_id in self._cell_text_layers.get(cell, []):
                 self.board_canvas.tag_raise(item_id)
         if self._win_line_id is not None:
             self.board_canvas.tag_raise(self._win_line_id)
+        self._update_stats_overlay()
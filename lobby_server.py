@@ -0,0 +1,401 @@
+"""Headless LAN server that hosts many matches on one port, with a small lobby.
+
+    python lobby_server.py --port 5050
+
+Clients speak the online_net protocol (JSON lines, switching to binary framing when both
+sides support it) and start in the lobby. Lobby requests:
+
+- ``{"type": "list", "offset"?, "limit"?, "rows"?, "cols"?, "k"?, "open"?}``: one page of
+  matches (at most LIST_LIMIT), optionally only open ones and only of one board shape,
+  answered with ``matches`` plus ``total`` and ``more`` (true if a later page follows)
+- ``{"type": "create", "rows", "cols", "k", "name"?}``: new match, joined as X
+- ``{"type": "join", "match"?, "rows", "cols", "k"}``: join a match by id, or without an id
+  the oldest open match of that shape (creating one if there is none)
+- ``{"type": "leave"}``: back to the lobby
+- ``{"type": "stats"}``: server counters, including the estimated memory per match
+
+A joined player gets ``joined`` (match id and symbol) followed by a ``sync`` snapshot, then
+the match's numbered ``move`` / ``restart`` deltas, exactly as from an OnlineHost. Each match
+has its own GameController; finished rounds restart automatically, like the GUI host.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import itertools
+import sys
+import time
+from dataclasses import dataclass, field
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Dict, List, Optional
+
+from game_controller import GameController
+from online_net import PROTOCOL_VERSION, _Connection, _encode
+
+
+MAX_EDGE = 19
+# Seconds between the end of a round and the automatic restart (as in the GUI host).
+RESTART_DELAY_S = 2.2
+# Matches measured for the memory estimate in stats().
+_MEMORY_SAMPLE = 32
+# Lobby and match messages are small; the buffer grows for anything bigger.
+_RECEIVE_BUFFER = 4096
+# Most matches in one 'matches' reply (about 120 bytes each, well under one binary frame).
+LIST_LIMIT = 100
+
+
+def _deep_size(obj: object) -> int:
+    """Approximate bytes reachable from `obj`, leaving out shared types, modules and functions."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, ModuleType, FunctionType, BuiltinFunctionType)):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        stack.extend(gc.get_referents(o))
+    return total
+
+
+@dataclass(eq=False)
+class _Player:
+    conn: _Connection
+    # Framing of what we send to this player: "json" or "binary".
+    framing: str = "json"
+    match: Optional["Match"] = None
+    symbol: Optional[str] = None
+
+    def send(self, msg: dict) -> None:
+        try:
+            data = _encode(msg, self.framing == "binary")
+        except ValueError:
+            # Too big for one frame: tell the player rather than dropping the connection.
+            data = _encode({"type": "error", "reason": f"{msg.get('type')} reply too large"}, self.framing == "binary")
+        self.conn.write(data)
+
+
+@dataclass(eq=False)
+class Match:
+    id: int
+    name: str
+    controller: GameController
+    # Symbol -> player.
+    players: Dict[str, _Player] = field(default_factory=dict)
+    # Number of the last update; the snapshot of the current state carries it.
+    seq: int = 1
+    created: float = field(default_factory=time.monotonic)
+    # Pending automatic restart.
+    restart_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def open(self) -> bool:
+        return len(self.players) < 2
+
+    def summary(self) -> dict:
+        board = self.controller.board
+        return {
+            "id": self.id,
+            "name": self.name,
+            "rows": board.rows,
+            "cols": board.cols,
+            "k": board.k,
+            "players": sorted(self.players),
+            "state": self.controller.state(),
+        }
+
+    def snapshot(self) -> dict:
+        board = self.controller.board
+        return {
+            "type": "sync",
+            "seq": self.seq,
+            "grid": board.grid,
+            "turn": self.controller.current_turn,
+            "rows": board.rows,
+            "cols": board.cols,
+            "k": board.k,
+            "hash": board.zobrist,
+        }
+
+    def broadcast(self, msg: dict) -> None:
+        for player in self.players.values():
+            player.send(msg)
+
+    def memory_bytes(self) -> int:
+        """Estimated memory held by this match's game state (not its connections)."""
+        return _deep_size(self.controller) + sys.getsizeof(self)
+
+
+class LobbyServer:
+    """Serves any number of matches from one asyncio event loop."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 5050, binary: bool = True) -> None:
+        self.host = host
+        self.port = port
+        self.binary = binary
+        self.matches: Dict[int, Match] = {}
+        self.players: Dict[_Connection, _Player] = {}
+        self.moves = 0
+        self._next_id = 1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(
+            lambda: _Connection(self._on_open, self._on_message, self._on_close, self._loop, _RECEIVE_BUFFER),
+            self.host,
+            self.port,
+            reuse_address=True,
+            backlog=1024,
+        )
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for player in list(self.players.values()):
+            player.conn.close()
+
+    def stats(self) -> dict:
+        # Measuring walks every object of a match, so only a sample is measured.
+        sizes = [m.memory_bytes() for m in itertools.islice(self.matches.values(), _MEMORY_SAMPLE)]
+        return {
+            "type": "stats",
+            "matches": len(self.matches),
+            "players": len(self.players),
+            "moves": self.moves,
+            "bytes_per_match": sum(sizes) // len(sizes) if sizes else 0,
+        }
+
+    # Connections.
+
+    def _on_open(self, conn: _Connection) -> None:
+        player = self.players[conn] = _Player(conn)
+        player.send(
+            {
+                "type": "hello",
+                "version": PROTOCOL_VERSION,
+                "lobby": True,
+                "framing": ["binary", "json"] if self.binary else ["json"],
+            }
+        )
+
+    def _on_close(self, conn: _Connection) -> None:
+        player = self.players.pop(conn, None)
+        if player is not None:
+            self._leave(player)
+
+    def _on_message(self, conn: _Connection, msg: dict) -> None:
+        player = self.players.get(conn)
+        if player is None:
+            return
+        t = msg.get("type")
+        if t == "hello":
+            if msg.get("framing") == "binary" and self.binary:
+                conn.receiver.binary = True
+                player.send({"type": "framing", "mode": "binary"})
+                player.framing = "binary"
+                conn.binary_out = True
+        elif t == "list":
+            player.send(self._list(msg))
+        elif t == "create":
+            shape = self._shape(player, msg)
+            if shape is not None:
+                self._leave(player)
+                self._join(player, self._create(*shape, name=msg.get("name")))
+        elif t == "join":
+            self._on_join(player, msg)
+        elif t == "leave":
+            self._leave(player)
+        elif t == "stats":
+            player.send(self.stats())
+        elif player.match is not None:
+            self._on_match_message(player, player.match, msg)
+
+    # Lobby.
+
+    def _list(self, msg: dict) -> dict:
+        offset, limit = msg.get("offset", 0), msg.get("limit", LIST_LIMIT)
+        offset = offset if isinstance(offset, int) and offset > 0 else 0
+        limit = min(limit, LIST_LIMIT) if isinstance(limit, int) and limit > 0 else LIST_LIMIT
+        shape = (msg.get("rows"), msg.get("cols"), msg.get("k"))
+        open_only = bool(msg.get("open"))
+        found = [
+            m
+            for m in self.matches.values()
+            if (not open_only or m.open)
+            and (shape[0] is None or (m.controller.board.rows, m.controller.board.cols, m.controller.board.k) == shape)
+        ]
+        page = found[offset : offset + limit]
+        return {
+            "type": "matches",
+            "matches": [m.summary() for m in page],
+            "offset": offset,
+            "total": len(found),
+            "more": offset + len(page) < len(found),
+        }
+
+    def _shape(self, player: _Player, msg: dict) -> Optional[tuple]:
+        rows, cols, k = msg.get("rows", 3), msg.get("cols", 3), msg.get("k", 3)
+        if not all(isinstance(v, int) for v in (rows, cols, k)) or not (
+            1 <= rows <= MAX_EDGE and 1 <= cols <= MAX_EDGE and 1 <= k <= max(rows, cols)
+        ):
+            player.send({"type": "error", "reason": f"invalid board (at most {MAX_EDGE} per side)"})
+            return None
+        return rows, cols, k
+
+    def _create(self, rows: int, cols: int, k: int, name: Optional[str] = None) -> Match:
+        match_id = self._next_id
+        self._next_id += 1
+        match = Match(match_id, str(name or f"match {match_id}")[:40], GameController(rows=rows, cols=cols, k=k))
+        self.matches[match_id] = match
+        return match
+
+    def _on_join(self, player: _Player, msg: dict) -> None:
+        match_id = msg.get("match")
+        if match_id is None:
+            shape = self._shape(player, msg)
+            if shape is None:
+                return
+            self._leave(player)
+            match = next(
+                (
+                    m
+                    for m in self.matches.values()
+                    if m.open and (m.controller.board.rows, m.controller.board.cols, m.controller.board.k) == shape
+                ),
+                None,
+            )
+            self._join(player, match or self._create(*shape))
+            return
+        match = self.matches.get(match_id) if isinstance(match_id, int) else None
+        if match is None or not match.open:
+            player.send({"type": "error", "reason": "no such open match"})
+            return
+        if player.match is not match:
+            self._leave(player)
+            self._join(player, match)
+
+    def _join(self, player: _Player, match: Match) -> None:
+        symbol = "X" if "X" not in match.players else "O"
+        match.players[symbol] = player
+        player.match = match
+        player.symbol = symbol
+        player.send({"type": "joined", "match": match.id, "name": match.name, "symbol": symbol})
+        player.send(match.snapshot())
+        for other in match.players.values():
+            if other is not player:
+                other.send({"type": "opponent", "symbol": symbol, "present": True})
+
+    def _leave(self, player: _Player) -> None:
+        match = player.match
+        if match is None:
+            return
+        match.players.pop(player.symbol or "", None)
+        player.match = None
+        player.symbol = None
+        if player.conn in self.players:
+            player.send({"type": "left", "match": match.id})
+        if not match.players:
+            if match.restart_handle is not None:
+                match.restart_handle.cancel()
+            del self.matches[match.id]
+            return
+        match.broadcast({"type": "opponent", "symbol": "X" if "X" not in match.players else "O", "present": False})
+
+    # Matches.
+
+    def _on_match_message(self, player: _Player, match: Match, msg: dict) -> None:
+        t = msg.get("type")
+        controller = match.controller
+        if t == "move":
+            row, col = msg.get("row"), msg.get("col")
+            if not (isinstance(row, int) and isinstance(col, int)):
+                return
+            if controller.state() != "IN_PROGRESS" or controller.current_turn != player.symbol:
+                return
+            if not controller.apply_move((row, col)):
+                return
+            self.moves += 1
+            match.seq += 1
+            match.broadcast(
+                {
+                    "type": "move",
+                    "seq": match.seq,
+                    "row": row,
+                    "col": col,
+                    "symbol": player.symbol,
+                    "hash": controller.board.zobrist,
+                }
+            )
+            if controller.finalize_if_over() and self._loop is not None:
+                match.restart_handle = self._loop.call_later(RESTART_DELAY_S, self._restart, match)
+        elif t == "restart":
+            self._restart(match)
+        elif t == "resync":
+            player.send(match.snapshot())
+
+    def _restart(self, match: Match) -> None:
+        if match.restart_handle is not None:
+            match.restart_handle.cancel()
+            match.restart_handle = None
+        if match.id not in self.matches:
+            return
+        match.controller.reset_round(starting_turn="X")
+        match.seq += 1
+        match.broadcast({"type": "restart", "seq": match.seq})
+
+
+async def _report(server: LobbyServer, interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        s = server.stats()
+        print(
+            f"{s['matches']} matches, {s['players']} players, {s['moves']} moves, "
+            f"~{s['bytes_per_match']:,} bytes per match",
+            flush=True,
+        )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    server = LobbyServer(args.host, args.port, binary=not args.json_only)
+    await server.start()
+    print(f"Lobby listening on {args.host}:{args.port}", flush=True)
+    tasks: List[asyncio.Task] = []
+    if args.report_interval > 0:
+        tasks.append(asyncio.create_task(_report(server, args.report_interval)))
+    try:
+        await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many LAN matches on one port.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5050)
+    parser.add_argument("--json-only", action="store_true", help="do not offer binary framing")
+    parser.add_argument(
+        "--report-interval", type=float, default=60.0, help="seconds between status lines (0: off, default: %(default)s)"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from ai_player import SearchCancelled
+from game_board import GameBoard, Move
+
+
+def _other(symbol: str) -> str:
+    return "O" if symbol == "X" else "X"
+
+
+@dataclass(eq=False)
+class _Node:
+    """One position in the search tree, reached by `mover` playing `move`."""
+
+    move: Optional[Move]
+    parent: Optional["_Node"]
+    mover: str
+    untried: List[Move]
+    children: List["_Node"] = field(default_factory=list)
+    visits: int = 0
+    # Playout results from the point of view of `mover`: 1 per win, 0.5 per draw.
+    wins: float = 0.0
+
+
+@dataclass
+class MCTSPlayer:
+    """Monte Carlo Tree Search player with the same choose_move(board) interface as AIPlayer.
+
+    Uses UCT to pick which branch to explore and random (or tactical) playouts to score it.
+    Scales to large m,n,k boards where a full minimax search is out of reach.
+    """
+
+    symbol: str
+    # Stop after this many playouts and/or this many milliseconds, whichever comes first.
+    # With neither set, `playouts` defaults to 1000.
+    playouts: Optional[int] = 1000
+    time_budget_ms: Optional[int] = None
+    # UCT exploration constant (sqrt(2) is the textbook value).
+    exploration: float = 1.41
+    # "random": uniformly random playouts. "tactical": take an immediate win, else block an
+    # immediate loss, else play randomly (stronger, but each step scans the empty cells).
+    playout_policy: str = "random"
+    # Keep the subtree under the move played and the opponent's reply for the next call.
+    reuse_tree: bool = True
+    seed: Optional[int] = None
+
+    # Statistics from the last choose_move.
+    last_playouts: int = field(default=0, init=False, compare=False)
+    last_elapsed_s: float = field(default=0.0, init=False, compare=False)
+
+    _rng: random.Random = field(init=False, repr=False, compare=False)
+    _root: Optional[_Node] = field(default=None, init=False, repr=False, compare=False)
+    _root_grid: Optional[List[List[str]]] = field(default=None, init=False, repr=False, compare=False)
+    _root_shape: Optional[Tuple[int, int, int]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.playout_policy not in ("random", "tactical"):
+            raise ValueError("playout_policy must be 'random' or 'tactical'")
+        self._rng = random.Random(self.seed)
+
+    @property
+    def opponent(self) -> str:
+        return _other(self.symbol)
+
+    @property
+    def playouts_per_second(self) -> float:
+        """Playout rate of the last choose_move (0 if it did not run any)."""
+        if not self.last_elapsed_s:
+            return 0.0
+        return self.last_playouts / self.last_elapsed_s
+
+    def reset(self) -> None:
+        """Forget the tree kept for reuse (e.g. when a new round starts)."""
+        self._root = None
+        self._root_grid = None
+        self._root_shape = None
+
+    def choose_move(self, board: GameBoard, cancel: Optional[threading.Event] = None) -> Optional[Move]:
+        """Most-visited move after the playout budget (see AIPlayer.choose_move for `cancel`)."""
+        if board.game_state() != "IN_PROGRESS":
+            return None
+
+        root = self._reused_root(board)
+        if root is None:
+            root = _Node(None, None, self.opponent, list(board.available_moves()))
+
+        limit = self.playouts
+        if limit is None and self.time_budget_ms is None:
+            limit = 1000
+        start = time.perf_counter()
+        deadline = None if self.time_budget_ms is None else start + self.time_budget_ms / 1000
+
+        # Every playout pushes moves onto `board` and pops back to here; nothing is copied.
+        start_ply = board.ply
+        count = 0
+        try:
+            while (limit is None or count < limit) and (deadline is None or time.perf_counter() < deadline):
+                if cancel is not None and cancel.is_set():
+                    self.reset()
+                    raise SearchCancelled()
+                self._iterate(board, root)
+                while board.ply > start_ply:
+                    board.pop()
+                count += 1
+        finally:
+            while board.ply > start_ply:
+                board.pop()
+
+        self.last_playouts = count
+        self.last_elapsed_s = time.perf_counter() - start
+
+        if not root.children:
+            moves = list(board.available_moves())
+            self.reset()
+            return self._rng.choice(moves) if moves else None
+
+        best = max(root.children, key=lambda child: child.visits)
+        if self.reuse_tree:
+            best.parent = None
+            grid = [row[:] for row in board.grid]
+            grid[best.move[0]][best.move[1]] = self.symbol
+            self._root = best
+            self._root_grid = grid
+            self._root_shape = (board.size, board.cols, board.k)
+        return best.move
+
+    def _reused_root(self, board: GameBoard) -> Optional[_Node]:
+        """The kept subtree for the position on `board`, if it follows from our last move."""
+        root, prev, shape = self._root, self._root_grid, self._root_shape
+        self.reset()
+        if root is None or prev is None or shape != (board.size, board.cols, board.k):
+            return None
+        grid = board.grid
+        changed = [(r, c) for r in range(board.size) for c in range(board.cols) if grid[r][c] != prev[r][c]]
+        if len(changed) != 1:
+            return None
+        r, c = changed[0]
+        if prev[r][c] != " " or grid[r][c] != self.opponent:
+            return None
+        for child in root.children:
+            if child.move == (r, c):
+                child.parent = None
+                return child
+        return None
+
+    def _iterate(self, board: GameBoard, root: _Node) -> None:
+        """One selection / expansion / playout / backpropagation pass."""
+        node = root
+        # Selection: follow UCT while every move of the node has been tried.
+        while not node.untried and node.children:
+            node = self._select(node)
+            board.push(node.move, node.mover)
+
+        # Expansion: add one untried move (terminal nodes have none).
+        if node.untried:
+            untried = node.untried
+            move = untried.pop(self._rng.randrange(len(untried)))
+            mover = _other(node.mover)
+            board.push(move, mover)
+            moves = list(board.available_moves()) if board.winner() is None else []
+            child = _Node(move, node, mover, moves)
+            node.children.append(child)
+            node = child
+
+        winner = self._playout(board, _other(node.mover))
+
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.mover:
+                node.wins += 1.0
+            node = node.parent
+
+    def _select(self, node: _Node) -> _Node:
+        log_n = math.log(node.visits)
+        c = self.exploration
+        best = node.children[0]
+        best_value = -1.0
+        for child in node.children:
+            value = child.wins / child.visits + c * math.sqrt(log_n / child.visits)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def _playout(self, board: GameBoard, symbol: str) -> Optional[str]:
+        """Play the position out (moves stay on `board`). Returns the winner, or None for a draw."""
+        winner = board.winner()
+        if winner is not None:
+            return winner
+        moves = list(board.available_moves())
+        rng = self._rng
+        if self.playout_policy == "random":
+            rng.shuffle(moves)
+            for move in moves:
+                board.push(move, symbol)
+                if board.winner() is not None:
+                    return symbol
+                symbol = _other(symbol)
+            return None
+
+        while moves:
+            i = self._tactical_index(board, moves, symbol)
+            if i < 0:
+                i = rng.randrange(len(moves))
+            moves[i], moves[-1] = moves[-1], moves[i]
+            board.push(moves.pop(), symbol)
+            if board.winner() is not None:
+                return symbol
+            symbol = _other(symbol)
+        return None
+
+    @staticmethod
+    def _tactical_index(board: GameBoard, moves: List[Move], symbol: str) -> int:
+        """Index of a move that wins for `symbol`, else one that blocks the opponent, else -1."""
+        block = -1
+        other = _other(symbol)
+        for i, move in enumerate(moves):
+            board.push(move, symbol)
+            wins = board.winner() is not None
+            board.pop()
+            if wins:
+                return i
+            if block < 0:
+                board.push(move, other)
+                if board.winner() is not None:
+                    block = i
+                board.pop()
+        return block
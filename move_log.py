@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import List, Optional, Tuple
+
+
+# Serialized game: rows, cols, k, first mover (0: X, 1: O; plus _HAS_START if the game
+# starts from a loaded position), then that position as one cell code per cell (0 empty,
+# 1 X, 2 O), then one cell index per move (1 byte each on boards of up to 256 cells, else
+# 2 bytes little-endian).
+_HEADER = struct.Struct("<BBBB")
+_HAS_START = 0x80
+
+
+def _other(symbol: str) -> str:
+    return "O" if symbol == "X" else "X"
+
+
+class MoveLog:
+    """Moves of one game as flat cell indices (``row * cols + col``), with undo/redo.
+
+    The moves before `ply` have been played; the ones after it were undone and can be
+    redone until a new move is recorded. Sides alternate, so only the first mover is kept.
+    `start` holds the cell codes (0 empty, 1 X, 2 O) of the position the moves were played
+    from, or None for an empty board.
+    """
+
+    def __init__(self, first: str = "X", start: Optional[bytes] = None) -> None:
+        self.first = first
+        self.start = start
+        self._cells = array("H")
+        self._ply = 0
+
+    @property
+    def ply(self) -> int:
+        """Number of moves currently played."""
+        return self._ply
+
+    @property
+    def can_undo(self) -> bool:
+        return self._ply > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._ply < len(self._cells)
+
+    def __len__(self) -> int:
+        """Moves recorded, including undone ones that can still be redone."""
+        return len(self._cells)
+
+    def symbol_at(self, ply: int) -> str:
+        """Symbol that plays move number `ply` (0-based)."""
+        return self.first if ply % 2 == 0 else _other(self.first)
+
+    def played(self) -> List[int]:
+        return self._cells[: self._ply].tolist()
+
+    def clear(self, first: str = "X", start: Optional[bytes] = None) -> None:
+        self.first = first
+        self.start = start
+        del self._cells[:]
+        self._ply = 0
+
+    def record(self, cell: int) -> None:
+        """Append a played move, dropping any undone moves after it."""
+        del self._cells[self._ply :]
+        self._cells.append(cell)
+        self._ply += 1
+
+    def undo(self) -> int:
+        """Step back one move and return its cell."""
+        if not self._ply:
+            raise IndexError("no move to undo")
+        self._ply -= 1
+        return self._cells[self._ply]
+
+    def redo(self) -> int:
+        """Step forward over the next undone move and return its cell."""
+        if self._ply >= len(self._cells):
+            raise IndexError("no move to redo")
+        self._ply += 1
+        return self._cells[self._ply - 1]
+
+    def to_bytes(self, rows: int, cols: int, k: int) -> bytes:
+        """The played moves with the board shape (undone moves are not included)."""
+        first = 0 if self.first == "X" else 1
+        if self.start is None:
+            header = _HEADER.pack(rows, cols, k, first)
+        else:
+            if len(self.start) != rows * cols:
+                raise ValueError("start position does not match the board shape")
+            header = _HEADER.pack(rows, cols, k, first | _HAS_START) + self.start
+        cells = self._cells[: self._ply]
+        if rows * cols <= 256:
+            return header + bytes(cells.tolist())
+        if sys.byteorder != "little":
+            cells.byteswap()
+        return header + cells.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple[int, int, int, "MoveLog"]:
+        """Inverse of to_bytes: (rows, cols, k, log with every move played)."""
+        if len(data) < _HEADER.size:
+            raise ValueError("truncated game record")
+        rows, cols, k, first = _HEADER.unpack_from(data, 0)
+        body = data[_HEADER.size :]
+        start = None
+        if first & _HAS_START:
+            if len(body) < rows * cols:
+                raise ValueError("truncated game record")
+            start, body = bytes(body[: rows * cols]), body[rows * cols :]
+            if max(start, default=0) > 2:
+                raise ValueError("invalid start position in game record")
+        log = cls("X" if first & 1 == 0 else "O", start)
+        if rows * cols <= 256:
+            log._cells.extend(body)
+        else:
+            if len(body) % 2:
+                raise ValueError("truncated game record")
+            log._cells.frombytes(body)
+            if sys.byteorder != "little":
+                log._cells.byteswap()
+        log._ply = len(log._cells)
+        return rows, cols, k, log
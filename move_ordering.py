@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from game_board import DIRECTIONS, GameBoard, Move
+
+
+@lru_cache(maxsize=None)
+def static_priority(rows: int, cols: int, k: int) -> Tuple[int, ...]:
+    """Number of k-in-a-row lines through each cell (index ``row * cols + col``).
+
+    On 3x3 this ranks the center (4 lines) before corners (3) before edges (2); on larger boards
+    it favours central cells in the same way.
+    """
+    counts = [0] * (rows * cols)
+    for dr, dc in DIRECTIONS:
+        for r in range(rows):
+            for c in range(cols):
+                end_r = r + (k - 1) * dr
+                end_c = c + (k - 1) * dc
+                if 0 <= end_r < rows and 0 <= end_c < cols:
+                    for i in range(k):
+                        counts[(r + i * dr) * cols + (c + i * dc)] += 1
+    return tuple(counts)
+
+
+class MoveOrdering:
+    """Decides the order in which AIPlayer tries moves. The base class keeps board order."""
+
+    def new_search(self) -> None:
+        """Called once per choose_move before searching."""
+
+    def order(self, board: GameBoard, moves: List[Move], symbol: str, depth: int) -> List[Move]:
+        """Return `moves` (legal moves for `symbol` at ply `depth`) best-first."""
+        return moves
+
+    def record_cutoff(self, move: Move, depth: int, remaining: int) -> None:
+        """Called when `move` caused an alpha-beta cutoff at ply `depth`."""
+
+
+@dataclass
+class HeuristicOrdering(MoveOrdering):
+    """Best-first move ordering built from independent, switchable heuristics.
+
+    Moves are sorted by, in priority order:
+
+    - ``tactical``: moves that win immediately, then moves that block an immediate loss
+    - ``killers``: up to two moves that recently caused a cutoff at the same ply
+    - ``static``: cells on more potential lines first (center, then corners, then edges on 3x3)
+    - ``history``: moves that caused cutoffs anywhere in the search, weighted by the depth
+      remaining below them (kept across searches, halved at the start of each one); this
+      breaks ties between cells of equal static priority
+    """
+
+    static: bool = True
+    tactical: bool = True
+    killers: bool = True
+    history: bool = True
+
+    _killers: List[List[Move]] = field(default_factory=list, init=False, repr=False)
+    _history: Dict[Move, int] = field(default_factory=dict, init=False, repr=False)
+
+    def new_search(self) -> None:
+        self._killers = []
+        for move in list(self._history):
+            self._history[move] >>= 1
+            if not self._history[move]:
+                del self._history[move]
+
+    def order(self, board: GameBoard, moves: List[Move], symbol: str, depth: int) -> List[Move]:
+        if len(moves) < 2:
+            return moves
+        cols = board.cols
+        priority = static_priority(board.size, cols, board.k) if self.static else None
+        killers = self._killers[depth] if self.killers and depth < len(self._killers) else ()
+        history = self._history if self.history else {}
+        other = "O" if symbol == "X" else "X"
+
+        def key(move: Move) -> Tuple[int, int, int, int]:
+            tactic = 2
+            if self.tactical:
+                board.push(move, symbol)
+                wins = board.winner() is not None
+                board.pop()
+                if wins:
+                    tactic = 0
+                else:
+                    board.push(move, other)
+                    blocks = board.winner() is not None
+                    board.pop()
+                    if blocks:
+                        tactic = 1
+            killer = killers.index(move) if move in killers else 2
+            return (
+                tactic,
+                killer,
+                -priority[move[0] * cols + move[1]] if priority is not None else 0,
+                -history.get(move, 0),
+            )
+
+        return sorted(moves, key=key)
+
+    def record_cutoff(self, move: Move, depth: int, remaining: int) -> None:
+        if self.killers:
+            while len(self._killers) <= depth:
+                self._killers.append([])
+            slot = self._killers[depth]
+            if move not in slot:
+                slot.insert(0, move)
+                del slot[2:]
+        if self.history:
+            self._history[move] = self._history.get(move, 0) + remaining * remaining
@@ -1,38 +1,452 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import socket
+import struct
 import threading
-from dataclasses import dataclass
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, replace
 from typing import Callable, Optional, Tuple
 
 
 Move = Tuple[int, int]
 
+# Sent in the host's hello. Version 2 numbers every host -> client state update with "seq":
+# full 'sync' snapshots, and 'move' / 'restart' deltas in between.
+PROTOCOL_VERSION = 2
+
+
+# Binary framing, offered in the host's hello and used once both sides have switched (see
+# OnlineHost). Each frame is a little-endian uint16 payload length and the payload, whose
+# first byte is the message kind. Symbols use the Zobrist cell codes (0 empty, 1 X, 2 O);
+# seq, symbol and hash are 0 when the message has none.
+_LENGTH = struct.Struct("<H")
+# Largest binary payload; bigger messages must be split by the sender (see lobby 'list').
+MAX_FRAME = 0xFFFF
+_MOVE = struct.Struct("<BIBBBQ")  # kind, seq, row, col, symbol, hash
+_RESTART = struct.Struct("<BI")  # kind, seq
+_SYNC = struct.Struct("<BIBBBBQ")  # kind, seq, rows, cols, k, turn, hash; then one byte per cell
+_PING = struct.Struct("<BI")  # kind, id (ping and pong)
+# Kind 0 carries any other message as UTF-8 JSON.
+_KIND_JSON, _KIND_MOVE, _KIND_RESTART, _KIND_SYNC, _KIND_RESYNC, _KIND_PING, _KIND_PONG = range(7)
+_CODE = {" ": 0, "X": 1, "O": 2}
+_SYMBOLS = (" ", "X", "O")
+
+
+def _encode_binary(msg: dict) -> bytes:
+    t = msg.get("type")
+    try:
+        if t == "move":
+            return _MOVE.pack(
+                _KIND_MOVE,
+                msg.get("seq", 0),
+                msg["row"],
+                msg["col"],
+                _CODE.get(msg.get("symbol", " "), 0),
+                msg.get("hash", 0),
+            )
+        if t == "restart":
+            return _RESTART.pack(_KIND_RESTART, msg.get("seq", 0))
+        if t == "resync":
+            return bytes((_KIND_RESYNC,))
+        if t in ("ping", "pong"):
+            return _PING.pack(_KIND_PING if t == "ping" else _KIND_PONG, msg.get("id", 0))
+        if t == "sync":
+            grid = msg["grid"]
+            header = _SYNC.pack(
+                _KIND_SYNC,
+                msg.get("seq", 0),
+                msg["rows"],
+                msg["cols"],
+                msg["k"],
+                _CODE[msg["turn"]],
+                msg.get("hash", 0),
+            )
+            return header + bytes(_CODE[cell] for row in grid for cell in row)
+    except (KeyError, TypeError, struct.error):
+        pass  # Not representable in the fixed layout: send it as JSON.
+    return bytes((_KIND_JSON,)) + json.dumps(msg, separators=(",", ":")).encode("utf-8")
+
+
+def _decode_binary(buf: bytearray, offset: int, size: int) -> Optional[dict]:
+    """Message in the `size`-byte payload at buf[offset:], or None if it is malformed."""
+    kind = buf[offset]
+    msg: dict
+    if kind == _KIND_MOVE and size == _MOVE.size:
+        _kind, seq, row, col, symbol, position_hash = _MOVE.unpack_from(buf, offset)
+        if symbol > 2:
+            return None
+        msg = {"type": "move", "row": row, "col": col}
+        if symbol:
+            msg["symbol"] = _SYMBOLS[symbol]
+        if position_hash:
+            msg["hash"] = position_hash
+    elif kind == _KIND_RESTART and size == _RESTART.size:
+        _kind, seq = _RESTART.unpack_from(buf, offset)
+        msg = {"type": "restart"}
+    elif kind == _KIND_RESYNC:
+        return {"type": "resync"}
+    elif kind in (_KIND_PING, _KIND_PONG) and size == _PING.size:
+        _kind, ping_id = _PING.unpack_from(buf, offset)
+        return {"type": "ping" if kind == _KIND_PING else "pong", "id": ping_id}
+    elif kind == _KIND_SYNC and size >= _SYNC.size:
+        _kind, seq, rows, cols, k, turn, position_hash = _SYNC.unpack_from(buf, offset)
+        if size != _SYNC.size + rows * cols or turn > 2:
+            return None
+        start = offset + _SYNC.size
+        cells = buf[start : start + rows * cols]
+        if cells and max(cells) > 2:
+            return None
+        grid = [[_SYMBOLS[c] for c in cells[r * cols : (r + 1) * cols]] for r in range(rows)]
+        msg = {"type": "sync", "grid": grid, "turn": _SYMBOLS[turn], "rows": rows, "cols": cols, "k": k}
+        msg["hash"] = position_hash
+    elif kind == _KIND_JSON:
+        try:
+            msg = json.loads(bytes(buf[offset + 1 : offset + size]))
+        except ValueError:
+            return None
+        return msg if isinstance(msg, dict) else None
+    else:
+        return None
+    if seq:
+        msg["seq"] = seq
+    return msg
+
+
+def _encode(msg: dict, binary: bool) -> bytes:
+    """Wire bytes of `msg`. Raises ValueError if it does not fit in one binary frame."""
+    if binary:
+        payload = _encode_binary(msg)
+        if len(payload) > MAX_FRAME:
+            raise ValueError(f"{msg.get('type')!r} message of {len(payload):,} bytes exceeds one frame")
+        return _LENGTH.pack(len(payload)) + payload
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _Receiver:
+    """Incoming bytes -> messages, parsed in place in one reusable buffer.
+
+    The transport reads straight into get_buffer() (recv_into, no per-chunk bytes objects)
+    and feed() parses what arrived, so a burst costs time linear in its size. `binary`
+    picks the framing (JSON lines or length-prefixed binary); a message handler may flip it,
+    and the bytes after that message are read in the new framing.
+    """
+
+    def __init__(self, size: int = 1 << 16) -> None:
+        self.binary = False
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        # Unparsed bytes are _buf[_start:_end].
+        self._start = 0
+        self._end = 0
+
+    def get_buffer(self) -> memoryview:
+        """Free space to receive into."""
+        if self._end == len(self._buf):
+            self._make_room()
+        return self._view[self._end :]
+
+    def feed(self, nbytes: int, on_message: Callable[[dict], None]) -> None:
+        """`nbytes` were written into the last get_buffer(): deliver the complete messages.
+
+        Raises ValueError once more than MAX_FRAME bytes are pending without ending a JSON
+        line, so a peer cannot grow the buffer without limit.
+        """
+        self._end += nbytes
+        while True:
+            msg = self._next_message()
+            if msg is None:
+                break
+            if msg:
+                on_message(msg)
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif not self.binary and self._end - self._start > MAX_FRAME:
+            raise ValueError(f"no end of line in {self._end - self._start:,} bytes")
+
+    def _next_message(self) -> Optional[dict]:
+        """The next complete message, {} for one to skip, or None if more bytes are needed."""
+        buf, start, end = self._buf, self._start, self._end
+        if self.binary:
+            if end - start < _LENGTH.size:
+                return None
+            (size,) = _LENGTH.unpack_from(buf, start)
+            payload = start + _LENGTH.size
+            if end - payload < size:
+                return None
+            self._start = payload + size
+            if not size:
+                return {}
+            return _decode_binary(buf, payload, size) or {}
+
+        newline = buf.find(b"\n", start, end)
+        if newline < 0:
+            return None
+        self._start = newline + 1
+        line = bytes(self._view[start:newline]).strip()
+        if not line:
+            return {}
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return {}
+        return msg if isinstance(msg, dict) else {}
+
+    def _make_room(self) -> None:
+        """Move the unparsed tail to the front of the buffer, growing it if it is all tail."""
+        pending = self._end - self._start
+        if self._start:
+            self._buf[:pending] = self._buf[self._start : self._end]
+        else:
+            # One message bigger than the buffer.
+            self._buf = self._buf + bytearray(len(self._buf))
+            self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = pending
+
+
+# Every connection runs on this one event loop, on a daemon thread started on first use.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="online-net", daemon=True).start()
+            _loop = loop
+        return _loop
 
-def _send_json_line(sock: socket.socket, obj: dict) -> None:
-    data = (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
-    sock.sendall(data)
 
+@dataclass
+class ConnectionStats:
+    """Traffic and latency of one connection (see OnlineHost.stats / OnlineClient.stats)."""
+
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    messages_sent: int = 0
+    messages_received: int = 0
+    # Messages waiting for the loop thread, and bytes asyncio holds because the socket is full.
+    send_queue: int = 0
+    send_buffer_bytes: int = 0
+    pings_sent: int = 0
+    pongs_received: int = 0
+    # Ping round-trip times in ms: the last one, the lowest, and a moving average.
+    rtt_ms: Optional[float] = None
+    rtt_min_ms: Optional[float] = None
+    rtt_avg_ms: Optional[float] = None
+    # Age of the last ping while its pong is still outstanding (the RTT so far).
+    pong_wait_ms: Optional[float] = None
+    # Time spent in the on_message handlers on the loop thread. An app that hands messages
+    # to another thread (a GUI's event loop) only pays for the hand-off here. Pings and pongs
+    # are answered inside the connection and not counted.
+    handled: int = 0
+    handler_s: float = 0.0
+    handler_max_ms: float = 0.0
+    # Time the app reports for applying messages on its own thread (see record_apply()).
+    applied: int = 0
+    apply_s: float = 0.0
+    apply_max_ms: float = 0.0
+
+    def add_rtt(self, rtt_ms: float) -> None:
+        self.pongs_received += 1
+        self.rtt_ms = rtt_ms
+        self.rtt_min_ms = rtt_ms if self.rtt_min_ms is None else min(self.rtt_min_ms, rtt_ms)
+        # Smoothed like TCP's SRTT (weight 1/8 for the new sample).
+        self.rtt_avg_ms = rtt_ms if self.rtt_avg_ms is None else self.rtt_avg_ms + (rtt_ms - self.rtt_avg_ms) / 8
+
+    def add_apply(self, seconds: float) -> None:
+        self.applied += 1
+        self.apply_s += seconds
+        self.apply_max_ms = max(self.apply_max_ms, seconds * 1000)
+
+    def summary(self) -> str:
+        """One line for a status bar."""
+        rtt = "RTT -" if self.rtt_avg_ms is None else f"RTT {self.rtt_avg_ms:.1f} ms (min {self.rtt_min_ms:.1f})"
+        if self.pong_wait_ms is not None and self.pong_wait_ms > (self.rtt_ms or 0.0):
+            rtt += f" waiting {self.pong_wait_ms:.0f} ms"
+        handler = self.handler_s / self.handled * 1000 if self.handled else 0.0
+        line = (
+            f"{rtt}  out {self.messages_sent} msg / {self.bytes_sent:,} B"
+            f"  in {self.messages_received} msg / {self.bytes_received:,} B"
+            f"  queue {self.send_queue} ({self.send_buffer_bytes:,} B)"
+            f"  handler {handler:.2f} ms avg, {self.handler_max_ms:.1f} max"
+        )
+        if self.applied:
+            line += f"  apply {self.apply_s / self.applied * 1000:.2f} ms avg, {self.apply_max_ms:.1f} max"
+        return line
+
+
+class _Connection(asyncio.BufferedProtocol):
+    """One TCP connection on the shared loop. Callbacks run on the loop thread.
+
+    write() may be called from any thread; writes go out in call order. Every connection
+    answers 'ping' with 'pong'; with `ping_interval` it also sends pings itself and keeps
+    the round-trip times in `stats`. Pings and pongs never reach on_message.
+    """
 
-def _recv_lines(sock: socket.socket, on_line: Callable[[str], None], stop_event: threading.Event) -> None:
-    buf = ""
-    sock.settimeout(0.5)
-    while not stop_event.is_set():
+    def __init__(
+        self,
+        on_open: Callable[["_Connection"], None],
+        on_message: Callable[["_Connection", dict], None],
+        on_close: Callable[["_Connection"], None],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        buffer_size: int = 1 << 16,
+        ping_interval: Optional[float] = None,
+    ) -> None:
+        # Starting size of the receive buffer (it grows for bigger messages).
+        self.receiver = _Receiver(buffer_size)
+        self.transport: Optional[asyncio.Transport] = None
+        # Framing of the pongs and pings this connection sends itself; owners set it when
+        # they switch their own output to binary.
+        self.binary_out = False
+        self.stats = ConnectionStats()
+        self._on_open = on_open
+        self._on_message = on_message
+        self._on_close = on_close
+        # The loop the transport runs on (default: the shared background loop).
+        self._loop = loop or _event_loop()
+        # Writes requested and writes handled on the loop; the difference is still queued.
+        self._queued = 0
+        self._written = 0
+        self._queued_lock = threading.Lock()
+        self._ping_interval = ping_interval
+        self._ping_handle: Optional[asyncio.TimerHandle] = None
+        # Id and send time of the last ping; an answer to an older one is ignored.
+        self._ping_id = 0
+        self._ping_sent = 0.0
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self._ping_interval:
+            self._ping_handle = self._loop.call_later(self._ping_interval, self._ping)
+        self._on_open(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.receiver.get_buffer()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.stats.bytes_received += nbytes
         try:
-            chunk = sock.recv(4096)
-        except socket.timeout:
-            continue
-        except OSError:
-            break
-        if not chunk:
-            break
-        buf += chunk.decode("utf-8", errors="replace")
-        while "\n" in buf:
-            line, buf = buf.split("\n", 1)
-            line = line.strip()
-            if line:
-                on_line(line)
+            self.receiver.feed(nbytes, self._dispatch)
+        except ValueError:
+            # A line too long to be one of ours: drop the peer rather than buffer it all.
+            self._close_now()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.transport = None
+        if self._ping_handle is not None:
+            self._ping_handle.cancel()
+            self._ping_handle = None
+        self._on_close(self)
+
+    def write(self, data: bytes) -> None:
+        with self._queued_lock:
+            self._queued += 1
+        # Always queued, even on the loop thread, so nothing overtakes an earlier write.
+        self._loop.call_soon_threadsafe(self._write_now, data)
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._close_now)
+
+    def snapshot_stats(self) -> ConnectionStats:
+        """A copy of `stats` with the current send queue filled in."""
+        stats = replace(self.stats)
+        stats.send_queue = self._queued - self._written
+        if self._ping_sent:
+            stats.pong_wait_ms = (time.perf_counter() - self._ping_sent) * 1000
+        transport = self.transport
+        if transport is not None:
+            stats.send_buffer_bytes = transport.get_write_buffer_size()
+        return stats
+
+    def _dispatch(self, msg: dict) -> None:
+        stats = self.stats
+        stats.messages_received += 1
+        t = msg.get("type")
+        if t == "ping":
+            self.write(_encode({"type": "pong", "id": msg.get("id", 0)}, self.binary_out))
+            return
+        if t == "pong":
+            if msg.get("id") == self._ping_id and self._ping_sent:
+                stats.add_rtt((time.perf_counter() - self._ping_sent) * 1000)
+                self._ping_sent = 0.0
+            return
+        start = time.perf_counter()
+        try:
+            self._on_message(self, msg)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.handled += 1
+            stats.handler_s += elapsed
+            stats.handler_max_ms = max(stats.handler_max_ms, elapsed * 1000)
+
+    def _ping(self) -> None:
+        if self.transport is None or self._ping_interval is None:
+            return
+        self._ping_id = self._ping_id % 0xFFFFFFFF + 1
+        self._ping_sent = time.perf_counter()
+        self.stats.pings_sent += 1
+        self.write(_encode({"type": "ping", "id": self._ping_id}, self.binary_out))
+        self._ping_handle = self._loop.call_later(self._ping_interval, self._ping)
+
+    def _write_now(self, data: bytes) -> None:
+        self._written += 1
+        if self.transport is not None and not self.transport.is_closing():
+            self.stats.messages_sent += 1
+            self.stats.bytes_sent += len(data)
+            self.transport.write(data)
+
+    def _close_now(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+
+class SequenceTracker:
+    """Client-side check of the order of the host's numbered updates.
+
+    A delta is applied only if it is the next update (seq = last + 1). Older numbers are
+    duplicates or late copies and are dropped. A jump ahead means updates were lost: deltas
+    are then dropped until a snapshot, which carries the whole state, catches the client up.
+    """
+
+    def __init__(self) -> None:
+        self.last: Optional[int] = None
+        self.awaiting_snapshot = True
+        self.duplicates = 0
+        self.gaps = 0
+
+    def check(self, msg: dict) -> str:
+        """'apply', 'drop', or 'resync' (drop it and ask the host for a snapshot)."""
+        seq = msg.get("seq")
+        if not isinstance(seq, int):
+            return "apply"  # Version 1 host: no sequence numbers.
+        if msg.get("type") == "sync":
+            # A snapshot holds the whole state: take it if it is newer or we asked for one.
+            if self.awaiting_snapshot or self.last is None or seq > self.last:
+                self.last = seq
+                self.awaiting_snapshot = False
+                return "apply"
+            self.duplicates += 1
+            return "drop"
+        if self.last is not None and seq <= self.last:
+            self.duplicates += 1
+            return "drop"
+        if self.awaiting_snapshot:
+            return "drop"
+        if seq != self.last + 1:
+            self.gaps += 1
+            self.awaiting_snapshot = True
+            return "resync"
+        self.last = seq
+        return "apply"
 
 
 @dataclass
@@ -42,7 +456,17 @@ class OnlineConfig:
 
 
 class OnlineHost:
-    """Host side of a 2-player connection (accepts one joiner)."""
+    """Host side of a 2-player connection (accepts one joiner).
+
+    Messages start as JSON lines. With `binary`, the hello offers binary framing; a joiner
+    that takes it answers with its own hello and sends binary from then on, and the host
+    confirms with a 'framing' line before switching its own output.
+
+    A version 2 joiner names its version in that hello. Until it has, the joiner is treated
+    as version 1, which ignores 'move' deltas: check `deltas` and send a full sync instead.
+
+    Sockets live on a shared asyncio loop thread; the callbacks are called from it.
+    """
 
     def __init__(
         self,
@@ -50,131 +474,150 @@ class OnlineHost:
         on_message: Callable[[dict], None],
         on_connect: Callable[[], None],
         on_disconnect: Callable[[], None],
+        binary: bool = True,
+        ping_interval: Optional[float] = 2.0,
     ) -> None:
         self.config = config
         self.on_message = on_message
         self.on_connect = on_connect
         self.on_disconnect = on_disconnect
-
-        self._listener: Optional[socket.socket] = None
-        self._sock: Optional[socket.socket] = None
-        self._accept_thread: Optional[threading.Thread] = None
-        self._rx_thread: Optional[threading.Thread] = None
-        self._stop = threading.Event()
+        self.binary = binary
+        # Seconds between pings measuring the round-trip time (None: no pings).
+        self.ping_interval = ping_interval
+        # Framing currently used towards the joiner: "json" or "binary".
+        self.framing = "json"
+        # Protocol version of the joiner, from its hello (1 until it sends one).
+        self.peer_version = 1
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._conn: Optional[_Connection] = None
+        # Number of the last update sent to the joiner.
+        self._seq = 0
+        self._send_lock = threading.Lock()
 
     @property
     def connected(self) -> bool:
-        return self._sock is not None
+        return self._conn is not None
 
-    def start(self) -> None:
-        if self._accept_thread is not None:
+    @property
+    def deltas(self) -> bool:
+        """Whether the joiner understands 'move' deltas; if not, send every change as a sync."""
+        return self.peer_version >= 2
+
+    def stats(self) -> Optional[ConnectionStats]:
+        """Traffic and round-trip times of the current connection, or None without one."""
+        conn = self._conn
+        return conn.snapshot_stats() if conn is not None else None
+
+    def record_apply(self, seconds: float) -> None:
+        """Add the time the app took to apply a received message on its own thread."""
+        conn = self._conn
+        if conn is not None:
+            conn.stats.add_apply(seconds)
+
+    def start(self, timeout: float = 5.0) -> None:
+        """Start listening. Raises OSError if the port cannot be bound."""
+        if self._server is not None:
             return
-        self._stop.clear()
-        self._accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
-        self._accept_thread.start()
+        loop = _event_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            loop.create_server(self._new_connection, self.config.host, self.config.port, reuse_address=True), loop
+        )
+        self._server = future.result(timeout)
 
     def stop(self) -> None:
-        self._stop.set()
-        for s in (self._sock, self._listener):
-            try:
-                if s is not None:
-                    s.close()
-            except Exception:
-                pass
-        self._sock = None
-        self._listener = None
-        self._accept_thread = None
-        self._rx_thread = None
+        """Stop listening and drop the joiner, without waiting for either."""
+        server, conn = self._server, self._conn
+        self._server = None
+        if server is not None:
+            server.get_loop().call_soon_threadsafe(server.close)
+        if conn is not None:
+            conn.close()
 
     def send_sync(self, payload: dict) -> None:
-        if self._sock is None:
-            return
-        payload = dict(payload)
-        payload["type"] = "sync"
-        _send_json_line(self._sock, payload)
+        """Full snapshot of the game (on connect, board changes and resync requests)."""
+        self._send_update(dict(payload, type="sync"))
 
-    def send_restart(self) -> None:
-        if self._sock is None:
-            return
-        _send_json_line(self._sock, {"type": "restart"})
+    def send_move(self, move: Move, symbol: str, position_hash: Optional[int] = None) -> None:
+        """Delta: `symbol` was played at `move`. `position_hash` (GameBoard.zobrist after the
+        move) lets the joiner notice that its board has drifted from the host's.
+
+        Only for joiners with `deltas`; a version 1 joiner would ignore it."""
+        msg = {"type": "move", "row": move[0], "col": move[1], "symbol": symbol}
+        if position_hash is not None:
+            msg["hash"] = position_hash
+        self._send_update(msg)
 
-    def _accept_loop(self) -> None:
-        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self._listener = listener
-        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        listener.bind((self.config.host, self.config.port))
-        listener.listen(1)
-        listener.settimeout(0.5)
+    def send_restart(self) -> None:
+        self._send_update({"type": "restart"})
 
+    def _send_update(self, msg: dict) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        # Numbered and queued under one lock so seq order is wire order.
+        with self._send_lock:
+            self._seq += 1
+            msg["seq"] = self._seq
+            conn.write(_encode(msg, self.framing == "binary"))
+
+    def _new_connection(self) -> _Connection:
+        return _Connection(self._on_open, self._on_message, self._on_close, ping_interval=self.ping_interval)
+
+    def _on_open(self, conn: _Connection) -> None:
+        # Only allow one client.
+        if self._conn is not None:
+            conn.close()
+            return
+        with self._send_lock:
+            self.framing = "json"
+            self.peer_version = 1
+            self._conn = conn
+            hello = {
+                "type": "hello",
+                "symbol": "O",
+                "version": PROTOCOL_VERSION,
+                "framing": ["binary", "json"] if self.binary else ["json"],
+            }
+            conn.write(_encode(hello, False))
         try:
-            while not self._stop.is_set():
-                try:
-                    client, _addr = listener.accept()
-                except socket.timeout:
-                    continue
-                except OSError:
-                    break
-
-                # Only allow one client.
-                if self._sock is not None:
-                    try:
-                        client.close()
-                    except Exception:
-                        pass
-                    continue
-
-                self._sock = client
-                try:
-                    _send_json_line(client, {"type": "hello", "symbol": "O"})
-                except Exception:
-                    try:
-                        client.close()
-                    except Exception:
-                        pass
-                    self._sock = None
-                    continue
-
-                try:
-                    self.on_connect()
-                except Exception:
-                    pass
-
-                self._rx_thread = threading.Thread(target=self._rx_loop, daemon=True)
-                self._rx_thread.start()
+            self.on_connect()
+        except Exception:
+            pass
 
-        finally:
-            try:
-                listener.close()
-            except Exception:
-                pass
-
-    def _rx_loop(self) -> None:
-        assert self._sock is not None
-
-        def on_line(line: str) -> None:
-            try:
-                msg = json.loads(line)
-            except Exception:
+    def _on_message(self, conn: _Connection, msg: dict) -> None:
+        if conn is not self._conn:
+            return
+        if msg.get("type") == "hello":
+            version = msg.get("version")
+            self.peer_version = version if isinstance(version, int) else 1
+            if msg.get("framing") != "binary" or not self.binary:
                 return
-            self.on_message(msg)
+            # The joiner sends binary after its hello; confirm, then switch ours.
+            conn.receiver.binary = True
+            with self._send_lock:
+                conn.write(_encode({"type": "framing", "mode": "binary"}, False))
+                self.framing = "binary"
+                conn.binary_out = True
+            return
+        self.on_message(msg)
 
+    def _on_close(self, conn: _Connection) -> None:
+        if conn is not self._conn:
+            return
+        self._conn = None
         try:
-            _recv_lines(self._sock, on_line, self._stop)
-        finally:
-            try:
-                if self._sock is not None:
-                    self._sock.close()
-            except Exception:
-                pass
-            self._sock = None
-            try:
-                self.on_disconnect()
-            except Exception:
-                pass
+            self.on_disconnect()
+        except Exception:
+            pass
 
 
 class OnlineClient:
-    """Client for the remote player. Sends moves, receives sync updates."""
+    """Client for the remote player. Sends moves, receives sync updates.
+
+    With `binary`, accepts the host's offer of binary framing (see OnlineHost). The socket
+    lives on the same shared loop thread as OnlineHost's.
+    """
 
     def __init__(
         self,
@@ -182,72 +625,171 @@ class OnlineClient:
         port: int,
         on_message: Callable[[dict], None],
         on_disconnect: Callable[[], None],
+        binary: bool = True,
+        ping_interval: Optional[float] = 2.0,
     ) -> None:
         self.host = host
         self.port = port
         self.on_message = on_message
         self.on_disconnect = on_disconnect
+        self.binary = binary
+        # Seconds between pings measuring the round-trip time (None: no pings).
+        self.ping_interval = ping_interval
         self.symbol: Optional[str] = None
+        self.version = 1
+        self.sequence = SequenceTracker()
+        # Framing of what we send ("json" or "binary"); the host confirms before it follows.
+        self.framing = "json"
 
-        self._sock: Optional[socket.socket] = None
-        self._stop = threading.Event()
-        self._rx_thread: Optional[threading.Thread] = None
+        self._conn: Optional[_Connection] = None
+        self._send_lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def stats(self) -> Optional[ConnectionStats]:
+        """Traffic and round-trip times of the current connection, or None without one."""
+        conn = self._conn
+        return conn.snapshot_stats() if conn is not None else None
+
+    def record_apply(self, seconds: float) -> None:
+        """Add the time the app took to apply a received message on its own thread."""
+        conn = self._conn
+        if conn is not None:
+            conn.stats.add_apply(seconds)
 
     def connect(self, timeout: float = 5.0) -> None:
-        if self._sock is not None:
+        """Connect to the host. Raises OSError (or TimeoutError) if that fails."""
+        if self._conn is not None:
             return
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(timeout)
-        s.connect((self.host, self.port))
-        s.settimeout(None)
-        self._sock = s
-        self._stop.clear()
-        self._rx_thread = threading.Thread(target=self._rx_loop, daemon=True)
-        self._rx_thread.start()
+        self.sequence = SequenceTracker()
+        self.framing = "json"
+        loop = _event_loop()
+        conn = _Connection(lambda _conn: None, self._on_message, self._on_close, ping_interval=self.ping_interval)
+        # Set first: the host's hello can arrive before create_connection() returns here.
+        self._conn = conn
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(loop.create_connection(lambda: conn, self.host, self.port), timeout), loop
+        )
+        try:
+            future.result(timeout + 1)
+        except (FutureTimeout, asyncio.TimeoutError):
+            future.cancel()
+            self._conn = None
+            raise TimeoutError(f"timed out connecting to {self.host}:{self.port}") from None
+        except BaseException:
+            self._conn = None
+            raise
 
     def close(self) -> None:
-        self._stop.set()
-        try:
-            if self._sock is not None:
-                self._sock.close()
-        except Exception:
-            pass
-        self._sock = None
+        """Drop the connection without waiting for it to shut down."""
+        conn = self._conn
+        if conn is not None:
+            conn.close()
 
     def send_move(self, move: Move) -> None:
-        if self._sock is None:
-            return
-        _send_json_line(self._sock, {"type": "move", "row": move[0], "col": move[1]})
+        self._send({"type": "move", "row": move[0], "col": move[1]})
 
     def send_restart(self) -> None:
-        if self._sock is None:
-            return
-        _send_json_line(self._sock, {"type": "restart"})
+        self._send({"type": "restart"})
 
     def send_sync(self, payload: dict) -> None:
-        if self._sock is None:
-            return
         payload = dict(payload)
         payload["type"] = "sync"
-        _send_json_line(self._sock, payload)
+        self._send(payload)
+
+    def request_resync(self) -> None:
+        """Ignore deltas until the host answers with a full snapshot."""
+        self.sequence.awaiting_snapshot = True
+        self._send({"type": "resync"})
 
-    def _rx_loop(self) -> None:
-        assert self._sock is not None
+    # Lobby requests (lobby_server.py only; its hello has "lobby": true). Replies arrive
+    # through on_message as 'matches', 'joined', 'left', 'stats' or 'error'.
 
-        def on_line(line: str) -> None:
-            try:
-                msg = json.loads(line)
-            except Exception:
+    def list_matches(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        shape: Optional[Tuple[int, int, int]] = None,
+        open_only: bool = False,
+    ) -> None:
+        """Ask for one page of matches, optionally only (open) ones of a rows, cols, k shape.
+
+        The reply has "more" set when there are matches after the page; ask again with
+        offset + len(matches) for the next one.
+        """
+        msg: dict = {"type": "list", "offset": offset}
+        if limit is not None:
+            msg["limit"] = limit
+        if shape is not None:
+            msg["rows"], msg["cols"], msg["k"] = shape
+        if open_only:
+            msg["open"] = True
+        self._send(msg)
+
+    def create_match(self, rows: int = 3, cols: int = 3, k: int = 3, name: Optional[str] = None) -> None:
+        msg: dict = {"type": "create", "rows": rows, "cols": cols, "k": k}
+        if name:
+            msg["name"] = name
+        self._send(msg)
+
+    def join_match(self, match_id: Optional[int] = None, rows: int = 3, cols: int = 3, k: int = 3) -> None:
+        """Join `match_id`, or with None any open rows x cols match (creating one if needed)."""
+        msg: dict = {"type": "join", "rows": rows, "cols": cols, "k": k}
+        if match_id is not None:
+            msg["match"] = match_id
+        self._send(msg)
+
+    def leave_match(self) -> None:
+        self._send({"type": "leave"})
+
+    def _send(self, msg: dict) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        with self._send_lock:
+            conn.write(_encode(msg, self.framing == "binary"))
+
+    def _on_message(self, conn: _Connection, msg: dict) -> None:
+        t = msg.get("type")
+        if t == "hello":
+            self.symbol = msg.get("symbol")
+            version = msg.get("version")
+            self.version = version if isinstance(version, int) else 1
+            framing = msg.get("framing")
+            # Our hello names our version, so the host knows we take deltas, and goes out as
+            # the last JSON line; with binary framing everything after it is binary.
+            hello: dict = {"type": "hello", "version": PROTOCOL_VERSION}
+            with self._send_lock:
+                if self.binary and isinstance(framing, list) and "binary" in framing:
+                    hello["framing"] = "binary"
+                conn.write(_encode(hello, False))
+                if "framing" in hello:
+                    self.framing = "binary"
+                    conn.binary_out = True
+        elif t == "framing":
+            conn.receiver.binary = msg.get("mode") == "binary"
+            return
+        elif t == "joined":
+            # A match has its own numbering; its snapshot follows.
+            self.symbol = msg.get("symbol")
+            self.sequence = SequenceTracker()
+        elif t in ("sync", "move", "restart"):
+            verdict = self.sequence.check(msg)
+            if verdict == "resync":
+                self.sequence.awaiting_snapshot = True
+                with self._send_lock:
+                    conn.write(_encode({"type": "resync"}, self.framing == "binary"))
+            if verdict != "apply":
                 return
-            if msg.get("type") == "hello":
-                self.symbol = msg.get("symbol")
-            self.on_message(msg)
+        self.on_message(msg)
 
+    def _on_close(self, conn: _Connection) -> None:
+        if conn is not self._conn:
+            return
+        self._conn = None
         try:
-            _recv_lines(self._sock, on_line, self._stop)
-        finally:
-            self.close()
-            try:
-                self.on_disconnect()
-            except Exception:
-                pass
+            self.on_disconnect()
+        except Exception:
+            pass
@@ -16,4 +16,4 @@ class Player:
         if move is None:
             return False
         r, c = move
-        return (0 <= r < board.size) and (0 <= c < board.size) and board.grid[r][c] == " "
+        return (0 <= r < board.size) and (0 <= c < board.cols) and board.grid[r][c] == " "
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ai_player import AIPlayer, SearchCancelled, SearchStats
+from game_board import GameBoard, Move
+from move_ordering import static_priority
+
+
+class Ponderer:
+    """Searches the AI's reply to every possible human move while the human is thinking.
+
+    Replies are cached by the position after the human's move. When the real move arrives,
+    take() returns the cached reply, or lets the search already working on that move finish,
+    and abandons the rest.
+    """
+
+    def __init__(self, ai: AIPlayer) -> None:
+        self.ai = ai
+        self.hits = 0
+        self.misses = 0
+        # position_key -> (reply, stats of the search that found it).
+        self._cache: Dict[int, Tuple[Optional[Move], Optional[SearchStats]]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Abort the current search / finish it and exit.
+        self._cancel = threading.Event()
+        self._finish = threading.Event()
+        # position_key of the reply being searched right now.
+        self._current: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, board: GameBoard, human_symbol: str) -> None:
+        """Begin pondering the position on `board` with `human_symbol` to move."""
+        self.stop()
+        self._cancel = threading.Event()
+        self._finish = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(board.copy(), human_symbol, self._cancel, self._finish),
+            name="ai-ponder",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Abandon pondering and forget the cached replies."""
+        self._cancel.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+            self._thread = None
+        with self._lock:
+            self._cache.clear()
+            self._current = None
+
+    def take(self, board: GameBoard) -> Tuple[bool, Optional[Move], Optional[SearchStats]]:
+        """Stop pondering and return (found, reply, search stats) for the position on `board`.
+
+        If the reply to this exact position is being searched, that search is allowed to
+        finish instead of being thrown away.
+        """
+        key = board.position_key
+        with self._lock:
+            in_progress = self._current == key
+        if in_progress:
+            self._finish.set()
+            with self._lock:
+                # It may have moved on to another reply in the meantime.
+                if self._current != key:
+                    self._cancel.set()
+        else:
+            self._cancel.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+            self._thread = None
+        with self._lock:
+            found = key in self._cache
+            move, stats = self._cache.get(key, (None, None))
+            self._cache.clear()
+            self._current = None
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found, move, stats
+
+    def _run(self, board: GameBoard, human: str, cancel: threading.Event, finish: threading.Event) -> None:
+        priority = static_priority(board.size, board.cols, board.k)
+        moves: List[Move] = sorted(board.available_moves(), key=lambda m: -priority[m[0] * board.cols + m[1]])
+        for move in moves:
+            if cancel.is_set() or finish.is_set():
+                return
+            board.push(move, human)
+            key = board.position_key
+            with self._lock:
+                self._current = key
+            try:
+                reply = self.ai.choose_move(board, cancel) if board.game_state() == "IN_PROGRESS" else None
+            except SearchCancelled:
+                return
+            finally:
+                board.pop()
+            with self._lock:
+                self._cache[key] = (reply, self.ai.last_stats)
+                self._current = None
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import threading
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import Body, FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 
+from ai_player import AIPlayer, SearchTimeout
+from game_board import GameBoard
+
 
 app = FastAPI()
 
+# /analyze limits: grids per request, board edge, and how deep large boards may be searched.
+_MAX_GRIDS = 256
+_MAX_EDGE = 19
+_MAX_FULL_SEARCH_CELLS = 9
+_MAX_DEPTH = 4
+# Work allowed per request, as empty cells times search depth summed over the distinct grids
+# (a full search counts its empty cells as the depth), and a hard limit on search time.
+_MAX_WORK = 25_000
+_MAX_SEARCH_S = 2.0
+
+# One analyzer for all requests so its transposition table keeps warming up. Searches are
+# serialized because the player keeps per-search state.
+_analyzer = AIPlayer(symbol="X", use_solved_table=False, workers=int(os.environ.get("ANALYZE_WORKERS", "1")))
+_analyzer_lock = threading.Lock()
+
 
 @dataclass
 class Room:
@@ -57,6 +77,7 @@ def root() -> HTMLResponse:
 
         <p><b>Health check:</b> <a href=\"/health\">/health</a></p>
         <p><b>WebSocket endpoint:</b> <code>/ws?room=ROOMNAME</code></p>
+        <p><b>Position analysis:</b> <code>POST /analyze</code> with a JSON array of grids</p>
 
         <p><b>Example:</b></p>
         <pre>wss://YOUR-SERVICE.onrender.com/ws?room=demo</pre>
@@ -74,6 +95,76 @@ def health() -> dict:
     return {"status": "ok", "service": "tic-tac-toe-ws"}
 
 
+def _board_from_grid(grid: List[List[str]], k: Optional[int]) -> GameBoard:
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    if not (1 <= rows <= _MAX_EDGE and 1 <= cols <= _MAX_EDGE) or any(len(row) != cols for row in grid):
+        raise HTTPException(status_code=400, detail=f"grids must be rectangular, at most {_MAX_EDGE} per side")
+    if any(cell not in ("X", "O", " ", "") for row in grid for cell in row):
+        raise HTTPException(status_code=400, detail="cells must be 'X', 'O' or ' '")
+    try:
+        board = GameBoard(rows, cols, k)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    board.grid = [[cell or " " for cell in row] for row in grid]
+    xs = sum(row.count("X") for row in board.grid)
+    os_ = sum(row.count("O") for row in board.grid)
+    if xs - os_ not in (0, 1):
+        raise HTTPException(status_code=400, detail="X moves first: X must have as many stones as O, or one more")
+    if board.winner() is not None:
+        raise HTTPException(status_code=400, detail="the game in this grid is already won")
+    return board
+
+
+def _work(board: GameBoard, depth: Optional[int]) -> int:
+    empty = sum(row.count(" ") for row in board.grid)
+    return empty * (empty if depth is None else min(depth, empty))
+
+
+@app.post("/analyze")
+def analyze(
+    grids: List[List[List[str]]] = Body(...),
+    k: Optional[int] = None,
+    depth: Optional[int] = None,
+) -> List[List[dict]]:
+    """Scores of every legal move for the side to move, best first, for each grid.
+
+    Positive scores win (higher is faster), 0 draws, negative lose. Boards larger than 3x3
+    need a search `depth` (at most _MAX_DEPTH plies); `k` defaults to the shorter side.
+    Illegal or already won positions and requests over _MAX_WORK are rejected with 400; a
+    search that runs past _MAX_SEARCH_S is abandoned with 503.
+    """
+    if len(grids) > _MAX_GRIDS:
+        raise HTTPException(status_code=400, detail=f"at most {_MAX_GRIDS} grids per request")
+    if depth is not None and not (1 <= depth <= _MAX_DEPTH):
+        raise HTTPException(status_code=400, detail=f"depth must be between 1 and {_MAX_DEPTH}")
+    boards = [_board_from_grid(grid, k) for grid in grids]
+    if depth is None and any(b.rows * b.cols > _MAX_FULL_SEARCH_CELLS for b in boards):
+        raise HTTPException(status_code=400, detail="boards larger than 3x3 need a search depth")
+    work = sum(_work(b, depth) for b in {b.position_key: b for b in boards}.values())
+    if work > _MAX_WORK:
+        raise HTTPException(
+            status_code=400, detail=f"request too large ({work:,} empty cells x depth, at most {_MAX_WORK:,})"
+        )
+
+    # Requests take turns on the shared analyzer; waiting is bounded like searching.
+    if not _analyzer_lock.acquire(timeout=_MAX_SEARCH_S):
+        raise HTTPException(status_code=503, detail="analyzer busy, try again")
+    try:
+        _analyzer.max_depth = depth
+        results = _analyzer.analyze_many(boards, time_limit_s=_MAX_SEARCH_S)
+    except SearchTimeout:
+        raise HTTPException(
+            status_code=503, detail=f"analysis took longer than {_MAX_SEARCH_S:g} s; send fewer grids or a lower depth"
+        )
+    finally:
+        _analyzer_lock.release()
+    return [
+        [{"row": r, "col": c, "score": score} for (r, c), score in sorted(scores.items(), key=lambda item: -item[1])]
+        for scores in results
+    ]
+
+
 @app.websocket("/ws")
 async def ws_endpoint(websocket: WebSocket, room: str = "default") -> None:
     await websocket.accept()
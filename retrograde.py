@@ -0,0 +1,277 @@
+"""Retrograde endgame databases for small m,n,k variants (e.g. 4x4 with 4 in a row).
+
+Positions are solved layer by layer, from full boards back towards the empty board: every
+position with ``p`` stones is scored from the already-solved positions with ``p + 1``. Each
+layer is split into chunks (by the lowest occupied cell) and solved on a process pool, with
+every worker writing straight into a shared memory-mapped output file.
+
+The file is a header followed by one little-endian uint16 per base-3 position index (the
+same code as GameBoard.position_index, cell 0 most significant):
+
+- bits 0-7: value for the side to move, offset by 128 (``cells + 1 - d`` for a win in ``d``
+  plies, ``d - cells - 1`` for a loss, 0 for a draw; the AIPlayer search scale)
+- bits 8-15: best move as ``row * cols + col + 1`` (0 for a finished game)
+
+An entry of 0 means the position is not in the database: unreachable, or earlier than the
+``min_ply`` the database was built from. Solving from a late ply gives an endgame-only
+database in a fraction of the time and disk space of a full solve. Generate one with:
+
+    python retrograde.py --rows 4 --k 4 --min-ply 8
+
+Boards are limited to MAX_CELLS (18) cells: 4x4, 3x5, 3x6 and smaller. The dense index
+needs 2 * 3**cells bytes, so 5x5 would take 1.7 TB. Symmetry would only divide that by 8,
+and even a sparse table of reachable positions holds too many to solve this way.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterator, Optional, Tuple
+
+from bitboard import _cell_line_masks
+from game_board import GameBoard, Move, _base3_weights
+
+
+MAGIC = b"TTTR"
+# 3**18 entries is a 775 MB file; 4x5 (3**20 entries) would already need 7 GB.
+MAX_CELLS = 18
+_HEADER = struct.Struct("<4sBBBB")
+_ENTRY = struct.Struct("<H")
+_VALUE_OFFSET = 128
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Set in each solver process by _init_solver.
+_solver_map: Optional[mmap.mmap] = None
+
+
+def default_path(rows: int, cols: int, k: int) -> str:
+    return os.path.join(_DIR, f"retro_{rows}x{cols}_k{k}.bin")
+
+
+def _file_size(rows: int, cols: int) -> int:
+    return _HEADER.size + _ENTRY.size * 3 ** (rows * cols)
+
+
+def _init_solver(path: str) -> None:
+    global _solver_map
+    with open(path, "r+b") as f:
+        _solver_map = mmap.mmap(f.fileno(), 0)
+
+
+def _layer_stones(cells: int, ply: int, first: int) -> Iterator[Tuple[int, int]]:
+    """(x_bits, o_bits) of every position with `ply` stones whose lowest occupied cell is `first`."""
+    if ply == 0:
+        yield 0, 0
+        return
+    x_count = (ply + 1) // 2
+    for rest in combinations(range(first + 1, cells), ply - 1):
+        occupied = (first,) + rest
+        all_bits = 0
+        for i in occupied:
+            all_bits |= 1 << i
+        for xs in combinations(occupied, x_count):
+            x_bits = 0
+            for i in xs:
+                x_bits |= 1 << i
+            yield x_bits, all_bits ^ x_bits
+
+
+def _solve_chunk(rows: int, cols: int, k: int, ply: int, first: int) -> int:
+    """Solve one chunk of layer `ply` into _solver_map. Returns the number of positions written."""
+    entries = _solver_map
+    cells = rows * cols
+    weights = _base3_weights(rows, cols)
+    lines = sorted({mask for masks in _cell_line_masks(rows, cols, k) for mask in masks})
+    win = cells + 1
+    # Code of the stone the side to move places.
+    code = 1 if ply % 2 == 0 else 2
+    full = (1 << cells) - 1
+    header = _HEADER.size
+    size = _ENTRY.size
+    unpack, pack = _ENTRY.unpack_from, _ENTRY.pack_into
+
+    written = 0
+    for x_bits, o_bits in _layer_stones(cells, ply, first):
+        x_line = any(x_bits & m == m for m in lines)
+        o_line = any(o_bits & m == m for m in lines)
+        # The side to move cannot already have k in a row: unreachable, left out.
+        if (x_line and (code == 1 or o_line)) or (o_line and code == 2):
+            continue
+
+        index = 0
+        bits = x_bits
+        while bits:
+            low = bits & -bits
+            index += weights[low.bit_length() - 1]
+            bits ^= low
+        bits = o_bits
+        while bits:
+            low = bits & -bits
+            index += 2 * weights[low.bit_length() - 1]
+            bits ^= low
+
+        if x_line or o_line:
+            # The previous move won.
+            value, best = -win, 0
+        elif ply == cells:
+            value, best = 0, 0
+        else:
+            value, best = -win - 1, 0
+            empty = full ^ x_bits ^ o_bits
+            while empty:
+                low = empty & -empty
+                cell = low.bit_length() - 1
+                empty ^= low
+                (child,) = unpack(entries, header + (index + code * weights[cell]) * size)
+                child = (child & 0xFF) - _VALUE_OFFSET
+                # Negate the child's value and add one ply of distance.
+                if child > 0:
+                    score = -(child - 1)
+                elif child < 0:
+                    score = -(child + 1)
+                else:
+                    score = 0
+                # Strictly greater: the first best move in row-major order is kept.
+                if score > value:
+                    value, best = score, cell + 1
+        pack(entries, header + index * size, (best << 8) | (value + _VALUE_OFFSET))
+        written += 1
+    return written
+
+
+def _solve_task(task: Tuple[int, int, int, int, int]) -> int:
+    return _solve_chunk(*task)
+
+
+def write_database(
+    rows: int,
+    cols: int,
+    k: int,
+    path: Optional[str] = None,
+    min_ply: int = 0,
+    processes: Optional[int] = None,
+    progress: bool = False,
+) -> int:
+    """Solve every position with at least `min_ply` stones and write the database to path.
+
+    Returns the number of positions stored. `processes` defaults to all cores.
+    """
+    global _solver_map
+    cells = rows * cols
+    if cells > MAX_CELLS:
+        raise ValueError(f"{rows}x{cols} has more than {MAX_CELLS} cells (the largest boards are 4x4 and 3x6)")
+    if not (1 <= k <= max(rows, cols)):
+        raise ValueError("k must be between 1 and the longest side")
+    if not (0 <= min_ply <= cells):
+        raise ValueError(f"min_ply must be between 0 and {cells}")
+    path = path or default_path(rows, cols, k)
+    processes = processes or os.cpu_count() or 1
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, rows, cols, k, min_ply))
+        # Sparse on most file systems: untouched pages cost no disk space.
+        f.truncate(_file_size(rows, cols))
+
+    total = 0
+    pool = multiprocessing.Pool(processes, initializer=_init_solver, initargs=(tmp,)) if processes > 1 else None
+    if pool is None:
+        _init_solver(tmp)
+    try:
+        for ply in range(cells, min_ply - 1, -1):
+            start = time.perf_counter()
+            # Layers depend on the one after them, so each is finished before the next starts.
+            tasks = [(rows, cols, k, ply, first) for first in (range(cells - ply + 1) if ply else [0])]
+            if pool is not None:
+                counts = pool.map(_solve_task, tasks, chunksize=1)
+            else:
+                counts = [_solve_task(task) for task in tasks]
+            total += sum(counts)
+            if progress:
+                print(f"ply {ply:2}: {sum(counts):>10,} positions in {time.perf_counter() - start:.1f} s")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        elif _solver_map is not None:
+            _solver_map.close()
+            _solver_map = None
+    os.replace(tmp, path)
+    return total
+
+
+class EndgameTable:
+    """Read-only, memory-mapped view of a database written by write_database()."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, self.rows, self.cols, self.k, self.min_ply = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != _file_size(self.rows, self.cols):
+            self.close()
+            raise ValueError(f"{path} is not an endgame database")
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def lookup(self, index: int) -> Optional[Tuple[int, Optional[int]]]:
+        """(value, best cell or None) for the side to move at a position_index, or None."""
+        (packed,) = _ENTRY.unpack_from(self._map, _HEADER.size + index * _ENTRY.size)
+        if not packed:
+            return None
+        best = packed >> 8
+        return (packed & 0xFF) - _VALUE_OFFSET, best - 1 if best else None
+
+    def best_move(self, board: GameBoard) -> Optional[Move]:
+        """First best move in row-major order (the move a full AIPlayer search picks)."""
+        entry = self.lookup(board.position_index)
+        if entry is None or entry[1] is None:
+            return None
+        return divmod(entry[1], self.cols)
+
+
+@lru_cache(maxsize=None)
+def endgame_table(rows: int, cols: int, k: int) -> Optional[EndgameTable]:
+    """The database at default_path(rows, cols, k), or None if it has not been generated."""
+    try:
+        return EndgameTable(default_path(rows, cols, k))
+    except (OSError, ValueError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Solve an m,n,k variant backwards and write an endgame database.")
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=None)
+    parser.add_argument("--k", type=int, default=None, help="in a row to win (default: shorter side)")
+    parser.add_argument(
+        "--min-ply", type=int, default=0, help="solve positions with at least this many stones (default: all)"
+    )
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default=None, help="output file (default: retro_RxC_kK.bin next to this file)")
+    args = parser.parse_args()
+
+    cols = args.cols or args.rows
+    k = args.k or min(args.rows, cols)
+    path = args.out or default_path(args.rows, cols, k)
+    start = time.perf_counter()
+    count = write_database(args.rows, cols, k, path, args.min_ply, args.processes, progress=True)
+    print(f"Wrote {count:,} positions to {path} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
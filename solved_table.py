@@ -0,0 +1,174 @@
+"""Solved-game table for the classic 3x3 board.
+
+Every position reachable from the empty board is solved once and stored in a flat binary
+file indexed by the position's base-3 code (cell ``i`` contributes ``code * 3**(8 - i)``
+with 0 = empty, 1 = X, 2 = O). Each entry is a little-endian uint16:
+
+- bits 0-8: best moves for the side to move (bit ``row * 3 + col``)
+- bits 9-13: value for the side to move, offset by 16 (``10 - d`` for a win in ``d`` plies,
+  ``d - 10`` for a loss, 0 for a draw)
+- bit 15: entry is valid (position is reachable)
+
+Generate the table with:
+
+    python solved_table.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from game_board import GameBoard, Move
+
+
+MAGIC = b"TTT1"
+SIZE = 3
+CELLS = SIZE * SIZE
+_HEADER = struct.Struct("<4sB")
+_ENTRY = struct.Struct("<H")
+_VALID = 1 << 15
+_VALUE_SHIFT = 9
+_VALUE_OFFSET = 16
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved_3x3.bin")
+
+_CODE = {" ": 0, "X": 1, "O": 2}
+
+
+def position_index(grid: List[List[str]]) -> int:
+    """Base-3 index of a 3x3 grid into the table."""
+    idx = 0
+    for row in grid:
+        for cell in row:
+            idx = idx * 3 + _CODE.get(cell, 0)
+    return idx
+
+
+def side_to_move(grid: List[List[str]]) -> str:
+    xs = sum(row.count("X") for row in grid)
+    os_ = sum(row.count("O") for row in grid)
+    return "X" if xs == os_ else "O"
+
+
+def solve() -> Dict[int, Tuple[int, int]]:
+    """Solve every reachable position. Returns {index: (value, best_move_mask)}."""
+    solved: Dict[int, Tuple[int, int]] = {}
+    board = GameBoard(SIZE)
+
+    def value_of(symbol: str) -> int:
+        idx = position_index(board.grid)
+        cached = solved.get(idx)
+        if cached is not None:
+            return cached[0]
+
+        state = board.game_state()
+        if state != "IN_PROGRESS":
+            # The player who just moved decides the game; the side to move never wins here.
+            value = 0 if state == "DRAW" else -10
+            solved[idx] = (value, 0)
+            return value
+
+        other = "O" if symbol == "X" else "X"
+        scores: List[Tuple[Move, int]] = []
+        for move in list(board.available_moves()):
+            board.push(move, symbol)
+            child = value_of(other)
+            board.pop()
+            # Negate the child's value and add one ply of distance.
+            if child > 0:
+                score = -(child - 1)
+            elif child < 0:
+                score = -(child + 1)
+            else:
+                score = 0
+            scores.append((move, score))
+
+        best = max(score for _, score in scores)
+        mask = 0
+        for (r, c), score in scores:
+            if score == best:
+                mask |= 1 << (r * SIZE + c)
+        solved[idx] = (best, mask)
+        return best
+
+    value_of("X")
+    return solved
+
+
+def write_table(path: str = DEFAULT_PATH) -> int:
+    """Solve the game and write the table to path. Returns the number of reachable positions."""
+    solved = solve()
+    entries = bytearray(_ENTRY.size * 3**CELLS)
+    for idx, (value, mask) in solved.items():
+        packed = _VALID | ((value + _VALUE_OFFSET) << _VALUE_SHIFT) | mask
+        _ENTRY.pack_into(entries, idx * _ENTRY.size, packed)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, SIZE))
+        f.write(entries)
+    os.replace(tmp, path)
+    return len(solved)
+
+
+class SolvedTable:
+    """Read-only, memory-mapped view of a table written by write_table()."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, size = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or size != SIZE or len(self._map) != _HEADER.size + _ENTRY.size * 3**CELLS:
+            self.close()
+            raise ValueError(f"{path} is not a solved {SIZE}x{SIZE} table")
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def lookup(self, grid: List[List[str]]) -> Optional[Tuple[int, int]]:
+        """Returns (value, best_move_mask) for the side to move, or None if not in the table."""
+        (packed,) = _ENTRY.unpack_from(self._map, _HEADER.size + position_index(grid) * _ENTRY.size)
+        if not packed & _VALID:
+            return None
+        value = ((packed >> _VALUE_SHIFT) & 0x1F) - _VALUE_OFFSET
+        return value, packed & ((1 << CELLS) - 1)
+
+    def best_move(self, grid: List[List[str]]) -> Optional[Move]:
+        """First best move in row-major order (the move a full AIPlayer search picks)."""
+        entry = self.lookup(grid)
+        if entry is None or not entry[1]:
+            return None
+        mask = entry[1]
+        return divmod((mask & -mask).bit_length() - 1, SIZE)
+
+
+@lru_cache(maxsize=None)
+def default_table() -> Optional[SolvedTable]:
+    """The table at DEFAULT_PATH, or None if it has not been generated."""
+    try:
+        return SolvedTable(DEFAULT_PATH)
+    except (OSError, ValueError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Solve 3x3 Tic-Tac-Toe and write the lookup table.")
+    parser.add_argument("--out", default=DEFAULT_PATH, help="output file (default: %(default)s)")
+    args = parser.parse_args()
+    count = write_table(args.out)
+    print(f"Wrote {count} positions to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from ai_player import AIPlayer, shutdown_pools
+from game_board import GameBoard, zobrist_k_key
+from transposition import TranspositionTable
+
+
+def _board(rows: int, cols: int, k: int, moves) -> GameBoard:
+    board = GameBoard(rows, cols, k)
+    symbol = "X"
+    for move in moves:
+        board.place(move[0], move[1], symbol)
+        symbol = "O" if symbol == "X" else "X"
+    return board
+
+
+OPENING = [(1, 1), (0, 0), (2, 2), (0, 3)]
+
+
+def _player(tt: TranspositionTable) -> AIPlayer:
+    return AIPlayer("X", max_depth=4, tt=tt, use_solved_table=False, use_endgame_db=False)
+
+
+def test_k_keys_differ():
+    assert len({zobrist_k_key(k) for k in range(1, 8)}) == 7
+
+
+def test_shared_table_keeps_k_apart():
+    shared = TranspositionTable()
+    for k in (4, 3, 4):
+        scores = _player(shared).analyze(_board(4, 4, k, OPENING))
+        assert scores == _player(TranspositionTable()).analyze(_board(4, 4, k, OPENING))
+
+
+def test_parallel_analyze_gives_exact_scores():
+    # X to move with wins, draws and a loss: moves behind the best one used to come back
+    # as bounds from the parallel search.
+    board = _board(3, 3, 3, [(2, 2), (0, 2)])
+    serial = AIPlayer("X", use_solved_table=False).analyze(board.copy())
+    try:
+        parallel = AIPlayer("X", use_solved_table=False, workers=2).analyze(board.copy())
+    finally:
+        shutdown_pools()
+    assert parallel == serial
+    assert len(set(serial.values())) > 1
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_env import BatchEnv  # noqa: E402
+from game_board import GameBoard  # noqa: E402
+
+
+@pytest.mark.parametrize("shape", [(3, 3, 3), (4, 4, 3), (3, 5, 4)])
+def test_random_games_match_game_board(shape):
+    rows, cols, k = shape
+    env = BatchEnv(64, rows, cols, k, auto_reset=False)
+    boards = [GameBoard(rows, cols, k) for _ in range(env.n)]
+    rng = np.random.default_rng(1)
+    while (env.state == 0).any():
+        moves = env.sample_moves(rng)
+        for i, board in enumerate(boards):
+            if board.game_state() == "IN_PROGRESS":
+                row, col = divmod(int(moves[i]), cols)
+                board.place(row, col, "X" if board.ply % 2 == 0 else "O")
+        env.step(moves)
+        for i, board in enumerate(boards):
+            assert env.game_state(i) == board.game_state()
+            assert env.to_game_board(i).grid == board.grid
+
+
+def test_auto_reset_clears_finished_boards():
+    env = BatchEnv(2)
+    # Board 0: X wins on the top row; board 1 plays elsewhere.
+    for move in ([0, 4], [3, 0], [1, 1], [4, 7]):
+        env.step(np.array(move))
+    states = env.step(np.array([2, 3]))
+    assert env.game_state(0) == "IN_PROGRESS" and states[0] == 1
+    assert not env.boards[0].any()
+    assert env.ply[1] == 5
+    assert env.results[1] == 1
+
+
+def test_illegal_moves_raise():
+    env = BatchEnv(2)
+    env.step(np.array([0, 0]))
+    with pytest.raises(ValueError):
+        env.step(np.array([0, 1]))
+    with pytest.raises(ValueError):
+        env.step(np.array([9, 1]))
+    with pytest.raises(ValueError):
+        env.step(np.array([1]))
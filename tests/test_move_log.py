@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import pytest
+
+from game_controller import GameController
+from move_log import MoveLog
+
+
+def _play(controller: GameController, moves) -> None:
+    for move in moves:
+        assert controller.apply_move(move)
+
+
+def test_to_bytes_round_trip():
+    log = MoveLog("O")
+    for cell in (4, 0, 8, 2):
+        log.record(cell)
+    data = log.to_bytes(3, 3, 3)
+    assert len(data) == 4 + 4
+    rows, cols, k, loaded = MoveLog.from_bytes(data)
+    assert (rows, cols, k) == (3, 3, 3)
+    assert loaded.first == "O"
+    assert loaded.start is None
+    assert loaded.played() == [4, 0, 8, 2]
+    assert loaded.ply == 4
+
+
+def test_undone_moves_are_not_serialized():
+    log = MoveLog()
+    for cell in (0, 1, 2):
+        log.record(cell)
+    log.undo()
+    assert MoveLog.from_bytes(log.to_bytes(3, 3, 3))[3].played() == [0, 1]
+
+
+def test_large_boards_use_two_bytes_per_move():
+    log = MoveLog()
+    for cell in (0, 300, 359):
+        log.record(cell)
+    data = log.to_bytes(19, 19, 5)
+    assert len(data) == 4 + 2 * 3
+    assert MoveLog.from_bytes(data)[3].played() == [0, 300, 359]
+
+
+def test_start_position_round_trip():
+    start = bytes([1, 0, 2, 0, 0, 0, 0, 0, 0])
+    log = MoveLog("X", start)
+    log.record(4)
+    rows, cols, k, loaded = MoveLog.from_bytes(log.to_bytes(3, 3, 3))
+    assert loaded.start == start
+    assert loaded.played() == [4]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x03\x03",  # Truncated header.
+        bytes([3, 3, 3, 0x80]) + bytes(8),  # Start position one cell short.
+        bytes([3, 3, 3, 0x80]) + bytes([3]) + bytes(8),  # Bad cell code.
+        bytes([19, 19, 5, 0, 1]),  # Half a two-byte move.
+    ],
+)
+def test_malformed_records_raise(data):
+    with pytest.raises(ValueError):
+        MoveLog.from_bytes(data)
+
+
+def test_undo_redo_bounds():
+    log = MoveLog()
+    with pytest.raises(IndexError):
+        log.undo()
+    log.record(5)
+    assert log.undo() == 5
+    assert log.redo() == 5
+    with pytest.raises(IndexError):
+        log.redo()
+
+
+def test_controller_export_load_round_trip():
+    controller = GameController()
+    _play(controller, [(1, 1), (0, 0), (2, 2), (0, 2)])
+    data = controller.export_game()
+    assert len(data) == 8
+
+    other = GameController()
+    other.load_game(data)
+    assert other.board.grid == controller.board.grid
+    assert other.current_turn == "X"
+    other.undo()
+    assert other.board.grid[0][2] == " "
+
+
+def test_controller_round_trip_from_loaded_position():
+    controller = GameController()
+    controller.load_position([["X", " ", " "], [" ", "O", " "], [" ", " ", " "]], "X")
+    _play(controller, [(2, 2)])
+
+    other = GameController()
+    other.load_game(controller.export_game())
+    assert other.board.grid == controller.board.grid
+    assert other.current_turn == "O"
+    # Undo stops at the loaded position instead of emptying the board.
+    assert other.undo() == (2, 2)
+    assert other.undo() is None
+    assert other.board.grid[0][0] == "X" and other.board.grid[1][1] == "O"
+
+
+def test_controller_rejects_illegal_moves_in_record():
+    log = MoveLog()
+    for cell in (0, 0):
+        log.record(cell)
+    with pytest.raises(ValueError):
+        GameController().load_game(log.to_bytes(3, 3, 3))
+
+
+def test_replay_steps_both_ways():
+    controller = GameController()
+    moves = [(0, 0), (1, 1), (0, 1), (2, 2)]
+    _play(controller, moves)
+    controller.replay(1)
+    assert controller.board.grid[0][0] == "X" and controller.board.grid[1][1] == " "
+    assert controller.current_turn == "O"
+    controller.replay(4)
+    assert controller.board.grid[2][2] == "O"
+    with pytest.raises(ValueError):
+        controller.replay(5)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import json
+import socket
+import time
+
+import pytest
+
+from online_net import (
+    MAX_FRAME,
+    OnlineClient,
+    OnlineConfig,
+    OnlineHost,
+    SequenceTracker,
+    _decode_binary,
+    _encode,
+    _encode_binary,
+    _Receiver,
+)
+
+
+SYNC = {
+    "type": "sync",
+    "seq": 7,
+    "grid": [["X", " ", "O"], [" ", "X", " "], [" ", " ", "O"]],
+    "turn": "X",
+    "rows": 3,
+    "cols": 3,
+    "k": 3,
+    "hash": 0x5DEECE66D,
+}
+
+
+def _decode(payload: bytes):
+    buf = bytearray(payload)
+    return _decode_binary(buf, 0, len(buf))
+
+
+@pytest.mark.parametrize(
+    "msg",
+    [
+        {"type": "move", "seq": 3, "row": 1, "col": 2, "symbol": "O", "hash": 12345},
+        {"type": "move", "row": 0, "col": 0},
+        {"type": "restart", "seq": 9},
+        {"type": "resync"},
+        {"type": "ping", "id": 42},
+        {"type": "pong", "id": 42},
+        SYNC,
+        {"type": "list", "offset": 0, "open": True},
+    ],
+)
+def test_binary_round_trip(msg):
+    assert _decode(_encode_binary(msg)) == msg
+
+
+def test_sync_without_seq_or_hash_keeps_hash_zero():
+    msg = dict(SYNC)
+    del msg["seq"]
+    msg["hash"] = 0
+    assert _decode(_encode_binary(msg)) == msg
+
+
+def test_unrepresentable_move_falls_back_to_json():
+    msg = {"type": "move", "row": 300, "col": 0}
+    payload = _encode_binary(msg)
+    assert payload[0] == 0
+    assert _decode(payload) == msg
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        # Move with symbol code 9.
+        bytes(bytearray(_encode_binary({"type": "move", "row": 0, "col": 0, "symbol": "X"}))[:7]) + b"\x09" + bytes(8),
+        # Sync with a cell code of 7.
+        _encode_binary(SYNC)[:-1] + b"\x07",
+        # Sync with turn code 3.
+        _encode_binary(SYNC)[:8] + b"\x03" + _encode_binary(SYNC)[9:],
+        # Sync whose grid is one cell short.
+        _encode_binary(SYNC)[:-1],
+        # Wrong sizes for fixed layouts, and an unknown kind.
+        _encode_binary({"type": "move", "row": 0, "col": 0})[:-1],
+        _encode_binary({"type": "restart"}) + b"\x00",
+        bytes((99, 0, 0)),
+        # JSON that is not an object, and bytes that are not JSON.
+        b"\x00[1, 2]",
+        b"\x00{not json",
+    ],
+)
+def test_malformed_frames_decode_to_none(payload):
+    assert _decode(payload) is None
+
+
+def _feed_all(receiver: _Receiver, data: bytes, chunk: int) -> list:
+    """What the event loop does: recv_into get_buffer() (at most `chunk` bytes), then feed()."""
+    got: list = []
+    i = 0
+    while i < len(data):
+        buf = receiver.get_buffer()
+        n = min(chunk, len(buf), len(data) - i)
+        buf[:n] = data[i : i + n]
+        receiver.feed(n, got.append)
+        i += n
+    return got
+
+
+@pytest.mark.parametrize("chunk", [1, 5, 4096])
+def test_receiver_json_lines_in_any_chunks(chunk):
+    msgs = [{"type": "move", "row": i % 3, "col": i // 3 % 3} for i in range(50)] + [SYNC]
+    data = b"".join(_encode(m, False) for m in msgs)
+    assert _feed_all(_Receiver(64), data, chunk) == msgs
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 4096])
+def test_receiver_binary_frames_in_any_chunks(chunk):
+    msgs = [{"type": "move", "seq": i + 1, "row": 1, "col": 1, "symbol": "X"} for i in range(50)] + [SYNC]
+    data = b"".join(_encode(m, True) for m in msgs)
+    receiver = _Receiver(64)
+    receiver.binary = True
+    assert _feed_all(receiver, data, chunk) == msgs
+
+
+def test_receiver_skips_blank_and_bad_lines():
+    data = b"\n   \nnot json\n[1]\n" + _encode({"type": "restart"}, False)
+    assert _feed_all(_Receiver(), data, 3) == [{"type": "restart"}]
+
+
+def test_receiver_grows_for_one_large_line():
+    msg = {"type": "note", "text": "x" * 20000}
+    assert _feed_all(_Receiver(64), _encode(msg, False), 1000) == [msg]
+
+
+def test_receiver_refuses_endless_line():
+    receiver = _Receiver()
+    with pytest.raises(ValueError):
+        _feed_all(receiver, b"a" * (MAX_FRAME + 2), 4096)
+
+
+def test_encode_rejects_payload_over_one_frame():
+    msg = {"type": "note", "text": "x" * MAX_FRAME}
+    with pytest.raises(ValueError):
+        _encode(msg, True)
+    assert json.loads(_encode(msg, False)) == msg
+
+
+def _update(kind: str, seq: int) -> dict:
+    return {"type": kind, "seq": seq}
+
+
+def test_sequence_applies_in_order_after_first_snapshot():
+    tracker = SequenceTracker()
+    assert tracker.check(_update("move", 1)) == "drop"  # No snapshot yet.
+    assert tracker.check(_update("sync", 1)) == "apply"
+    assert tracker.check(_update("move", 2)) == "apply"
+    assert tracker.check(_update("restart", 3)) == "apply"
+    assert tracker.last == 3
+
+
+def test_sequence_drops_duplicates_and_late_updates():
+    tracker = SequenceTracker()
+    tracker.check(_update("sync", 4))
+    tracker.check(_update("move", 5))
+    assert tracker.check(_update("move", 5)) == "drop"
+    assert tracker.check(_update("move", 3)) == "drop"
+    assert tracker.check(_update("sync", 4)) == "drop"
+    assert tracker.duplicates == 3
+
+
+def test_sequence_gap_asks_for_snapshot_and_waits_for_it():
+    tracker = SequenceTracker()
+    tracker.check(_update("sync", 1))
+    assert tracker.check(_update("move", 3)) == "resync"
+    assert tracker.gaps == 1
+    assert tracker.check(_update("move", 4)) == "drop"
+    assert tracker.check(_update("sync", 4)) == "apply"
+    assert tracker.check(_update("move", 5)) == "apply"
+
+
+def test_sequence_applies_unnumbered_version_1_updates():
+    tracker = SequenceTracker()
+    assert tracker.check({"type": "move", "row": 0, "col": 0}) == "apply"
+
+
+def _wait_for(condition, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def host():
+    host = OnlineHost(OnlineConfig(host="127.0.0.1", port=0), lambda msg: None, lambda: None, lambda: None)
+    host.start()
+    yield host
+    host.stop()
+
+
+def _port(host: OnlineHost) -> int:
+    return host._server.sockets[0].getsockname()[1]
+
+
+def test_host_sends_deltas_only_after_version_2_hello(host):
+    # A version 1 joiner reads the hello and never answers it.
+    with socket.create_connection(("127.0.0.1", _port(host))) as sock:
+        assert json.loads(sock.makefile("rb").readline())["type"] == "hello"
+        assert _wait_for(lambda: host.connected)
+        assert not host.deltas
+    assert _wait_for(lambda: not host.connected)
+
+    for binary in (True, False):
+        client = OnlineClient("127.0.0.1", _port(host), lambda msg: None, lambda: None, binary=binary)
+        client.connect()
+        try:
+            assert _wait_for(lambda: host.deltas)
+            assert host.framing == ("binary" if binary else "json")
+        finally:
+            client.close()
+        assert _wait_for(lambda: not host.connected)
@@ -0,0 +1,246 @@
+"""Headless round-robin tournaments between AIPlayer configurations.
+
+Every pair of entrants plays the same number of games with each side as X. Games run in
+parallel on all cores; each finished game is appended to a JSON-lines file as it arrives.
+
+    python tournament.py --player easy:depth=1 --player medium:depth=3 --player hard --games 20
+
+Entrant spec: ``NAME[:key=value,...]`` with keys ``depth`` (plies, default: full search),
+``budget`` (ms per move), ``table`` (0 to ignore the solved 3x3 table), ``symmetry`` (0/1).
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ai_player import AIPlayer
+from game_controller import GameController
+
+
+DEFAULT_PLAYERS = ["easy:depth=1", "medium:depth=3", "hard"]
+
+
+@dataclass(frozen=True)
+class Entrant:
+    name: str
+    max_depth: Optional[int] = None
+    time_budget_ms: Optional[int] = None
+    use_solved_table: bool = True
+    use_symmetry: bool = True
+
+    def make(self, symbol: str) -> AIPlayer:
+        return AIPlayer(
+            symbol=symbol,
+            max_depth=self.max_depth,
+            time_budget_ms=self.time_budget_ms,
+            use_solved_table=self.use_solved_table,
+            use_symmetry=self.use_symmetry,
+        )
+
+
+def parse_entrant(spec: str) -> Entrant:
+    """Entrant from ``NAME[:key=value,...]`` (see the module docstring)."""
+    name, _, options = spec.partition(":")
+    if not name:
+        raise ValueError(f"missing entrant name in {spec!r}")
+    kwargs: Dict[str, object] = {}
+    for option in filter(None, options.split(",")):
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"expected key=value, got {option!r}")
+        if key == "depth":
+            kwargs["max_depth"] = None if value in ("full", "none") else int(value)
+        elif key == "budget":
+            kwargs["time_budget_ms"] = int(value)
+        elif key == "table":
+            kwargs["use_solved_table"] = value not in ("0", "false", "no")
+        elif key == "symmetry":
+            kwargs["use_symmetry"] = value not in ("0", "false", "no")
+        else:
+            raise ValueError(f"unknown option {key!r} in {spec!r}")
+    return Entrant(name, **kwargs)  # type: ignore[arg-type]
+
+
+@dataclass(frozen=True)
+class GameTask:
+    x: Entrant
+    o: Entrant
+    rows: int
+    cols: int
+    k: int
+    # Random moves played before the entrants take over, so repeated pairings differ.
+    openings: int
+    seed: int
+
+
+@dataclass
+class GameResult:
+    x: str
+    o: str
+    result: str
+    moves: int
+    opening: List[Tuple[int, int]]
+    # Seconds spent choosing moves and number of moves chosen, per side.
+    x_time_s: float = 0.0
+    o_time_s: float = 0.0
+    x_moves: int = 0
+    o_moves: int = 0
+    seed: int = 0
+
+
+def play_game(task: GameTask) -> GameResult:
+    """Play one game on a Tk-free GameController."""
+    controller = GameController(rows=task.rows, cols=task.cols, k=task.k)
+    players = {"X": task.x.make("X"), "O": task.o.make("O")}
+    rng = random.Random(task.seed)
+    opening: List[Tuple[int, int]] = []
+    times = {"X": 0.0, "O": 0.0}
+    counts = {"X": 0, "O": 0}
+
+    while controller.state() == "IN_PROGRESS":
+        symbol = controller.current_turn
+        if len(opening) < task.openings:
+            move = rng.choice(list(controller.board.available_moves()))
+            opening.append(move)
+        else:
+            start = time.perf_counter()
+            move = players[symbol].choose_move(controller.board)
+            times[symbol] += time.perf_counter() - start
+            counts[symbol] += 1
+        if move is None or not controller.apply_move(move):
+            raise RuntimeError(f"{symbol} produced an illegal move {move!r}")
+
+    return GameResult(
+        x=task.x.name,
+        o=task.o.name,
+        result=controller.state(),
+        moves=controller.board.ply,
+        opening=opening,
+        x_time_s=times["X"],
+        o_time_s=times["O"],
+        x_moves=counts["X"],
+        o_moves=counts["O"],
+        seed=task.seed,
+    )
+
+
+def schedule(
+    entrants: List[Entrant], games: int, rows: int, cols: int, k: int, openings: int, seed: int
+) -> List[GameTask]:
+    """`games` games per ordered pair (so each pairing is played 2 * games times)."""
+    tasks = []
+    n = 0
+    for x, o in itertools.permutations(entrants, 2):
+        for _ in range(games):
+            tasks.append(GameTask(x, o, rows, cols, k, openings, seed + n))
+            n += 1
+    return tasks
+
+
+def run(tasks: List[GameTask], processes: Optional[int] = None) -> Iterator[GameResult]:
+    """Play `tasks` across a process pool, yielding results as games finish."""
+    with multiprocessing.Pool(processes=processes) as pool:
+        yield from pool.imap_unordered(play_game, tasks)
+
+
+@dataclass
+class Standing:
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    move_time_s: float = 0.0
+    moves: int = 0
+    opponents: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+
+def standings(results: List[GameResult]) -> Dict[str, Standing]:
+    table: Dict[str, Standing] = {}
+    for r in results:
+        for me, other, symbol in ((r.x, r.o, "X"), (r.o, r.x, "O")):
+            s = table.setdefault(me, Standing())
+            wdl = s.opponents.setdefault(other, [0, 0, 0])
+            if r.result == "DRAW":
+                s.draws += 1
+                wdl[1] += 1
+            elif r.result == f"{symbol}_WINS":
+                s.wins += 1
+                wdl[0] += 1
+            else:
+                s.losses += 1
+                wdl[2] += 1
+            s.move_time_s += r.x_time_s if symbol == "X" else r.o_time_s
+            s.moves += r.x_moves if symbol == "X" else r.o_moves
+    return table
+
+
+def print_report(results: List[GameResult], elapsed_s: float) -> None:
+    table = standings(results)
+    print(f"{len(results)} games in {elapsed_s:.1f} s ({len(results) / elapsed_s:.1f} games/s)")
+    print()
+    print(f"{'entrant':<14}{'games':>7}{'win %':>8}{'draw %':>8}{'loss %':>8}{'ms/move':>10}")
+    for name, s in table.items():
+        g = s.games or 1
+        ms = s.move_time_s / s.moves * 1000 if s.moves else 0.0
+        print(
+            f"{name:<14}{s.games:>7}{100 * s.wins / g:>8.1f}{100 * s.draws / g:>8.1f}"
+            f"{100 * s.losses / g:>8.1f}{ms:>10.2f}"
+        )
+    print()
+    print("Head to head (W-D-L, row vs column)")
+    names = list(table)
+    print(f"{'':<14}" + "".join(f"{n:>14}" for n in names))
+    for name in names:
+        cells = []
+        for other in names:
+            wdl = table[name].opponents.get(other)
+            cells.append("-" if wdl is None else "{}-{}-{}".format(*wdl))
+        print(f"{name:<14}" + "".join(f"{c:>14}" for c in cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-robin AI tournament without the GUI.")
+    parser.add_argument("--player", action="append", help="entrant spec (repeatable), e.g. medium:depth=3")
+    parser.add_argument("--games", type=int, default=10, help="games per pairing and colour (default: %(default)s)")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=None)
+    parser.add_argument("--k", type=int, default=None, help="in a row to win (default: shorter side)")
+    parser.add_argument("--openings", type=int, default=2, help="random opening moves (default: %(default)s)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="tournament.jsonl", help="JSON-lines game log (default: %(default)s)")
+    args = parser.parse_args()
+
+    entrants = [parse_entrant(spec) for spec in (args.player or DEFAULT_PLAYERS)]
+    if len({e.name for e in entrants}) != len(entrants):
+        parser.error("entrant names must be unique")
+    if len(entrants) < 2:
+        parser.error("need at least two entrants")
+    cols = args.cols or args.rows
+    k = args.k or min(args.rows, cols)
+    tasks = schedule(entrants, args.games, args.rows, cols, k, args.openings, args.seed)
+
+    print(f"{len(tasks)} games, {args.processes or os.cpu_count()} processes, log: {args.out}")
+    results: List[GameResult] = []
+    start = time.perf_counter()
+    with open(args.out, "w", encoding="utf-8") as log:
+        for result in run(tasks, args.processes):
+            results.append(result)
+            log.write(json.dumps(asdict(result)) + "\n")
+            log.flush()
+    print_report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+
+# Bound flags: how a stored score relates to the true minimax value of the position.
+EXACT = 0
+LOWER = 1  # true value >= score (search failed high)
+UPPER = 2  # true value <= score (search failed low)
+
+
+class TranspositionTable:
+    """Bounded cache of search results keyed by a board position key.
+
+    Entries are ``key -> (score, draft, flag)``. Scores are stored from the point of view of
+    the player to move, relative to the position (see AIPlayer), so one table can be shared
+    between AI players of either symbol and survives across moves and games.
+
+    ``draft`` is the remaining search depth the score was computed with (None means the
+    search ran to the end of the game). A probe only hits when the draft matches exactly so
+    depth-limited difficulty levels keep their behaviour.
+
+    When full, the oldest inserted entry is evicted.
+    """
+
+    def __init__(self, max_entries: int = 200_000) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[int, Optional[int], int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def probe(self, key: int, draft: Optional[int]) -> Optional[Tuple[int, int]]:
+        """Returns (score, flag) for key if stored with the same draft, else None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] != draft:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[2]
+
+    def store(self, key: int, score: int, draft: Optional[int], flag: int) -> None:
+        entries = self._entries
+        if key not in entries and len(entries) >= self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest entry.
+            del entries[next(iter(entries))]
+            self.evictions += 1
+        entries[key] = (score, draft, flag)
+        self.stores += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0